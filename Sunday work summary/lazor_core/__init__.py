@@ -1,14 +1,31 @@
-from .parser import parse_bff, Board
-from .solver import solve_optimized, get_placeable_positions, get_blocks_to_place
-
-def solve(*args, **kwargs):
-    return solve_optimized(*args, **kwargs)
+from .parser import parse_bff, iter_bff
+from .board import Board
+from .simulator import simulate_board
+from .ir import compile_bffc, load_bffc
+from .corpus import Corpus, iter_corpus, pack_corpus
+from .backward import backward_prune, target_reach
+from .solver import (
+    solve, solve_optimized, iter_solutions, count_solutions, get_placeable_positions, get_blocks_to_place,
+)
+from .anytime import SolveResult
 
 __all__ = [
     "parse_bff",
     "Board",
+    "simulate_board",
     "solve",
     "solve_optimized",
+    "iter_solutions",
+    "count_solutions",
+    "SolveResult",
     "get_placeable_positions",
     "get_blocks_to_place",
+    "compile_bffc",
+    "load_bffc",
+    "iter_bff",
+    "Corpus",
+    "iter_corpus",
+    "pack_corpus",
+    "backward_prune",
+    "target_reach",
 ]
@@ -0,0 +1,75 @@
+# lazor_core/anytime.py
+"""Deadlines and best-so-far results (``--time-limit``, :func:`lazor_core.solver.solve`).
+
+A deadline is a :func:`time.monotonic` timestamp, so it means the same thing
+in worker processes. :func:`stop_at` turns it into a ``should_stop`` hook for
+the searches, which poll it every few hundred layouts (every few dozen
+conflicts for the sat strategy); a run overshoots its deadline by about one
+poll interval, a few milliseconds on the kernel backend.
+
+:class:`SolveResult` is what an anytime solve returns: the status, the solution
+or the best partial layout seen (with its hit count, as tracked by
+``--diagnose``), and :meth:`coverage` of the search that produced it.
+"""
+from __future__ import annotations
+import time
+from dataclasses import asdict, dataclass
+from typing import Callable, List, Optional
+
+SOLVED, TIMEOUT, EXHAUSTED, INTERRUPTED = "solved", "timeout", "exhausted", "interrupted"
+
+Grid = List[List[str]]
+
+
+def deadline_in(seconds: Optional[float]) -> Optional[float]:
+    """Deadline ``seconds`` from now (None stays None)."""
+    return None if seconds is None else time.monotonic() + seconds
+
+
+def stop_at(deadline: float, also: Optional[Callable[[], bool]] = None) -> Callable[[], bool]:
+    """``should_stop`` hook that fires once ``deadline`` has passed (or ``also`` fires)."""
+    clock = time.monotonic
+    if also is None:
+        return lambda: clock() >= deadline
+    return lambda: also() or clock() >= deadline
+
+
+@dataclass
+class SolveResult:
+    """Outcome of one solve.
+
+    ``status`` is ``"solved"`` (``grid`` holds the solution), ``"timeout"`` (the
+    deadline passed first), ``"interrupted"`` (SIGTERM stopped a checkpointed
+    run, see :mod:`lazor_core.checkpoint`) or ``"exhausted"`` (no layout solves
+    the board).
+    ``best_grid`` is the layout lighting the most targets seen so far
+    (``best_hit`` of ``targets``) and ``coverage`` the share of the search space
+    decided before the run stopped (None when the strategy cannot tell).
+    ``reason`` is the :mod:`lazor_core.feasibility` certificate when a pre-solve
+    check proved the board unsolvable without searching.
+    """
+    status: str
+    grid: Optional[Grid] = None
+    best_hit: int = 0
+    best_grid: Optional[Grid] = None
+    targets: int = 0
+    coverage: Optional[float] = None
+    layouts: int = 0
+    elapsed: float = 0.0
+    reason: Optional[str] = None
+
+    @property
+    def solved(self) -> bool:
+        return self.status == SOLVED
+
+    def as_dict(self) -> dict:
+        d = asdict(self)
+        for key in ("grid", "best_grid"):
+            if d[key] is not None:
+                d[key] = ["".join(row) for row in d[key]]
+        return d
+
+    def report(self) -> str:
+        cov = "-" if self.coverage is None else f"{self.coverage:.1%}"
+        return (f"[Result] {self.status} after {self.elapsed:.3f}s: best hit {self.best_hit}/{self.targets}, "
+                f"{cov} of the search space covered ({self.layouts:,} layouts)")
@@ -0,0 +1,218 @@
+# lazor_core/backward.py
+"""Backward reachability from the targets (search-space pruning).
+
+A target is lit by a beam landing on it from one of its four diagonal
+neighbours. Walking the lattice backwards from those landing steps — straight
+through empty, ``x`` and fixed cells, and through every turn an open slot
+could make — gives the states from which the target can be reached at all.
+
+:func:`backward_prune` then asks, for each target and each open slot on one of
+those backward paths, which block kinds keep the target reachable from a laser
+when that slot is fixed and every other slot may hold anything. A kind that
+fails is impossible in any solution; a slot where "empty" fails needs a block
+there. The searches in :mod:`lazor_core.search` (``prune=``) skip those
+assignments, :class:`lazor_core.sat.SatSearch` adds them as unit clauses, and
+:meth:`TargetPrune.report` says how much of the search space they remove.
+
+Leaving a slot empty and putting B in it differ only in that B stops the
+beam, so B can only succeed where empty does; C does everything empty does and
+more. That cuts the per-slot checks to at most three graph searches.
+
+:func:`target_reach` keeps the same backward sets per lattice state: the
+targets a beam in that state could still light under some layout. The kernel's
+``FAST`` trace mode stops a trace once no live beam can light the targets that
+are still dark.
+"""
+from __future__ import annotations
+from dataclasses import dataclass, field
+from math import comb
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from .kernel import EMPTY, KIND_A, KIND_B, KIND_C, KIND_LETTERS, CompiledBoard
+
+ALL_KINDS = (1 << EMPTY) | (1 << KIND_A) | (1 << KIND_B) | (1 << KIND_C)
+
+
+@dataclass
+class TargetPrune:
+    """Per-cell allowed kinds (bit ``1 << kind``) implied by the targets.
+
+    ``required`` maps each reachable target to the open slots it constrains, as
+    (cell, allowed-kinds mask) pairs; ``unreachable`` lists targets no layout lights.
+    """
+    allowed: bytearray
+    slots: List[int]
+    required: Dict[Tuple[int, int], List[Tuple[int, int]]] = field(default_factory=dict)
+    unreachable: List[Tuple[int, int]] = field(default_factory=list)
+
+    @property
+    def feasible(self) -> bool:
+        return not self.unreachable
+
+    def forces_block(self, ci: int) -> bool:
+        """True when slot ``ci`` cannot stay empty."""
+        return not self.allowed[ci] & (1 << EMPTY)
+
+    def space(self, inventory: Dict[str, int], pruned: bool = True) -> int:
+        """Layouts placing exactly ``inventory`` (respecting the allowed kinds when ``pruned``)."""
+        na, nb, nc = inventory.get("A", 0), inventory.get("B", 0), inventory.get("C", 0)
+        if not pruned:
+            n = len(self.slots)
+            return comb(n, na) * comb(n - na, nb) * comb(n - na - nb, nc) if na + nb + nc <= n else 0
+        if not self.feasible:
+            return 0
+        ways = {(0, 0, 0): 1}
+        for ci in self.slots:
+            ok = self.allowed[ci]
+            nxt: Dict[Tuple[int, int, int], int] = {}
+            for (a, b, c), w in ways.items():
+                for code, key in ((EMPTY, (a, b, c)), (KIND_A, (a + 1, b, c)),
+                                  (KIND_B, (a, b + 1, c)), (KIND_C, (a, b, c + 1))):
+                    if ok >> code & 1 and key[0] <= na and key[1] <= nb and key[2] <= nc:
+                        nxt[key] = nxt.get(key, 0) + w
+            ways = nxt
+        return ways.get((na, nb, nc), 0)
+
+    def report(self, inventory: Dict[str, int], W: int) -> str:
+        before, after = self.space(inventory, pruned=False), self.space(inventory)
+        removed = before - after
+        share = f"{removed / before:.1%}" if before else "-"
+        lines = [f"[Backward] layouts {before:,} -> {after:,} (removed {removed:,}, {share})"]
+        for t in self.unreachable:
+            lines.append(f"  target {t}: no laser can reach it")
+        for t, cells in self.required.items():
+            if cells:
+                desc = ", ".join(f"({ci // W},{ci % W})∈{{{_letters(mask)}}}" for ci, mask in cells)
+                lines.append(f"  target {t}: {desc}")
+        return "\n".join(lines)
+
+
+def _letters(mask: int) -> str:
+    return "".join("o" if code == EMPTY else KIND_LETTERS[code] for code in range(4) if mask >> code & 1)
+
+
+def _moves(cb: CompiledBoard, s: int, kinds: int):
+    """(successor, lands) for the steps out of ``s`` possible when the cell may hold ``kinds``."""
+    if kinds & ((1 << EMPTY) | (1 << KIND_C)):
+        yield cb.straight[s], True
+    if kinds & (1 << KIND_A):
+        yield cb.bounce[s], True
+    if kinds & (1 << KIND_C):
+        yield cb.spawn[s], False
+
+
+def _kinds_of(cb: CompiledBoard, open_cells: Set[int]) -> List[int]:
+    return [ALL_KINDS if ci in open_cells else 1 << cb.base_cells[ci] for ci in range(cb.n_cells + 1)]
+
+
+def _closure(cb: CompiledBoard, kinds_of: List[int]):
+    """Predecessor lists over every step some layout allows, and the landing states per target."""
+    preds: Dict[int, List[int]] = {}
+    landing: List[List[int]] = [[] for _ in cb.targets]   # states whose landing step lights target k
+    forward: Set[int] = set()
+    stack = list(cb.starts)
+    while stack:
+        s = stack.pop()
+        if s < 0 or s in forward:
+            continue
+        forward.add(s)
+        kinds = kinds_of[cb.cell_of[s]]
+        for dst, _ in _moves(cb, s, kinds):
+            if dst >= 0:
+                preds.setdefault(dst, []).append(s)
+                stack.append(dst)
+        if kinds & ~(1 << KIND_B):
+            for k in range(len(cb.targets)):
+                if cb.hit_bit[s] >> k & 1:
+                    landing[k].append(s)
+    return preds, landing
+
+
+def _backward(preds: Dict[int, List[int]], lands: Sequence[int]) -> Set[int]:
+    """States that can still reach one of the ``lands`` states."""
+    back: Set[int] = set()
+    stack = list(lands)
+    while stack:
+        s = stack.pop()
+        if s in back:
+            continue
+        back.add(s)
+        stack.extend(preds.get(s, ()))
+    return back
+
+
+def target_reach(cb: CompiledBoard, slots: Sequence[int], prune: Optional[TargetPrune] = None) -> List[int]:
+    """Per lattice state, the bitmask of targets a beam there could light under some layout.
+
+    With ``prune`` only the kinds it allows are considered, which gives tighter masks.
+    """
+    kinds_of = list(prune.allowed) if prune is not None else _kinds_of(cb, set(slots))
+    preds, landing = _closure(cb, kinds_of)
+    reach = [0] * cb.n_states
+    for k, lands in enumerate(landing):
+        bit = 1 << k
+        for s in _backward(preds, lands):
+            reach[s] |= bit
+    return reach
+
+
+def backward_prune(cb: CompiledBoard, slots: Sequence[int],
+                   should_stop: Optional[Callable[[], bool]] = None) -> Optional[TargetPrune]:
+    """Kinds each open slot may hold without cutting some target off from every laser.
+
+    ``should_stop`` is polled before each per-slot check; once it fires the
+    pass gives up and returns ``None`` (search without pruning).
+    """
+    open_cells = set(slots)
+    kinds_of = _kinds_of(cb, open_cells)
+    preds, landing = _closure(cb, kinds_of)
+
+    allowed = bytearray(kinds_of)
+    prune = TargetPrune(allowed=allowed, slots=list(slots))
+    starts = set(cb.starts)
+    for k, t in enumerate(cb.targets):
+        # states that can still reach a landing step of target k
+        back = _backward(preds, landing[k])
+        if not back & starts:
+            prune.unreachable.append(t)
+            continue
+        lands = set(landing[k])
+        on_path = sorted({cb.cell_of[s] for s in back} & open_cells)
+        required: List[Tuple[int, int]] = []
+        for ci in on_path:
+            if should_stop is not None and should_stop():
+                return None
+            ok = 0
+            if _reaches(cb, kinds_of, back, lands, ci, 1 << EMPTY):
+                ok |= (1 << EMPTY) | (1 << KIND_C)
+                if _reaches(cb, kinds_of, back, lands, ci, 1 << KIND_B):
+                    ok |= 1 << KIND_B
+            elif _reaches(cb, kinds_of, back, lands, ci, 1 << KIND_C):
+                ok |= 1 << KIND_C
+            if _reaches(cb, kinds_of, back, lands, ci, 1 << KIND_A):
+                ok |= 1 << KIND_A
+            if ok != ALL_KINDS:
+                required.append((ci, ok))
+                allowed[ci] &= ok
+        prune.required[t] = required
+    return prune
+
+
+def _reaches(cb: CompiledBoard, kinds_of: List[int], back: Set[int], lands: Set[int],
+             fixed: int, kinds: int) -> bool:
+    """Can a laser reach one of the ``lands`` states (and land) with cell ``fixed`` limited to ``kinds``?"""
+    seen: Set[int] = set()
+    stack = [s for s in cb.starts if s in back]
+    while stack:
+        s = stack.pop()
+        if s in seen:
+            continue
+        seen.add(s)
+        ci = cb.cell_of[s]
+        ks = kinds if ci == fixed else kinds_of[ci]
+        if s in lands and ks & ~(1 << KIND_B):
+            return True
+        for dst, _ in _moves(cb, s, ks):
+            if dst in back:
+                stack.append(dst)
+    return False
@@ -0,0 +1,130 @@
+# lazor_core/batch.py
+"""NumPy lockstep evaluator for blocks of candidate layouts.
+
+:func:`trace_batch` takes N layouts as an ``(N, H, W)`` int8 array of kernel
+kind codes (``EMPTY``/``KIND_A``/``KIND_B``/``KIND_C``) and advances the beams of
+every layout together: each step is a handful of vectorized gathers over the
+:class:`lazor_core.kernel.CompiledBoard` tables, so the Python loop runs once per
+beam step instead of once per beam step per layout.
+
+The live beams of all layouts form one flat front of ``layout * n_states +
+state`` indices. Each layout may hold at most ``max_beams`` live beams; a refract
+split adds its reflected copy to the front, and a layout that goes over the
+bound is dropped from the lockstep and re-traced with
+:func:`lazor_core.kernel.trace_mask` at the end, so the result is always exact.
+Per-layout visited flags play the role of the kernel's ``seen`` array (two beams
+landing on the same state in the same step are merged).
+
+NumPy is optional; without it :data:`HAVE_NUMPY` is False and the evaluator
+raises ImportError.
+"""
+from __future__ import annotations
+from typing import Optional
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+from .kernel import KIND_A, KIND_B, KIND_C, CompiledBoard, trace_mask
+
+HAVE_NUMPY = np is not None
+MAX_TARGETS = 63     # hit masks are int64
+DEFAULT_BEAMS = 32   # live beams per layout before falling back to the kernel
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError("numpy is required for the batch evaluator (pip install numpy)")
+
+
+class BatchTables:
+    """The kernel tables as NumPy arrays, built once per compiled board."""
+
+    def __init__(self, cb: CompiledBoard):
+        _require_numpy()
+        if len(cb.targets) > MAX_TARGETS:
+            raise ValueError(f"batch evaluator supports at most {MAX_TARGETS} targets")
+        self.cb = cb
+        self.cell_of = np.asarray(cb.cell_of, dtype=np.int32)
+        self.straight = np.asarray(cb.straight, dtype=np.int32)
+        self.bounce = np.asarray(cb.bounce, dtype=np.int32)
+        self.spawn = np.asarray(cb.spawn, dtype=np.int32)
+        n_t = len(cb.targets)
+        # Target index lit by each state's step; n_t (a spare column) for none
+        self.target_of = np.asarray(
+            [b.bit_length() - 1 if b else n_t for b in cb.hit_bit], dtype=np.int64)
+        self.weights = np.left_shift(np.int64(1), np.arange(n_t, dtype=np.int64))
+        self.starts = np.asarray(sorted(set(cb.starts)), dtype=np.int32)
+        self.base = np.frombuffer(bytes(cb.base_cells), dtype=np.int8)
+
+
+def trace_batch(cb: CompiledBoard, layouts, max_beams: int = DEFAULT_BEAMS,
+                tables: Optional[BatchTables] = None):
+    """Lit-target masks, shape (N,) int64, for an (N, H, W) int8 block of layouts."""
+    _require_numpy()
+    layouts = np.asarray(layouts, dtype=np.int8)
+    n = layouts.shape[0]
+    cells = np.zeros((n, cb.n_cells + 1), dtype=np.int8)
+    cells[:, :cb.n_cells] = layouts.reshape(n, cb.n_cells)
+    return trace_cells_batch(cb, cells, max_beams, tables)
+
+
+def trace_cells_batch(cb: CompiledBoard, cells, max_beams: int = DEFAULT_BEAMS,
+                      tables: Optional[BatchTables] = None):
+    """:func:`trace_batch` on flat ``(N, n_cells + 1)`` kernel cell rows.
+
+    The last column is the off-grid sentinel and must stay EMPTY.
+    """
+    t = tables if tables is not None else BatchTables(cb)
+    cells = np.ascontiguousarray(cells, dtype=np.int8)
+    n = cells.shape[0]
+    n_states = cb.n_states
+    row_len = cb.n_cells + 1
+    n_t = len(cb.targets)
+    if n == 0 or not len(t.starts):
+        return np.zeros(n, dtype=np.int64)
+    flat_cells = cells.reshape(-1)
+
+    # The beam front: one flat (layout, state) index per live beam
+    front = (np.arange(n, dtype=np.int64)[:, None] * n_states + t.starts).reshape(-1)
+    visited = np.zeros(n * n_states, dtype=np.bool_)
+    owner = np.empty(n * n_states, dtype=np.int32)
+    lit = np.zeros(n * (n_t + 1), dtype=np.bool_)
+    overflow = np.zeros(n, dtype=np.bool_)
+    bound = max(max_beams, len(t.starts))
+
+    while len(front):
+        # Drop beams on an already visited state; merge beams sharing a fresh one
+        front = front[~visited[front]]
+        pos = np.arange(len(front), dtype=np.int32)
+        owner[front] = pos
+        front = front[owner[front] == pos]
+        if not len(front):
+            break
+        visited[front] = True
+
+        row = front // n_states
+        s = front - row * n_states
+        kind = flat_cells[row * row_len + t.cell_of[s]]
+        live = kind != KIND_B
+        if not live.all():
+            row, s, kind = row[live], s[live], kind[live]
+        lit[row * (n_t + 1) + t.target_of[s]] = True
+
+        nxt = np.where(kind == KIND_A, t.bounce[s], t.straight[s])
+        split = kind == KIND_C
+        if split.any():
+            row = np.concatenate((row, row[split]))
+            nxt = np.concatenate((nxt, t.spawn[s[split]]))
+            over = np.bincount(row, minlength=n) > bound
+            if over.any():
+                overflow |= over
+                nxt[over[row]] = -1
+        ok = nxt >= 0
+        front = row[ok] * n_states + nxt[ok]
+
+    hits = lit.reshape(n, n_t + 1)[:, :n_t].astype(np.int64) @ t.weights
+    for i in np.nonzero(overflow)[0]:
+        hits[i] = trace_mask(cb, bytearray(cells[i].tobytes()))
+    return hits
@@ -0,0 +1,177 @@
+# lazor_core/bitboard.py
+"""Bitboard tracer backend.
+
+A layout is three Python ints, the A, B and C occupancy masks (bit ``r * W + c``
+per cell), and the result is the lit-target mask that is compared with the full
+mask in one equality check. The per-state tables come from
+:class:`lazor_core.kernel.CompiledBoard`; the only extra table is ``cell_bit[s]``,
+the bit the crossing out of state ``s`` must test (0 when it leaves the grid).
+No grid is copied and no ``Board`` is built per candidate.
+"""
+from __future__ import annotations
+from typing import List, Sequence, Tuple
+
+from .kernel import EMPTY, KIND_A, KIND_B, KIND_C, CompiledBoard
+
+Occupancy = Tuple[int, int, int]  # (A, B, C) masks
+
+
+class BitBoard:
+    """Bit tables for a compiled board."""
+
+    __slots__ = ("cb", "cell_bit", "base")
+
+    def __init__(self, cb: CompiledBoard):
+        self.cb = cb
+        n_cells = cb.n_cells
+        self.cell_bit = [0 if ci == n_cells else 1 << ci for ci in cb.cell_of]
+        self.base = self.occupancy(cb.base_cells)
+
+    def occupancy(self, cells: Sequence[int]) -> Occupancy:
+        occ = [0, 0, 0, 0]
+        for ci in range(self.cb.n_cells):
+            occ[cells[ci]] |= 1 << ci
+        return occ[KIND_A], occ[KIND_B], occ[KIND_C]
+
+    def cells_for(self, a: int, b: int, c: int) -> bytearray:
+        """Kernel cell array for an occupancy (for grid_for and diagnostics)."""
+        cells = bytearray(self.cb.n_cells + 1)
+        for ci in range(self.cb.n_cells):
+            bit = 1 << ci
+            if a & bit:
+                cells[ci] = KIND_A
+            elif b & bit:
+                cells[ci] = KIND_B
+            elif c & bit:
+                cells[ci] = KIND_C
+        return cells
+
+
+class OccupancyView:
+    """Read-only ``cells[ci]``-style access to an occupancy (for nogood matching)."""
+
+    __slots__ = ("a", "b", "c")
+
+    def __init__(self, a: int, b: int, c: int):
+        self.a, self.b, self.c = a, b, c
+
+    def __getitem__(self, ci: int) -> int:
+        bit = 1 << ci
+        if self.a & bit:
+            return KIND_A
+        if self.b & bit:
+            return KIND_B
+        if self.c & bit:
+            return KIND_C
+        return EMPTY
+
+
+def trace_bits(bb: BitBoard, a: int, b: int, c: int) -> int:
+    """Trace every laser over the occupancy masks; returns the lit-target mask."""
+    cb = bb.cb
+    cell_bit = bb.cell_bit
+    straight = cb.straight
+    bounce = cb.bounce
+    spawn = cb.spawn
+    hit_bit = cb.hit_bit
+    seen = cb.visited.flags
+    epoch = cb.visited.next_epoch()
+    stack = list(cb.starts)
+    hit = 0
+
+    while stack:
+        s = stack.pop()
+        while s >= 0:
+            if seen[s] == epoch:
+                break
+            seen[s] = epoch
+            bit = cell_bit[s]
+            if a & bit:
+                nxt = bounce[s]
+            elif b & bit:
+                break
+            elif c & bit:
+                stack.append(spawn[s])
+                nxt = straight[s]
+            else:
+                nxt = straight[s]
+            hit |= hit_bit[s]
+            s = nxt
+
+    return hit
+
+
+def trace_bits_touched(bb: BitBoard, a: int, b: int, c: int, watch: int) -> Tuple[int, List[int]]:
+    """:func:`trace_bits` plus the ``watch`` cells consulted, in first-consulted order."""
+    cb = bb.cb
+    cell_bit = bb.cell_bit
+    straight = cb.straight
+    bounce = cb.bounce
+    spawn = cb.spawn
+    hit_bit = cb.hit_bit
+    seen = cb.visited.flags
+    epoch = cb.visited.next_epoch()
+    stack = list(cb.starts)
+    touched: List[int] = []
+    hit = 0
+
+    while stack:
+        s = stack.pop()
+        while s >= 0:
+            if seen[s] == epoch:
+                break
+            seen[s] = epoch
+            bit = cell_bit[s]
+            if watch & bit:
+                watch ^= bit
+                touched.append(bit.bit_length() - 1)
+            if a & bit:
+                nxt = bounce[s]
+            elif b & bit:
+                break
+            elif c & bit:
+                stack.append(spawn[s])
+                nxt = straight[s]
+            else:
+                nxt = straight[s]
+            hit |= hit_bit[s]
+            s = nxt
+
+    return hit, touched
+
+
+def trace_bits_frontier(bb: BitBoard, a: int, b: int, c: int, undecided: int) -> Tuple[int, int]:
+    """Bitboard :func:`lazor_core.kernel.trace_frontier`; returns (mask, cell or -1)."""
+    cb = bb.cb
+    cell_bit = bb.cell_bit
+    straight = cb.straight
+    bounce = cb.bounce
+    spawn = cb.spawn
+    hit_bit = cb.hit_bit
+    seen = cb.visited.flags
+    epoch = cb.visited.next_epoch()
+    stack = list(cb.starts)
+    hit = 0
+
+    while stack:
+        s = stack.pop()
+        while s >= 0:
+            if seen[s] == epoch:
+                break
+            seen[s] = epoch
+            bit = cell_bit[s]
+            if undecided & bit:
+                return hit, bit.bit_length() - 1
+            if a & bit:
+                nxt = bounce[s]
+            elif b & bit:
+                break
+            elif c & bit:
+                stack.append(spawn[s])
+                nxt = straight[s]
+            else:
+                nxt = straight[s]
+            hit |= hit_bit[s]
+            s = nxt
+
+    return hit, -1
@@ -15,12 +15,17 @@ class Board:
     - `free_blocks` stores counts of blocks available for placement.
     - `lasers` is a list of starting lasers.
     - `points` are required target coordinates (half-block units).
+
+    Blocks placed with `place` are journaled: `undo` removes the latest one and
+    `rollback(snapshot())` returns to an earlier state, so a search can try
+    layouts on one board in place instead of copying it per candidate.
     """
     grid: List[List[str]]
     fixed_blocks: Dict[Tuple[int, int], Block] = field(default_factory=dict)
     free_blocks: Dict[BlockType, int] = field(default_factory=dict)
     lasers: List[Laser] = field(default_factory=list)
     points: Set[Tuple[int, int]] = field(default_factory=set)
+    _journal: List[Tuple[int, int]] = field(default_factory=list, repr=False, compare=False)
 
     @property
     def nrows(self) -> int:
@@ -53,6 +58,34 @@ class Board:
     def remove_block(self, r: int, c: int) -> None:
         self.fixed_blocks.pop((r, c), None)
 
+    def place(self, r: int, c: int, kind: BlockType) -> None:
+        """Place a block at an open cell and journal it (O(1))."""
+        self.place_block(r, c, kind)
+        self._journal.append((r, c))
+
+    def undo(self) -> Tuple[int, int]:
+        """Remove the most recently placed block; returns its cell."""
+        if not self._journal:
+            raise IndexError("nothing to undo")
+        r, c = self._journal.pop()
+        del self.fixed_blocks[(r, c)]
+        return r, c
+
+    def snapshot(self) -> int:
+        """Token for the current placement state, for `rollback`."""
+        return len(self._journal)
+
+    def rollback(self, token: int) -> None:
+        """Undo every placement made since `snapshot` returned `token`."""
+        if not 0 <= token <= len(self._journal):
+            raise ValueError(f"invalid snapshot token {token}")
+        while len(self._journal) > token:
+            self.undo()
+
+    def placed(self) -> List[Tuple[int, int]]:
+        """Cells placed through `place`, oldest first."""
+        return list(self._journal)
+
     @classmethod
     def from_bffspec(cls, spec: BFFSpec) -> "Board":
         # Normalize grid to only 'o'/'x', extract fixed blocks from 'A'/'B'/'C'
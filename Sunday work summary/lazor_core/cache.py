@@ -0,0 +1,122 @@
+# lazor_core/cache.py
+"""Persistent solution cache.
+
+Solutions are stored in a small SQLite file keyed by :func:`puzzle_key`, a
+SHA-256 over the parsed puzzle (letter grid, inventory, lasers and targets, each
+sorted where order carries no meaning), so whitespace, comments and laser or
+target order in the ``.bff`` text do not change the key. The store keeps at most
+``max_entries`` solutions and evicts the least recently used ones.
+
+Only solutions are cached (an exhausted search is not: it cannot be checked
+cheaply). Every hit is re-verified with one kernel trace, plus a check that the
+grid keeps the puzzle's fixed cells and uses exactly the inventory, before it
+is returned; entries that fail are deleted.
+"""
+from __future__ import annotations
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .kernel import CompiledBoard, trace_mask
+
+DEFAULT_PATH = Path(os.environ.get("LAZOR_CACHE", Path.home() / ".cache" / "lazor" / "solutions.sqlite3"))
+DEFAULT_MAX_ENTRIES = 10_000
+
+Grid = List[List[str]]
+
+
+def puzzle_key(grid: Sequence[Sequence[str]], lasers, targets, inventory: Dict[str, int]) -> str:
+    """Canonical hash of a parsed puzzle; ``lasers`` need ``x``/``y``/``vx``/``vy``."""
+    canon = {
+        "grid": ["".join(row) for row in grid],
+        "inventory": [inventory.get(k, 0) for k in "ABC"],
+        "lasers": sorted((l.x, l.y, 1 if l.vx > 0 else -1, 1 if l.vy > 0 else -1) for l in lasers),
+        "targets": sorted({(int(x), int(y)) for x, y in targets}),
+    }
+    return hashlib.sha256(json.dumps(canon, separators=(",", ":")).encode()).hexdigest()
+
+
+def verify_solution(grid0: Sequence[Sequence[str]], lasers, targets, inventory: Dict[str, int],
+                    solution: Sequence[Sequence[str]]) -> bool:
+    """True when ``solution`` is a valid answer to the puzzle (one trace)."""
+    if len(solution) != len(grid0) or any(len(a) != len(b) for a, b in zip(solution, grid0)):
+        return False
+    used = {"A": 0, "B": 0, "C": 0}
+    for row0, row in zip(grid0, solution):
+        for before, after in zip(row0, row):
+            if before == "o" and after in used:
+                used[after] += 1
+            elif before != after:
+                return False
+    if used != {k: inventory.get(k, 0) for k in "ABC"}:
+        return False
+    cb = CompiledBoard(solution, lasers, targets)
+    return trace_mask(cb, cb.base_cells) == cb.full_mask
+
+
+class SolutionCache:
+    """File-backed LRU map from :func:`puzzle_key` to a solution grid."""
+
+    def __init__(self, path=DEFAULT_PATH, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.hits = self.misses = self.rejected = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path), timeout=30)
+        with self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS solutions ("
+                " key TEXT PRIMARY KEY, solution TEXT NOT NULL, last_used INTEGER NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS solutions_lru ON solutions(last_used)")
+
+    def close(self) -> None:
+        self._db.close()
+
+    def __enter__(self) -> "SolutionCache":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM solutions").fetchone()[0]
+
+    def lookup(self, grid, lasers, targets, inventory: Dict[str, int]) -> Optional[Grid]:
+        """Verified cached solution for the puzzle, or None."""
+        key = puzzle_key(grid, lasers, targets, inventory)
+        row = self._db.execute("SELECT solution FROM solutions WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        solution = [list(r) for r in json.loads(row[0])]
+        with self._db:
+            if not verify_solution(grid, lasers, targets, inventory, solution):
+                self.rejected += 1
+                self.misses += 1
+                self._db.execute("DELETE FROM solutions WHERE key = ?", (key,))
+                return None
+            self._db.execute("UPDATE solutions SET last_used = ? WHERE key = ?", (time.time_ns(), key))
+        self.hits += 1
+        return solution
+
+    def store(self, grid, lasers, targets, inventory: Dict[str, int], solution: Sequence[Sequence[str]]) -> None:
+        key = puzzle_key(grid, lasers, targets, inventory)
+        with self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO solutions (key, solution, last_used) VALUES (?, ?, ?)",
+                (key, json.dumps(["".join(r) for r in solution]), time.time_ns()),
+            )
+            self._db.execute(
+                "DELETE FROM solutions WHERE key NOT IN"
+                " (SELECT key FROM solutions ORDER BY last_used DESC LIMIT ?)",
+                (self.max_entries,),
+            )
+
+    def stats(self) -> Tuple[int, int, int]:
+        """(hits, misses, rejected) since this object was opened."""
+        return self.hits, self.misses, self.rejected
@@ -0,0 +1,343 @@
+# lazor_core/cdcl.py
+"""A small incremental CDCL SAT solver (pure Python, no external binary).
+
+Literals use the DIMACS convention: variable ``v`` (1-based, from
+:meth:`Solver.new_var`) is the literal ``v`` and its negation ``-v``. Inside,
+literal ``±v`` is stored as ``2v`` / ``2v + 1`` so that ``lit ^ 1`` negates it.
+
+The engine is the usual MiniSat design:
+
+- two watched literals per clause (the watched pair is ``clause[0:2]``; the
+  literal a clause implies is always ``clause[0]``);
+- first-UIP conflict analysis with clause learning, local minimisation and
+  non-chronological backjumping;
+- VSIDS variable activities (a lazy binary heap), phase saving and Luby
+  restarts;
+- learned clauses are rated by LBD and the worse half is dropped at a restart
+  once there are more than ``max_learnts`` of them.
+
+It is incremental: clauses may be added between calls to :meth:`Solver.solve`
+(the search restarts from level 0 and keeps its learned clauses).
+"""
+from __future__ import annotations
+from heapq import heapify, heappop, heappush
+from typing import Callable, Iterable, List, Optional
+
+STOP_POLL = 1024         # propagations between should_stop polls (a few ms)
+RESTART_BASE = 100       # conflicts per Luby unit
+VAR_DECAY = 0.95
+LEARNTS_START = 2000
+
+
+def _luby(i: int) -> int:
+    """i-th element (0-based) of the Luby sequence 1 1 2 1 1 2 4 ..."""
+    size, seq = 1, 0
+    while size < i + 1:
+        seq += 1
+        size = 2 * size + 1
+    while size - 1 != i:
+        size = (size - 1) >> 1
+        seq -= 1
+        i %= size
+    return 1 << seq
+
+
+class _Learnt(list):
+    """A learned clause (a list of internal literals) with its LBD."""
+    __slots__ = ("lbd",)
+
+
+class Solver:
+    """Incremental CDCL solver; see the module docstring."""
+
+    def __init__(self):
+        self.n_vars = 0
+        self.ok = True              # False once the clauses are unsatisfiable at level 0
+        self.val: List[int] = [0, 0]  # per internal literal: 1 true, -1 false, 0 unassigned
+        self.level: List[int] = [0]
+        self.reason: List[Optional[list]] = [None]
+        self.activity: List[float] = [0.0]
+        self.phase: List[int] = [1]  # saved polarity bit (1 = negative) per variable
+        self.watches: List[List[list]] = [[], []]
+        self.trail: List[int] = []
+        self.trail_lim: List[int] = []
+        self.qhead = 0
+        self.heap: List = []
+        self.var_inc = 1.0
+        self.learnts: List[_Learnt] = []
+        self.max_learnts = LEARNTS_START
+        self._seen: List[int] = [0]
+
+        self.conflicts = 0
+        self.decisions = 0
+        self.propagations = 0
+        self.restarts = 0
+
+    # -- building ------------------------------------------------------------
+
+    def new_var(self) -> int:
+        self.n_vars += 1
+        v = self.n_vars
+        self.val += (0, 0)
+        self.level.append(0)
+        self.reason.append(None)
+        self.activity.append(0.0)
+        self.phase.append(1)
+        self.watches += ([], [])
+        self._seen.append(0)
+        heappush(self.heap, (0.0, v))
+        return v
+
+    def add_clause(self, lits: Iterable[int]) -> bool:
+        """Add a clause of DIMACS literals; False if the formula became unsatisfiable."""
+        if not self.ok:
+            return False
+        if self.trail_lim:
+            self._cancel_until(0)
+        val = self.val
+        clause: List[int] = []
+        for lit in lits:
+            if not 0 < abs(lit) <= self.n_vars:
+                raise ValueError(f"unknown variable in literal {lit}")
+            p = 2 * lit if lit > 0 else -2 * lit + 1
+            if val[p] == 1 or p ^ 1 in clause:
+                return True     # satisfied at level 0, or a tautology
+            if val[p] == 0 and p not in clause:
+                clause.append(p)
+        if not clause:
+            self.ok = False
+        elif len(clause) == 1:
+            self._enqueue(clause[0], None)
+            self.ok = self._propagate() is None
+        else:
+            self.watches[clause[0]].append(clause)
+            self.watches[clause[1]].append(clause)
+        return self.ok
+
+    # -- search --------------------------------------------------------------
+
+    def solve(self, should_stop: Optional[Callable[[], bool]] = None) -> Optional[bool]:
+        """True (a model is available through :meth:`value`), False (unsatisfiable)
+        or None when ``should_stop`` returned true.
+
+        ``should_stop`` is polled every ``STOP_POLL`` propagations, between
+        propagation passes; a conflict costs anything from a few to thousands of
+        propagations, so polling by conflicts would let a hard formula overrun.
+        """
+        if not self.ok:
+            return False
+        self._cancel_until(0)
+        if self._propagate() is not None:
+            self.ok = False
+            return False
+        restart = 0
+        budget = RESTART_BASE * _luby(restart)
+        poll_at = self.propagations + STOP_POLL
+        while True:
+            if should_stop is not None and self.propagations >= poll_at:
+                poll_at = self.propagations + STOP_POLL
+                if should_stop():
+                    self._cancel_until(0)
+                    return None
+            confl = self._propagate()
+            if confl is not None:
+                self.conflicts += 1
+                budget -= 1
+                if not self.trail_lim:
+                    self.ok = False
+                    return False
+                learnt, back = self._analyze(confl)
+                self._cancel_until(back)
+                if len(learnt) == 1:
+                    self._enqueue(learnt[0], None)
+                else:
+                    clause = _Learnt(learnt)
+                    clause.lbd = len({self.level[p >> 1] for p in learnt})
+                    self.watches[learnt[0]].append(clause)
+                    self.watches[learnt[1]].append(clause)
+                    self.learnts.append(clause)
+                    self._enqueue(learnt[0], clause)
+                self.var_inc /= VAR_DECAY
+                continue
+            if budget <= 0:
+                restart += 1
+                self.restarts += 1
+                budget = RESTART_BASE * _luby(restart)
+                self._cancel_until(0)
+                if len(self.learnts) > self.max_learnts:
+                    self._reduce_db()
+                continue
+            p = self._pick_branch()
+            if p < 0:
+                return True
+            self.decisions += 1
+            self.trail_lim.append(len(self.trail))
+            self._enqueue(p, None)
+
+    def value(self, v: int) -> Optional[bool]:
+        """Value of variable ``v`` in the current assignment (None if unassigned)."""
+        x = self.val[2 * v]
+        return None if x == 0 else x > 0
+
+    def model(self) -> List[bool]:
+        """Values of variables 1..n after a satisfiable :meth:`solve` (index 0 unused)."""
+        return [False] + [self.val[2 * v] > 0 for v in range(1, self.n_vars + 1)]
+
+    # -- internals -----------------------------------------------------------
+
+    def _enqueue(self, p: int, reason: Optional[list]) -> None:
+        v = p >> 1
+        self.val[p] = 1
+        self.val[p ^ 1] = -1
+        self.level[v] = len(self.trail_lim)
+        self.reason[v] = reason
+        self.trail.append(p)
+
+    def _propagate(self) -> Optional[list]:
+        """Unit propagation over the trail; returns a conflicting clause or None."""
+        val = self.val
+        watches = self.watches
+        trail = self.trail
+        level = self.level
+        reason = self.reason
+        depth = len(self.trail_lim)
+        while self.qhead < len(trail):
+            false_lit = trail[self.qhead] ^ 1
+            self.qhead += 1
+            self.propagations += 1
+            ws = watches[false_lit]
+            keep: List[list] = []
+            for i in range(len(ws)):
+                c = ws[i]
+                if not c:
+                    continue            # deleted learned clause
+                if c[0] == false_lit:
+                    c[0], c[1] = c[1], false_lit
+                first = c[0]
+                if val[first] == 1:
+                    keep.append(c)
+                    continue
+                for k in range(2, len(c)):
+                    lit = c[k]
+                    if val[lit] != -1:
+                        c[1], c[k] = lit, false_lit
+                        watches[lit].append(c)
+                        break
+                else:
+                    keep.append(c)
+                    if val[first] == -1:
+                        keep.extend(ws[i + 1:])
+                        watches[false_lit] = keep
+                        self.qhead = len(trail)
+                        return c
+                    val[first] = 1
+                    val[first ^ 1] = -1
+                    level[first >> 1] = depth
+                    reason[first >> 1] = c
+                    trail.append(first)
+            watches[false_lit] = keep
+        return None
+
+    def _analyze(self, confl: list):
+        """First-UIP learned clause (asserting literal first) and the backjump level."""
+        seen = self._seen
+        level = self.level
+        reason = self.reason
+        trail = self.trail
+        depth = len(self.trail_lim)
+        learnt = [0]
+        pending = 0
+        p = -1
+        idx = len(trail) - 1
+        clause = confl
+        while True:
+            for q in (clause if p < 0 else clause[1:]):
+                v = q >> 1
+                if not seen[v] and level[v] > 0:
+                    seen[v] = 1
+                    self._bump(v)
+                    if level[v] >= depth:
+                        pending += 1
+                    else:
+                        learnt.append(q)
+            while not seen[trail[idx] >> 1]:
+                idx -= 1
+            p = trail[idx]
+            idx -= 1
+            clause = reason[p >> 1]
+            seen[p >> 1] = 0
+            pending -= 1
+            if pending == 0:
+                break
+        learnt[0] = p ^ 1
+
+        # local minimisation: drop literals implied by the rest of the clause
+        kept = [learnt[0]]
+        for q in learnt[1:]:
+            r = reason[q >> 1]
+            if r is None or any(not seen[x >> 1] and level[x >> 1] > 0 for x in r[1:]):
+                kept.append(q)
+        for q in learnt[1:]:
+            seen[q >> 1] = 0
+        learnt = kept
+
+        back = 0
+        if len(learnt) > 1:
+            best = max(range(1, len(learnt)), key=lambda i: level[learnt[i] >> 1])
+            learnt[1], learnt[best] = learnt[best], learnt[1]
+            back = level[learnt[1] >> 1]
+        return learnt, back
+
+    def _bump(self, v: int) -> None:
+        act = self.activity[v] + self.var_inc
+        self.activity[v] = act
+        if act > 1e100:
+            self.activity = [a * 1e-100 for a in self.activity]
+            self.var_inc *= 1e-100
+            self.heap = [(-self.activity[u], u) for u in range(1, self.n_vars + 1) if not self.val[2 * u]]
+            heapify(self.heap)
+        elif not self.val[2 * v]:
+            heappush(self.heap, (-act, v))
+
+    def _pick_branch(self) -> int:
+        heap = self.heap
+        val = self.val
+        activity = self.activity
+        while heap:
+            neg_act, v = heappop(heap)
+            if not val[2 * v] and -neg_act == activity[v]:
+                return 2 * v + self.phase[v]
+        for v in range(1, self.n_vars + 1):   # stale heap: fall back to a scan
+            if not val[2 * v]:
+                return 2 * v + self.phase[v]
+        return -1
+
+    def _cancel_until(self, lvl: int) -> None:
+        if len(self.trail_lim) <= lvl:
+            return
+        stop = self.trail_lim[lvl]
+        val = self.val
+        heap = self.heap
+        activity = self.activity
+        for p in self.trail[stop:]:
+            v = p >> 1
+            val[p] = val[p ^ 1] = 0
+            self.reason[v] = None
+            self.phase[v] = p & 1
+            heappush(heap, (-activity[v], v))
+        del self.trail[stop:]
+        del self.trail_lim[lvl:]
+        self.qhead = len(self.trail)
+        if len(heap) > 8 * self.n_vars + 64:
+            self.heap = [(-activity[u], u) for u in range(1, self.n_vars + 1) if not val[2 * u]]
+            heapify(self.heap)
+
+    def _reduce_db(self) -> None:
+        """Drop the worse half of the learned clauses (called at level 0)."""
+        self.learnts.sort(key=lambda c: (c.lbd, len(c)))
+        keep = len(self.learnts) // 2
+        for c in self.learnts[keep:]:
+            if c.lbd > 2:
+                c.clear()       # watchers skip and drop empty clauses
+        self.learnts = [c for c in self.learnts if c]
+        self.max_learnts = int(self.max_learnts * 1.1)
@@ -0,0 +1,149 @@
+# lazor_core/checkpoint.py
+"""Checkpoint and resume for single-process searches (``--checkpoint`` / ``--resume``).
+
+A checkpoint is a small JSON file. It holds the puzzle key
+(:func:`lazor_core.cache.puzzle_key`) and the search options it is only valid
+for, plus the search's :meth:`state`:
+
+- the cursor: the decision path of the node being entered (backtracking), or
+  the position tuples of the next layout (combinations);
+- the best partial layout so far;
+- the search counters, and the trace counters when ``--counters`` is on.
+
+:class:`Checkpointer` is a ``should_stop`` hook. Searches poll it every few
+hundred layouts. It writes the file every ``every`` seconds, and it writes the
+file and stops the search once SIGTERM arrives (or the wrapped hook, e.g. a
+deadline, fires). The file is replaced atomically, so a kill mid-write leaves
+the previous checkpoint intact. Learned nogoods are not saved; a resumed
+combinations run learns them again.
+"""
+from __future__ import annotations
+import json
+import os
+import signal
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+from .anytime import stop_at
+from .cache import puzzle_key
+from .counters import TraceCounters
+
+VERSION = 1
+DEFAULT_EVERY = 60.0  # seconds between periodic checkpoints
+
+
+class CheckpointError(ValueError):
+    """The checkpoint file is unreadable or belongs to another puzzle / search."""
+
+
+def run_meta(grid, lasers, targets, inventory: Dict[str, int], **options) -> Dict[str, object]:
+    """What a checkpoint must match to be resumed: the puzzle key and the search ``options``."""
+    return {"puzzle": puzzle_key(grid, lasers, targets, inventory), **options}
+
+
+def save_checkpoint(path, meta: Dict[str, object], state: dict,
+                    counters: Optional[TraceCounters] = None) -> None:
+    """Write ``state`` with its ``meta`` (puzzle key and search options) atomically."""
+    path = Path(path)
+    doc = {"version": VERSION, "meta": meta, "state": state,
+           "counters": counters.as_dict() if counters is not None else None}
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(doc, separators=(",", ":")))
+    os.replace(tmp, path)
+
+
+def load_checkpoint(path, meta: Dict[str, object]) -> dict:
+    """The checkpoint document at ``path``; its ``meta`` must equal ``meta``."""
+    try:
+        doc = json.loads(Path(path).read_text())
+    except (OSError, ValueError) as e:
+        raise CheckpointError(f"cannot read checkpoint {path}: {e}") from None
+    if doc.get("version") != VERSION:
+        raise CheckpointError(f"checkpoint {path} has version {doc.get('version')}, expected {VERSION}")
+    if doc.get("meta") != meta:
+        diff = sorted(k for k in set(meta) | set(doc.get("meta") or {}) if (doc.get("meta") or {}).get(k) != meta.get(k))
+        raise CheckpointError(f"checkpoint {path} was written for a different run ({', '.join(diff)})")
+    return doc
+
+
+class Checkpointer:
+    """``should_stop`` hook that checkpoints ``search`` to ``path``.
+
+    Use it as a context manager: SIGTERM is caught (main thread only) while it
+    is active, and the previous handler is restored on exit. ``stopped`` says
+    why the search was asked to stop ("sigterm", "deadline" or None).
+    """
+
+    def __init__(self, path, search, meta: Dict[str, object], every: float = DEFAULT_EVERY,
+                 counters: Optional[TraceCounters] = None, also: Optional[Callable[[], bool]] = None):
+        self.path = Path(path)
+        self.search = search
+        self.meta = meta
+        self.every = every
+        self.counters = counters
+        self.also = also
+        self.saves = 0
+        self.stopped: Optional[str] = None
+        self._term = False
+        self._next = time.monotonic() + every
+        self._previous = None
+
+    def __enter__(self) -> "Checkpointer":
+        try:
+            self._previous = signal.signal(signal.SIGTERM, self._on_term)
+        except ValueError:      # not the main thread
+            self._previous = None
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self._previous is not None:
+            signal.signal(signal.SIGTERM, self._previous)
+
+    def _on_term(self, signum, frame) -> None:
+        self._term = True
+
+    def save(self) -> None:
+        save_checkpoint(self.path, self.meta, self.search.state(), self.counters)
+        self.saves += 1
+
+    def __call__(self) -> bool:
+        if self._term:
+            self.stopped = "sigterm"
+        elif self.also is not None and self.also():
+            self.stopped = "deadline"
+        if self.stopped is not None or time.monotonic() >= self._next:
+            self.save()
+            self._next = time.monotonic() + self.every
+        return self.stopped is not None
+
+    def restore(self, doc: dict) -> None:
+        """Load a :func:`load_checkpoint` document into the search (and the trace counters)."""
+        self.search.restore(doc["state"])
+        if self.counters is not None and doc.get("counters"):
+            self.counters.merge(TraceCounters(**doc["counters"]))
+
+    def finish(self) -> None:
+        """Remove the checkpoint once the search has finished (solved or exhausted)."""
+        if self.stopped is None:
+            self.path.unlink(missing_ok=True)
+
+
+def run_checkpointed(search, path, meta: Dict[str, object], every: float = DEFAULT_EVERY, resume: bool = False,
+                     deadline: Optional[float] = None,
+                     counters: Optional[TraceCounters] = None) -> Tuple[Optional[bytearray], Checkpointer]:
+    """Run ``search`` under a :class:`Checkpointer`; returns its result and the checkpointer.
+
+    With ``resume`` the search continues from the checkpoint at ``path`` (a
+    missing file starts a fresh run). The file is removed once the search
+    finishes; it stays behind when SIGTERM or ``deadline`` stopped the run.
+    """
+    ckpt = Checkpointer(path, search, meta, every, counters,
+                        also=stop_at(deadline) if deadline is not None else None)
+    if resume and ckpt.path.exists():
+        ckpt.restore(load_checkpoint(ckpt.path, meta))
+    search.should_stop = ckpt
+    with ckpt:
+        cells = search.run()
+    ckpt.finish()
+    return cells, ckpt
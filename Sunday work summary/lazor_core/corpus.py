@@ -0,0 +1,137 @@
+# lazor_core/corpus.py
+"""Multi-puzzle corpus packs (``.bffpack``).
+
+A pack holds many ``.bff`` texts in one file so that a stress run over tens
+of thousands of boards opens one file instead of tens of thousands::
+
+    header   struct HEADER: magic b"BFFP", version, puzzle count, index offset
+    data     the puzzles as a stream (see lazor_core.parser): "--- <name>" + .bff text
+    index    u64[count + 1]  offset of each puzzle's separator line, then the end of data
+
+:class:`Corpus` maps the file; ``corpus[i]`` seeks through the index and parses
+only that puzzle, and iterating a corpus parses one puzzle at a time. Because
+the data section is a plain stream, ``iter_bff`` over it yields the same puzzles.
+"""
+from __future__ import annotations
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Iterable, Iterator, List, Tuple, Union
+
+from .models import BFFSpec
+from .parser import CHUNK_SIZE, SEPARATOR, iter_raw_bff, parse_bff_bytes
+
+MAGIC = b"BFFP"
+VERSION = 1
+HEADER = struct.Struct("<4sHHQQ")
+SUFFIX = ".bffpack"
+
+PackItem = Union[str, Path, Tuple[str, bytes]]
+
+
+def pack_corpus(items: Iterable[PackItem], out_path) -> int:
+    """Write a ``.bffpack`` from ``.bff`` paths and/or ``(name, bff_bytes)`` pairs.
+
+    Puzzles are streamed to disk one at a time; returns the number written.
+    """
+    out_path = Path(out_path)
+    offsets: List[int] = []
+    tmp = out_path.with_name(out_path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(b"\0" * HEADER.size)
+        for item in items:
+            if isinstance(item, tuple):
+                name, body = item
+            else:
+                name, body = Path(item).stem, Path(item).read_bytes()
+            if "\n" in name:
+                raise ValueError(f"puzzle name must be one line: {name!r}")
+            offsets.append(f.tell())
+            f.write(SEPARATOR + b" " + name.encode("utf-8") + b"\n" + bytes(body).rstrip(b"\n") + b"\n")
+        index_offset = f.tell()
+        offsets.append(index_offset)
+        f.write(struct.pack(f"<{len(offsets)}Q", *offsets))
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, 0, len(offsets) - 1, index_offset))
+    os.replace(tmp, out_path)
+    return len(offsets) - 1
+
+
+class Corpus:
+    """Read-only, memory-mapped view of a ``.bffpack``."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, count, index_offset = HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION:
+            self._map.close()
+            raise ValueError(f"{self.path}: not a version {VERSION} {SUFFIX} file")
+        self._index = struct.unpack_from(f"<{count + 1}Q", self._map, index_offset)
+
+    def close(self) -> None:
+        self._map.close()
+
+    def __enter__(self) -> "Corpus":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._index) - 1
+
+    def _span(self, i: int) -> Tuple[int, int, int]:
+        if not -len(self) <= i < len(self):
+            raise IndexError(f"puzzle index {i} out of range for {len(self)} puzzles")
+        i %= len(self)
+        start, end = self._index[i], self._index[i + 1]
+        eol = self._map.find(b"\n", start, end)
+        return start, eol, end
+
+    def name(self, i: int) -> str:
+        start, eol, _ = self._span(i)
+        return self._map[start + len(SEPARATOR):eol].decode("utf-8").strip() or f"#{i % len(self)}"
+
+    def raw(self, i: int) -> bytes:
+        """The ``.bff`` text of puzzle ``i``."""
+        _, eol, end = self._span(i)
+        return self._map[eol + 1:end]
+
+    def __getitem__(self, i: int) -> Tuple[str, BFFSpec]:
+        return self.name(i), parse_bff_bytes(self.raw(i))
+
+    def __iter__(self) -> Iterator[Tuple[str, BFFSpec]]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def iter_raw(self) -> Iterator[Tuple[str, bytes]]:
+        for i in range(len(self)):
+            yield self.name(i), self.raw(i)
+
+
+def iter_corpus(source, chunk_size: int = CHUNK_SIZE, raw: bool = False) -> Iterator[Tuple[str, BFFSpec]]:
+    """Lazily yield (name, BFFSpec) from a ``.bffpack``, a ``.bff`` (stream) file or a binary file object.
+
+    Unnamed puzzles of a file are named after it: ``<stem>`` for the first,
+    ``<stem>#<index>`` for later ones. With ``raw`` the puzzles are yielded as
+    (name, .bff bytes) and left for the caller to parse.
+    """
+    parse = (lambda body: body) if raw else parse_bff_bytes
+    if hasattr(source, "read"):
+        for name, body in iter_raw_bff(source, chunk_size):
+            yield name, parse(body)
+        return
+    path = Path(source)
+    if path.suffix == SUFFIX:
+        with Corpus(path) as corpus:
+            for name, body in corpus.iter_raw():
+                yield name, parse(body)
+        return
+    with open(path, "rb") as f:
+        for name, body in iter_raw_bff(f, chunk_size):
+            if name.startswith("#"):
+                name = path.stem if name == "#0" else path.stem + name
+            yield name, parse(body)
@@ -0,0 +1,40 @@
+# lazor_core/counters.py
+"""Opt-in counters for the ray tracers.
+
+Pass a :class:`TraceCounters` as the ``counters`` argument of
+``lazor_solver.trace_all_rays``, :func:`lazor_core.simulator.simulate_board`, the
+kernel tracers in :mod:`lazor_core.kernel` or a search (``counters=`` on
+:class:`lazor_core.search.BacktrackSearch` / ``CombinationSearch``); the same
+object accumulates over every trace it is given to. With ``counters=None`` (the
+default) the kernel tracers run their uninstrumented loops unchanged.
+"""
+from __future__ import annotations
+from dataclasses import asdict, dataclass, fields
+from typing import Dict
+
+
+@dataclass
+class TraceCounters:
+    traces: int = 0         # tracer calls
+    steps: int = 0          # lattice steps taken
+    rays: int = 0           # beams started (lasers + refract copies)
+    splits: int = 0         # refract (C) crossings
+    cycles: int = 0         # beams stopped on an already seen state
+    out_of_bounds: int = 0  # beams that left the board
+    absorbed: int = 0       # beams stopped by an opaque (B) block
+    short_circuits: int = 0 # traces stopped once every target was lit
+    fast_fails: int = 0     # traces stopped once no live beam could light the rest
+
+    def merge(self, other: "TraceCounters") -> "TraceCounters":
+        for f in fields(self):
+            setattr(self, f.name, getattr(self, f.name) + getattr(other, f.name))
+        return self
+
+    def as_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+    def report(self) -> str:
+        lines = [f"  {name:<14}{value:>14,}" for name, value in self.as_dict().items()]
+        if self.traces:
+            lines.append(f"  {'steps/trace':<14}{self.steps / self.traces:>14.1f}")
+        return "\n".join(lines)
@@ -0,0 +1,190 @@
+# lazor_core/incremental.py
+"""Incremental re-tracing on top of the compiled kernel.
+
+:class:`IncrementalTracer` keeps the traced beam graph of the current layout
+and changes it one cell at a time, the way :class:`lazor_core.search.BacktrackSearch`
+walks its tree. A cell may be *undecided* (an open slot the search has not
+filled yet): a beam about to consult it stops there, as in
+:func:`lazor_core.kernel.trace_frontier`, and :meth:`IncrementalTracer.frontier`
+answers with the same ``(hit_mask, cell)`` contract.
+
+- Deciding an undecided cell only extends the beams parked in front of it; the
+  states it adds, the parked beams it leaves and the mask before it go on a trail.
+- Changing that cell back pops the trail entry: the states are unvisited, the
+  parked beams dropped and the mask restored, without re-tracing.
+- Any other change (a decided cell changing kind, or undoing anything but the
+  last change) traces the whole layout again and clears the trail.
+
+A backtracking search only makes the first two kinds of change, so each node
+costs the beam segment its decision adds, not a trace of every beam.
+
+Why extending is exact: the visited set is the forward closure of the laser
+starts, and the only states stopped at an undecided cell are the ones parked
+in front of it. Giving the cell a kind therefore adds exactly the closure of
+those states over the unvisited ones, and removes nothing.
+"""
+from __future__ import annotations
+from typing import List, Optional, Sequence, Tuple
+
+from .kernel import DEAD, EMPTY, FAST, FULL, KIND_A, KIND_B, KIND_CODES, CompiledBoard
+
+UNDECIDED = 4   # cell code of an undecided slot (the kernel codes are 0..3)
+
+
+class IncrementalTracer:
+    """Stateful tracer; drive it with :meth:`set_cell` and read :meth:`hits` / :meth:`frontier`."""
+
+    def __init__(self, cb: CompiledBoard, cells: Optional[bytearray] = None,
+                 undecided: Optional[bytearray] = None):
+        self.cb = cb
+        self.cells = bytearray(cells if cells is not None else cb.base_cells)
+        if undecided is not None:
+            for ci in range(cb.n_cells):
+                if undecided[ci]:
+                    self.cells[ci] = UNDECIDED
+        self.rebuilds = 0       # changes that re-traced the whole layout
+        self._rebuild()
+
+    # ---------------------------
+    # Queries
+    # ---------------------------
+
+    def hits(self) -> int:
+        """Lit-target bitmask of the current layout (partial while beams are parked)."""
+        return self._mask
+
+    def solved(self) -> bool:
+        return self._mask == self.cb.full_mask
+
+    def frontier(self, mode: str = FULL, reach: Optional[Sequence[int]] = None) -> Tuple[int, int]:
+        """``(hit_mask, cell)`` with the contract of :func:`lazor_core.kernel.trace_frontier`.
+
+        ``cell`` is the undecided cell in front of the most recently parked beam,
+        or -1 when no beam is parked (the mask is then final). ``SHORT`` / ``FAST``
+        return ``(full_mask, -1)`` once every target is lit, and ``FAST`` returns
+        ``DEAD`` when the parked beams cannot light the targets still dark.
+        """
+        mask = self._mask
+        full = self.cb.full_mask
+        if mode != FULL and mask == full:
+            return mask, -1
+        cells, cell_of, parked = self.cells, self.cb.cell_of, self._parked
+        for s in parked:
+            ci = cell_of[s]
+            if cells[ci] == UNDECIDED:
+                break
+        else:
+            return mask, -1
+        if mode == FAST:
+            live = mask
+            for s in parked:
+                if cells[cell_of[s]] == UNDECIDED:
+                    live |= reach[s]
+            if live != full:
+                return mask, DEAD
+        return mask, ci
+
+    # ---------------------------
+    # Updates
+    # ---------------------------
+
+    def set_cell(self, r: int, c: int, kind: Optional[str]) -> int:
+        """Put ``kind`` ('A'/'B'/'C', None = undecided, anything else = empty) at (r, c); returns hits()."""
+        return self.set_index(r * self.cb.W + c, UNDECIDED if kind is None else KIND_CODES.get(kind, EMPTY))
+
+    def set_index(self, ci: int, code: int) -> int:
+        """Same as :meth:`set_cell` with a flat cell index and kernel kind code (or ``UNDECIDED``)."""
+        cells = self.cells
+        old = cells[ci]
+        if old == code:
+            return self._mask
+        trail = self._trail
+        if trail and trail[-1][0] == ci and trail[-1][1] == code:
+            self._pop(trail.pop())
+        elif old == UNDECIDED:
+            cells[ci] = code
+            self._extend(ci, old)
+        else:
+            cells[ci] = code
+            self._rebuild()
+        return self._mask
+
+    def set_cells(self, cells: Sequence[int]) -> int:
+        """Move to a whole new layout (tracing it again)."""
+        self.cells[:] = bytes(cells)
+        self._rebuild()
+        return self._mask
+
+    # ---------------------------
+    # Internals
+    # ---------------------------
+
+    def _rebuild(self) -> None:
+        self.rebuilds += 1
+        self._visited = bytearray(self.cb.n_states)
+        self._parked: List[int] = []    # visited states stopped in front of an undecided cell, in trace order
+        self._trail: List[tuple] = []   # (cell, old code, mask before, added states)
+        self._mask = 0
+        self._mask = self._trace(list(self.cb.starts), [], self._parked)
+
+    def _extend(self, ci: int, old: int) -> None:
+        cell_of, visited = self.cb.cell_of, self._visited
+        added: List[int] = []
+        entry = (ci, old, self._mask, added)
+        parked: List[int] = []
+        for s in self._parked:
+            parked.append(s)
+            if cell_of[s] == ci:
+                # a fresh trace would meet this beam's continuation here
+                visited[s] = 0
+                self._mask = self._trace([s], added, parked)
+        self._parked = parked
+        self._trail.append(entry)
+
+    def _pop(self, entry: tuple) -> None:
+        ci, old, mask, added = entry
+        visited, cell_of = self._visited, self.cb.cell_of
+        for s in added:
+            visited[s] = 0
+        parked: List[int] = []
+        for s in self._parked:
+            if cell_of[s] == ci:
+                visited[s] = 1
+                parked.append(s)
+            elif visited[s]:
+                parked.append(s)
+        self._parked = parked
+        self.cells[ci] = old
+        self._mask = mask
+
+    def _trace(self, stack: List[int], added: List[int], parked: List[int]) -> int:
+        cb = self.cb
+        cells, cell_of = self.cells, cb.cell_of
+        straight, bounce, spawn, hit_bit = cb.straight, cb.bounce, cb.spawn, cb.hit_bit
+        visited = self._visited
+        hit = self._mask
+
+        while stack:
+            s = stack.pop()
+            while s >= 0:
+                if visited[s]:
+                    break
+                visited[s] = 1
+                added.append(s)
+                k = cells[cell_of[s]]
+                if k == UNDECIDED:
+                    parked.append(s)
+                    break
+                if k == EMPTY:
+                    nxt = straight[s]
+                elif k == KIND_A:
+                    nxt = bounce[s]
+                elif k == KIND_B:
+                    break
+                else:
+                    stack.append(spawn[s])
+                    nxt = straight[s]
+                hit |= hit_bit[s]
+                s = nxt
+
+        return hit
@@ -0,0 +1,191 @@
+# lazor_core/ir.py
+"""Compiled puzzle IR (``.bffc``).
+
+A ``.bffc`` file sits next to its ``.bff`` and holds the parsed puzzle plus the
+:class:`lazor_core.kernel.CompiledBoard` tables in one fixed little-endian
+layout, so loading it is an ``mmap`` and a few ``memoryview.cast`` calls: no
+text parsing, no ``Board.from_bffspec`` and no lattice walk.
+
+Layout (every section starts on an 8-byte boundary)::
+
+    header   struct HEADER: magic b"BFFC", version, SHA-256 of the .bff bytes,
+             W, H, n_states, n_targets, n_lasers, n_starts, inventory A/B/C,
+             then one u64 offset per section (in SECTIONS order)
+    grid     u8[H*W]            letter grid (o/x/A/B/C)
+    lasers   i32[n_lasers*4]    x, y, vx, vy
+    targets  i32[n_targets*2]   unique targets; bit k of a hit mask = targets[k]
+    base     u8[W*H+1]          kernel cell kinds of the fixed grid (+ sentinel)
+    cell_of, straight, bounce, spawn   i32[n_states]
+    hit_bit  u64[n_states]
+    starts   i32[n_starts]
+
+:func:`load_bffc` checks the magic, version and source hash and recompiles
+(rewriting the file atomically) only when the ``.bff`` changed.
+"""
+from __future__ import annotations
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .kernel import CompiledBoard
+from .models import BlockType, Laser
+from .parser import parse_bff
+
+MAGIC = b"BFFC"
+VERSION = 1
+SECTIONS = ("grid", "lasers", "targets", "base", "cell_of", "straight", "bounce", "spawn", "hit_bit", "starts")
+_FORMATS = {"grid": "B", "lasers": "i", "targets": "i", "base": "B", "cell_of": "i", "straight": "i",
+            "bounce": "i", "spawn": "i", "hit_bit": "Q", "starts": "i"}
+HEADER = struct.Struct("<4sHH32s9I4x" + "Q" * len(SECTIONS))
+MAX_TARGETS = 64  # hit_bit is u64
+
+_LETTER = {BlockType.REFLECT: "A", BlockType.OPAQUE: "B", BlockType.REFRACT: "C"}
+
+
+@dataclass
+class CompiledPuzzle:
+    """A loaded ``.bffc``: the puzzle in letter-grid form plus its kernel tables."""
+    grid: List[List[str]]
+    lasers: List[Laser]
+    targets: List[Tuple[int, int]]
+    inventory: Dict[str, int]
+    cb: CompiledBoard
+    source_hash: bytes
+    _map: Optional[mmap.mmap] = None
+
+    @property
+    def open_slots(self) -> List[Tuple[int, int]]:
+        return [(r, c) for r, row in enumerate(self.grid) for c, ch in enumerate(row) if ch == "o"]
+
+    def close(self) -> None:
+        """Release the mapping (the tables of ``cb`` must not be used afterwards)."""
+        if self._map is not None:
+            for name in ("cell_of", "straight", "bounce", "spawn", "hit_bit"):
+                table = getattr(self.cb, name)
+                if isinstance(table, memoryview):
+                    table.release()
+            self._map.close()
+            self._map = None
+
+
+def bffc_path(bff_path) -> Path:
+    return Path(bff_path).with_suffix(".bffc")
+
+
+def compile_bffc(bff_path, out_path=None) -> Path:
+    """Parse ``bff_path`` and write its ``.bffc``; returns the written path."""
+    bff_path = Path(bff_path)
+    out_path = Path(out_path) if out_path is not None else bffc_path(bff_path)
+    source = bff_path.read_bytes()
+    spec = parse_bff(str(bff_path))
+
+    grid = [[tok.upper() if tok.upper() in "ABC" else tok.lower() for tok in row] for row in spec.grid_tokens]
+    lasers = [Laser(l.x, l.y, 1 if l.vx > 0 else -1, 1 if l.vy > 0 else -1) for l in spec.lasers]
+    cb = CompiledBoard(grid, lasers, spec.points)
+    if len(cb.targets) > MAX_TARGETS:
+        raise ValueError(f".bffc supports at most {MAX_TARGETS} targets, got {len(cb.targets)}")
+    inventory = [spec.free_blocks.get(kind, 0) for kind in _LETTER]
+
+    payload = {
+        "grid": b"".join(ch.encode() for row in grid for ch in row),
+        "lasers": [v for l in lasers for v in (l.x, l.y, l.vx, l.vy)],
+        "targets": [v for t in cb.targets for v in t],
+        "base": bytes(cb.base_cells),
+        "cell_of": cb.cell_of, "straight": cb.straight, "bounce": cb.bounce,
+        "spawn": cb.spawn, "hit_bit": cb.hit_bit, "starts": cb.starts,
+    }
+    offsets: List[int] = []
+    chunks: List[bytes] = []
+    pos = HEADER.size
+    for name in SECTIONS:
+        data = payload[name]
+        if not isinstance(data, bytes):
+            data = struct.pack(f"<{len(data)}{_FORMATS[name]}", *data)
+        pad = -pos % 8
+        chunks.append(b"\0" * pad + data)
+        pos += pad
+        offsets.append(pos)
+        pos += len(data)
+
+    header = HEADER.pack(MAGIC, VERSION, 0, hashlib.sha256(source).digest(), cb.W, cb.H, cb.n_states,
+                         len(cb.targets), len(lasers), len(cb.starts), *inventory, *offsets)
+    tmp = out_path.with_name(out_path.name + ".tmp")
+    tmp.write_bytes(header + b"".join(chunks))
+    os.replace(tmp, out_path)
+    return out_path
+
+
+def _header_ok(path: Path, digest: bytes) -> bool:
+    try:
+        with open(path, "rb") as f:
+            head = f.read(HEADER.size)
+    except OSError:
+        return False
+    if len(head) < HEADER.size:
+        return False
+    magic, version, _, source_hash = HEADER.unpack(head)[:4]
+    return magic == MAGIC and version == VERSION and source_hash == digest
+
+
+def load_bffc(bff_path, zero_copy: bool = True) -> CompiledPuzzle:
+    """Load the ``.bffc`` for ``bff_path``, compiling it first if it is missing or stale.
+
+    With ``zero_copy`` the kernel tables are ``memoryview``s over the mapping;
+    otherwise they are copied into lists in one C-level pass each (list
+    indexing is faster in the search loops).
+    """
+    bff_path = Path(bff_path)
+    path = bffc_path(bff_path)
+    digest = hashlib.sha256(bff_path.read_bytes()).digest()
+    if not _header_ok(path, digest):
+        compile_bffc(bff_path, path)
+    return open_bffc(path, zero_copy=zero_copy)
+
+
+def open_bffc(path, zero_copy: bool = True) -> CompiledPuzzle:
+    """Map an existing ``.bffc`` without checking its source."""
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    fields = HEADER.unpack_from(mm)
+    magic, version, _, source_hash, W, H, n_states, n_targets, n_lasers, n_starts, ia, ib, ic = fields[:13]
+    if magic != MAGIC or version != VERSION:
+        mm.close()
+        raise ValueError(f"{path}: not a version {VERSION} .bffc file")
+    offsets = dict(zip(SECTIONS, fields[13:]))
+    counts = {"grid": W * H, "lasers": 4 * n_lasers, "targets": 2 * n_targets, "base": W * H + 1,
+              "cell_of": n_states, "straight": n_states, "bounce": n_states, "spawn": n_states,
+              "hit_bit": n_states, "starts": n_starts}
+    view = memoryview(mm)
+
+    def section(name):
+        fmt = _FORMATS[name]
+        start = offsets[name]
+        raw = view[start:start + counts[name] * struct.calcsize(fmt)]
+        if sys.byteorder != "little":
+            return list(struct.unpack(f"<{counts[name]}{fmt}", raw))
+        data = raw.cast(fmt)
+        return data if zero_copy else data.tolist()
+
+    letters = bytes(view[offsets["grid"]:offsets["grid"] + W * H])
+    grid = [list(letters[r * W:(r + 1) * W].decode()) for r in range(H)]
+    lv = list(section("lasers"))
+    lasers = [Laser(*lv[i:i + 4]) for i in range(0, len(lv), 4)]
+    tv = list(section("targets"))
+    targets = [(tv[i], tv[i + 1]) for i in range(0, len(tv), 2)]
+    cb = CompiledBoard.from_tables(
+        grid, targets, bytearray(section("base")), section("cell_of"), section("straight"), section("bounce"),
+        section("spawn"), section("hit_bit"), list(section("starts")),
+    )
+    puzzle = CompiledPuzzle(grid=grid, lasers=lasers, targets=targets,
+                            inventory={"A": ia, "B": ib, "C": ic}, cb=cb, source_hash=source_hash)
+    if zero_copy and sys.byteorder == "little":
+        puzzle._map = mm
+    else:
+        view.release()
+        mm.close()
+    return puzzle
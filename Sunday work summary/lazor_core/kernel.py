@@ -0,0 +1,467 @@
+# lazor_core/kernel.py
+"""Compiled board kernel for the search loops.
+
+A puzzle is compiled once into flat tables over the doubled lattice:
+
+- every lattice state (x, y, vx, vy) with 0 <= x <= 2W and 0 <= y <= 2H gets an
+  integer id ``((y * (2W + 1)) + x) * 4 + d`` where ``d = (vx > 0) | (vy > 0) << 1``;
+- ``cell_of[s]`` is the flat cell index (r * W + c) the crossing out of state ``s``
+  consults; crossings that leave the grid point at a sentinel cell ``W * H`` that
+  always stays EMPTY, so the tracer never branches on bounds;
+- ``straight[s]`` / ``bounce[s]`` / ``spawn[s]`` are the successor state ids for an
+  empty cell, an A (reflect) cell and the reflected copy a C (refract) cell spawns
+  (-1 when the successor is off the lattice);
+- ``hit_bit[s]`` is the target bit lit by the point the step lands on (0 if none).
+
+Cycle detection uses one preallocated ``visited`` map per compiled board (see
+:class:`VisitedMap`), reused across traces. A beam ends when it re-enters a
+visited state, so every trace takes at most ``n_states`` steps and needs no step cap.
+
+The tracers take a ``mode``:
+
+- ``FULL`` runs every beam to exhaustion (the exact hit set; use it for diagnostics);
+- ``SHORT`` stops as soon as every target is lit. The mask is then ``full_mask``,
+  and any other result is the same as ``FULL``;
+- ``FAST`` also stops once no live beam can still light an unlit target. It needs
+  ``reach``, a per-state mask of the targets a beam from that state could light
+  in some layout (:func:`lazor_core.backward.target_reach`). A trace that fails
+  this way returns a partial mask; :func:`trace_frontier` reports it as ``DEAD``.
+
+A candidate layout is then just a ``bytearray`` of cell kinds (``EMPTY``/``A``/``B``/``C``),
+and :func:`trace_mask` returns the lit targets as an int bitmask. The physics mirror
+``lazor_solver.trace_all_rays`` exactly, including corner crossings and where the
+reflected copy of a refracted beam is spawned.
+"""
+from __future__ import annotations
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .counters import TraceCounters
+
+EMPTY, KIND_A, KIND_B, KIND_C = 0, 1, 2, 3
+FULL, SHORT, FAST = "full", "short", "fast"
+TRACE_MODES = (FULL, SHORT, FAST)
+DEAD = -2  # trace_frontier: no completion of the layout can light every target
+KIND_CODES: Dict[str, int] = {"A": KIND_A, "B": KIND_B, "C": KIND_C}
+KIND_LETTERS = {KIND_A: "A", KIND_B: "B", KIND_C: "C"}
+
+
+def _dir_index(vx: int, vy: int) -> int:
+    return (1 if vx > 0 else 0) | (2 if vy > 0 else 0)
+
+
+class VisitedMap:
+    """Visited flags for every lattice state, reused from trace to trace.
+
+    State ``s`` is visited in the current trace iff ``flags[s] == epoch``.
+    :meth:`next_epoch` starts a new trace by bumping the epoch instead of
+    clearing the map; the map is zeroed once every 255 traces, when the
+    epoch wraps around.
+    """
+
+    __slots__ = ("flags", "epoch")
+
+    def __init__(self, n_states: int):
+        self.flags = bytearray(n_states)
+        self.epoch = 0
+
+    def next_epoch(self) -> int:
+        epoch = self.epoch + 1
+        if epoch > 255:
+            self.flags[:] = bytes(len(self.flags))
+            epoch = 1
+        self.epoch = epoch
+        return epoch
+
+
+class CompiledBoard:
+    """Per-puzzle lookup tables; build with :func:`compile_board`."""
+
+    __slots__ = (
+        "W", "H", "stride", "n_cells", "n_states", "targets", "full_mask",
+        "base_cells", "cell_of", "straight", "bounce", "spawn", "hit_bit", "starts", "visited",
+    )
+
+    def __init__(self, grid: Sequence[Sequence[str]], lasers, targets: Sequence[Tuple[int, int]]):
+        H = len(grid)
+        W = len(grid[0]) if grid else 0
+        self.W, self.H = W, H
+        self.stride = 2 * W + 1
+        self.n_cells = W * H
+        self.n_states = 4 * (2 * W + 1) * (2 * H + 1)
+        self.visited = VisitedMap(self.n_states)
+
+        # Unique targets keep their first-seen order; bit k <-> self.targets[k]
+        uniq: List[Tuple[int, int]] = []
+        for t in targets:
+            t = (int(t[0]), int(t[1]))
+            if t not in uniq:
+                uniq.append(t)
+        self.targets = uniq
+        target_bit = {t: 1 << k for k, t in enumerate(uniq)}
+        self.full_mask = (1 << len(uniq)) - 1
+
+        self.base_cells = self.cells_for(grid)
+
+        n = self.n_states
+        cell_of = [W * H] * n
+        straight = [-1] * n
+        bounce = [-1] * n
+        spawn = [-1] * n
+        hit_bit = [0] * n
+        xmax, ymax = 2 * W, 2 * H
+
+        for y in range(ymax + 1):
+            for x in range(xmax + 1):
+                for vx in (-1, 1):
+                    for vy in (-1, 1):
+                        s = self.state_id(x, y, vx, vy)
+                        nx, ny = x + vx, y + vy
+                        cv, ch = nx % 2 == 0, ny % 2 == 0
+                        if cv and ch:
+                            row = ny // 2 if vy > 0 else ny // 2 - 1
+                            col = nx // 2 if vx > 0 else nx // 2 - 1
+                            rvx, rvy = -vx, -vy
+                        elif cv:
+                            row = min(y, ny) // 2
+                            col = nx // 2 if vx > 0 else nx // 2 - 1
+                            rvx, rvy = -vx, vy
+                        elif ch:
+                            row = ny // 2 if vy > 0 else ny // 2 - 1
+                            col = min(x, nx) // 2
+                            rvx, rvy = vx, -vy
+                        else:
+                            row = col = -1
+                            rvx, rvy = vx, vy
+                        if 0 <= row < H and 0 <= col < W:
+                            cell_of[s] = row * W + col
+                        straight[s] = self.state_id(nx, ny, vx, vy)
+                        bounce[s] = self.state_id(nx, ny, rvx, rvy)
+                        spawn[s] = self.state_id(x, y, rvx, rvy)
+                        hit_bit[s] = target_bit.get((nx, ny), 0)
+
+        self.cell_of = cell_of
+        self.straight = straight
+        self.bounce = bounce
+        self.spawn = spawn
+        self.hit_bit = hit_bit
+        self.starts = [
+            s for s in (
+                self.state_id(l.x, l.y, 1 if l.vx > 0 else -1, 1 if l.vy > 0 else -1)
+                for l in lasers
+            ) if s >= 0
+        ]
+
+    @classmethod
+    def from_tables(cls, grid: Sequence[Sequence[str]], targets: Sequence[Tuple[int, int]], base_cells: bytearray,
+                    cell_of, straight, bounce, spawn, hit_bit, starts) -> "CompiledBoard":
+        """Rebuild a compiled board from stored tables (see :mod:`lazor_core.ir`).
+
+        ``targets`` must already be unique, in bit order; the tables may be any
+        int sequences (lists or ``memoryview``s over a mapped file).
+        """
+        cb = cls.__new__(cls)
+        cb.H = len(grid)
+        cb.W = len(grid[0]) if grid else 0
+        cb.stride = 2 * cb.W + 1
+        cb.n_cells = cb.W * cb.H
+        cb.n_states = 4 * (2 * cb.W + 1) * (2 * cb.H + 1)
+        cb.visited = VisitedMap(cb.n_states)
+        cb.targets = [tuple(t) for t in targets]
+        cb.full_mask = (1 << len(cb.targets)) - 1
+        cb.base_cells = base_cells
+        cb.cell_of, cb.straight, cb.bounce, cb.spawn = cell_of, straight, bounce, spawn
+        cb.hit_bit = hit_bit
+        cb.starts = list(starts)
+        return cb
+
+    def state_id(self, x: int, y: int, vx: int, vy: int) -> int:
+        """Lattice state id, or -1 when (x, y) lies off the doubled grid."""
+        if 0 <= x <= 2 * self.W and 0 <= y <= 2 * self.H:
+            return (y * self.stride + x) * 4 + _dir_index(vx, vy)
+        return -1
+
+    def decode(self, s: int) -> Tuple[int, int, int, int]:
+        p, d = divmod(s, 4)
+        y, x = divmod(p, self.stride)
+        return x, y, (1 if d & 1 else -1), (1 if d & 2 else -1)
+
+    def cells_for(self, grid: Sequence[Sequence[str]]) -> bytearray:
+        """Cell-kind array for a full letter grid of this puzzle's shape."""
+        W = self.W
+        cells = bytearray(self.n_cells + 1)
+        for r, row in enumerate(grid):
+            for c, ch in enumerate(row):
+                cells[r * W + c] = KIND_CODES.get(ch, EMPTY)
+        return cells
+
+    def grid_for(self, grid0: Sequence[Sequence[str]], cells: bytearray) -> List[List[str]]:
+        """Letter grid for ``cells``; cells left EMPTY keep their ``grid0`` token."""
+        W = self.W
+        out = [list(row) for row in grid0]
+        for i in range(self.n_cells):
+            k = cells[i]
+            if k:
+                out[i // W][i % W] = KIND_LETTERS[k]
+        return out
+
+    def mask_to_points(self, mask: int) -> List[Tuple[int, int]]:
+        return [t for k, t in enumerate(self.targets) if mask >> k & 1]
+
+
+def compile_board(board) -> CompiledBoard:
+    """Compile a letter-grid board (``grid``, ``lasers``, ``targets``)."""
+    return CompiledBoard(board.grid, board.lasers, board.targets)
+
+
+def trace_mask(cb: CompiledBoard, cells: bytearray, counters: Optional[TraceCounters] = None,
+               mode: str = FULL, reach: Optional[Sequence[int]] = None) -> int:
+    """Trace every laser over ``cells`` and return the lit-target bitmask."""
+    if counters is not None:
+        return _trace_counted(cb, cells, counters, mode=mode, reach=reach)[0]
+    if mode != FULL:
+        return _trace_early(cb, cells, mode, reach)[0]
+    cell_of = cb.cell_of
+    straight = cb.straight
+    bounce = cb.bounce
+    spawn = cb.spawn
+    hit_bit = cb.hit_bit
+    seen = cb.visited.flags
+    epoch = cb.visited.next_epoch()
+    stack = list(cb.starts)
+    hit = 0
+
+    while stack:
+        s = stack.pop()
+        while s >= 0:
+            if seen[s] == epoch:
+                break
+            seen[s] = epoch
+            k = cells[cell_of[s]]
+            if k == EMPTY:
+                nxt = straight[s]
+            elif k == KIND_A:
+                nxt = bounce[s]
+            elif k == KIND_B:
+                break
+            else:
+                stack.append(spawn[s])
+                nxt = straight[s]
+            hit |= hit_bit[s]
+            s = nxt
+
+    return hit
+
+
+def popcount(mask: int) -> int:
+    return bin(mask).count("1")
+
+
+def trace_frontier(cb: CompiledBoard, cells: bytearray, undecided: bytearray,
+                   counters: Optional[TraceCounters] = None, mode: str = FULL,
+                   reach: Optional[Sequence[int]] = None) -> Tuple[int, int]:
+    """Trace until a beam is about to consult a cell flagged in ``undecided``.
+
+    Returns ``(hit_mask, cell)``: ``cell`` is the first undecided cell a beam
+    reaches (the mask is then partial), or -1 when no beam touches one, in which
+    case the mask is final for every way of filling the undecided cells. Hits
+    are never undone, so a ``SHORT`` / ``FAST`` trace that lights every target
+    first returns ``(full_mask, -1)``; ``FAST`` returns ``DEAD`` as the cell
+    when no way of filling the undecided cells can succeed.
+    """
+    if counters is not None:
+        mask, ci, _ = _trace_counted(cb, cells, counters, undecided=undecided, mode=mode, reach=reach)
+        return mask, ci
+    mask, ci, _ = _trace_early(cb, cells, mode, reach, undecided=undecided)
+    return mask, ci
+
+
+def trace_touched(cb: CompiledBoard, cells: bytearray, watch: bytearray,
+                  counters: Optional[TraceCounters] = None, mode: str = FULL,
+                  reach: Optional[Sequence[int]] = None) -> Tuple[int, List[int]]:
+    """Like :func:`trace_mask`, also returning the ``watch``-flagged cells the beams
+    consulted, in first-consulted order.
+
+    The trace is deterministic, so which cell is consulted next depends only on the
+    contents of the cells consulted before it; any layout that agrees on the
+    returned cells produces exactly the same trace and hit mask. That holds for a
+    ``FAST`` trace that gives up too: the live beams, and so their ``reach``, are
+    fixed by the cells consulted so far.
+    """
+    if counters is not None:
+        mask, _, touched = _trace_counted(cb, cells, counters, watch=watch, mode=mode, reach=reach)
+        return mask, touched
+    mask, _, touched = _trace_early(cb, cells, mode, reach, watch=watch)
+    return mask, touched
+
+
+def _trace_early(cb: CompiledBoard, cells: bytearray, mode: str, reach: Optional[Sequence[int]],
+                 undecided: Optional[bytearray] = None, watch: Optional[bytearray] = None):
+    """Tracer behind :func:`trace_frontier`, :func:`trace_touched` and the early modes of :func:`trace_mask`.
+
+    Returns ``(mask, frontier cell or -1 / DEAD, touched cells)``. ``pending`` is
+    the union of ``reach`` over the stacked beams. Along a straight run ``reach``
+    only loses the targets the run lights, so the fast-fail test runs where a beam
+    starts and after each A / C cell. Only a ``FULL`` :func:`trace_mask` has its
+    own loop, without the ``undecided`` / ``watch`` tests.
+    """
+    fast = _check_mode(mode, reach)
+    short = mode != FULL
+    cell_of = cb.cell_of
+    straight = cb.straight
+    bounce = cb.bounce
+    spawn = cb.spawn
+    hit_bit = cb.hit_bit
+    full = cb.full_mask
+    seen = cb.visited.flags
+    epoch = cb.visited.next_epoch()
+    marked = bytearray(watch) if watch is not None else None
+    touched: List[int] = []
+    stack = list(cb.starts)
+    hit = 0
+    pending = 0
+
+    while stack:
+        s = stack.pop()
+        if fast and s >= 0:
+            pending = 0
+            for t in stack:
+                if t >= 0:
+                    pending |= reach[t]
+            if (hit | pending | reach[s]) != full:
+                return hit, DEAD, touched
+        while s >= 0:
+            if seen[s] == epoch:
+                break
+            seen[s] = epoch
+            ci = cell_of[s]
+            if undecided is not None and undecided[ci]:
+                return hit, ci, touched
+            if marked is not None and marked[ci]:
+                marked[ci] = 0
+                touched.append(ci)
+            k = cells[ci]
+            if k == EMPTY:
+                nxt = straight[s]
+            elif k == KIND_B:
+                break
+            else:
+                if k == KIND_A:
+                    nxt = bounce[s]
+                else:
+                    t = spawn[s]
+                    stack.append(t)
+                    if fast and t >= 0:
+                        pending |= reach[t]
+                    nxt = straight[s]
+                if fast and nxt >= 0 and (hit | hit_bit[s] | pending | reach[nxt]) != full:
+                    return hit | hit_bit[s], DEAD, touched
+            b = hit_bit[s]
+            if b:
+                hit |= b
+                if short and hit == full:
+                    return hit, -1, touched
+            s = nxt
+
+    return hit, -1, touched
+
+
+def _check_mode(mode: str, reach: Optional[Sequence[int]]) -> bool:
+    """Validate an early-stop ``mode``; True for ``FAST``."""
+    if mode not in TRACE_MODES:
+        raise ValueError(f"Unknown trace mode: {mode}")
+    if mode == FAST and reach is None:
+        raise ValueError("the fast trace mode needs a reach table")
+    return mode == FAST
+
+
+def _trace_counted(cb: CompiledBoard, cells: bytearray, counters: TraceCounters,
+                   undecided: Optional[bytearray] = None, watch: Optional[bytearray] = None,
+                   mode: str = FULL, reach: Optional[Sequence[int]] = None):
+    """Instrumented tracer behind the ``counters`` argument of the tracers above.
+
+    Returns ``(mask, frontier cell or -1 / DEAD, touched cells)``; ``undecided`` /
+    ``watch`` select the :func:`trace_frontier` / :func:`trace_touched` behaviour
+    and ``mode`` / ``reach`` the early stops.
+    """
+    fast = _check_mode(mode, reach)
+    short = mode != FULL
+    full = cb.full_mask
+    cell_of = cb.cell_of
+    straight = cb.straight
+    bounce = cb.bounce
+    spawn = cb.spawn
+    hit_bit = cb.hit_bit
+    seen = cb.visited.flags
+    epoch = cb.visited.next_epoch()
+    marked = bytearray(watch) if watch is not None else None
+    touched: List[int] = []
+    stack = list(cb.starts)
+    hit = 0
+    frontier = -1
+    steps = splits = cycles = out = absorbed = 0
+    stopped = ""
+    pending = 0
+    rays = len(stack)
+
+    while stack and frontier < 0 and not stopped:
+        s = stack.pop()
+        if fast and s >= 0:
+            pending = 0
+            for t in stack:
+                if t >= 0:
+                    pending |= reach[t]
+            if (hit | pending | reach[s]) != full:
+                frontier = DEAD
+                stopped = "fast_fails"
+                break
+        while True:
+            if s < 0:
+                out += 1
+                break
+            if seen[s] == epoch:
+                cycles += 1
+                break
+            seen[s] = epoch
+            ci = cell_of[s]
+            if undecided is not None and undecided[ci]:
+                frontier = ci
+                break
+            if marked is not None and marked[ci]:
+                marked[ci] = 0
+                touched.append(ci)
+            k = cells[ci]
+            if k == EMPTY:
+                nxt = straight[s]
+            elif k == KIND_A:
+                nxt = bounce[s]
+            elif k == KIND_B:
+                absorbed += 1
+                break
+            else:
+                splits += 1
+                rays += 1
+                stack.append(spawn[s])
+                if fast and spawn[s] >= 0:
+                    pending |= reach[spawn[s]]
+                nxt = straight[s]
+            hit |= hit_bit[s]
+            s = nxt
+            steps += 1
+            if short and hit == full:
+                stopped = "short_circuits"
+                break
+            if fast and k != EMPTY and s >= 0 and (hit | pending | reach[s]) != full:
+                frontier = DEAD
+                stopped = "fast_fails"
+                break
+
+    counters.traces += 1
+    counters.steps += steps
+    counters.rays += rays
+    counters.splits += splits
+    counters.cycles += cycles
+    counters.out_of_bounds += out
+    counters.absorbed += absorbed
+    if stopped:
+        setattr(counters, stopped, getattr(counters, stopped) + 1)
+    return hit, frontier, touched
@@ -0,0 +1,115 @@
+# lazor_core/nogood.py
+"""Nogood store for the enumeration search.
+
+A failed layout only depends on the cells its beams consulted (see
+:func:`lazor_core.kernel.trace_touched`), so the failure is recorded as the
+partial assignment ``[(cell, kind), ...]`` over those cells in first-consulted
+order. Because the trace is deterministic, every nogood that shares a prefix
+asks about the same next cell; the store is therefore a decision trie where each
+internal node names one cell and branches on its kind. Matching a candidate is a
+single root-to-leaf walk with one dict lookup per level, and reaching a leaf
+means the candidate fails exactly like a stored layout, without tracing it.
+
+The trie is capped at ``max_nodes``; leaves are evicted least-recently-matched
+first, pruning any branch left empty.
+"""
+from __future__ import annotations
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+from .kernel import EMPTY, KIND_A, KIND_B, KIND_C
+
+UNSET = -2  # node has no children yet
+LEAF = -1   # a stored nogood ends here
+
+
+class _Node:
+    __slots__ = ("cell", "children", "parent", "key")
+
+    def __init__(self, parent: Optional["_Node"] = None, key: int = 0):
+        self.cell = UNSET
+        self.children: Dict[int, "_Node"] = {}
+        self.parent = parent
+        self.key = key
+
+
+class NogoodTrie:
+    """Decision-trie of failed partial assignments with LRU eviction."""
+
+    def __init__(self, max_nodes: int = 200_000):
+        self.max_nodes = max_nodes
+        self.root = _Node()
+        self.n_nodes = 1
+        self._lru: "OrderedDict[_Node, None]" = OrderedDict()
+        self.matches = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._lru)
+
+    def match(self, cells) -> bool:
+        """True when ``cells`` agrees with a stored nogood on all of its cells."""
+        node = self.root
+        while True:
+            ci = node.cell
+            if ci == LEAF:
+                self.matches += 1
+                self._lru.move_to_end(node)
+                return True
+            if ci == UNSET:
+                return False
+            node = node.children.get(cells[ci])
+            if node is None:
+                return False
+
+    def match_bits(self, a: int, b: int, c: int) -> bool:
+        """:meth:`match` for a bitboard layout given as A/B/C occupancy masks."""
+        node = self.root
+        while True:
+            ci = node.cell
+            if ci == LEAF:
+                self.matches += 1
+                self._lru.move_to_end(node)
+                return True
+            if ci == UNSET:
+                return False
+            bit = 1 << ci
+            kind = KIND_A if a & bit else KIND_B if b & bit else KIND_C if c & bit else EMPTY
+            node = node.children.get(kind)
+            if node is None:
+                return False
+
+    def add(self, assignment: Iterable[Tuple[int, int]]) -> None:
+        """Store the failed partial assignment ``[(cell, kind), ...]`` (consult order)."""
+        node = self.root
+        for ci, kind in assignment:
+            if node.cell == LEAF:  # already covered by a shorter nogood
+                return
+            if node.cell == UNSET:
+                node.cell = ci
+            elif node.cell != ci:
+                raise ValueError("Nogood does not follow the trace order of the stored ones")
+            child = node.children.get(kind)
+            if child is None:
+                child = _Node(node, kind)
+                node.children[kind] = child
+                self.n_nodes += 1
+            node = child
+        if node.cell != LEAF:
+            node.cell = LEAF
+            self._lru[node] = None
+        while self.n_nodes > self.max_nodes and self._lru:
+            self._evict()
+
+    def _evict(self) -> None:
+        leaf, _ = self._lru.popitem(last=False)
+        self.evictions += 1
+        node = leaf
+        node.cell = UNSET
+        while node.parent is not None and not node.children:
+            parent = node.parent
+            del parent.children[node.key]
+            self.n_nodes -= 1
+            node = parent
+        if node is self.root and not node.children:
+            node.cell = UNSET
@@ -0,0 +1,83 @@
+# lazor_core/order.py
+"""Per-board nesting order for :class:`lazor_core.search.CombinationSearch`.
+
+The nested enumeration visits the same layouts in any A/B/C nesting order,
+but the work around them differs. Every iteration of an outer level rebuilds
+the free-slot pool of the level inside it. With the backward pass
+(:mod:`lazor_core.backward`), each level also draws only from the slots its
+kind may use. :func:`plan_order` estimates the cost of each of the six orders
+as::
+
+    sum over levels i of  iterations(i) * work(i)
+
+where ``iterations(i)`` is the product of C(pool_j, n_j) over the levels
+``j <= i``. ``work`` is ``ITER_COST`` plus the pool scan of the next level
+for an outer level, and ``TRACE_COST`` for a traced layout at the innermost
+one. A pool is the number of slots allowing the level's kind, scaled by the
+share of slots the outer levels leave free. On a tie, opaque (B) blocks go
+outermost, then scarce refractors (C), since each of them cuts or splits
+every beam through it.
+"""
+from __future__ import annotations
+from dataclasses import dataclass, field
+from itertools import permutations
+from math import comb
+from typing import Dict, Optional, Sequence
+
+from .backward import TargetPrune
+from .kernel import KIND_CODES
+
+AUTO = "auto"
+ORDERS = tuple("".join(p) for p in permutations("ABC"))
+ITER_COST = 20      # per outer-loop iteration, in slot-scan units
+TRACE_COST = 50     # per traced layout, in slot-scan units
+TIE_BREAK = "BCA"   # outermost first on equal cost
+
+
+@dataclass
+class OrderPlan:
+    """The chosen nesting order (outermost first) with every order's estimated cost."""
+    order: str
+    cost: float
+    costs: Dict[str, float] = field(default_factory=dict)
+
+    def report(self) -> str:
+        others = ", ".join(f"{o} {_fmt(c)}" for o, c in sorted(self.costs.items(), key=lambda kv: kv[1])
+                           if o != self.order)
+        return f"[Order] {self.order} (est. cost {_fmt(self.cost)}; {others})"
+
+
+def _fmt(x: float) -> str:
+    return f"{x:.3g}" if x >= 1e6 else f"{x:,.0f}"
+
+
+def order_cost(order: str, inventory: Dict[str, int], pools: Dict[str, int], n_slots: int) -> float:
+    """Estimated work of the nested enumeration in ``order`` (see the module docstring)."""
+    placed = 0
+    iterations = 1.0
+    cost = 0.0
+    expected = []
+    for k in order:
+        free = n_slots - placed
+        expected.append(pools[k] * free / n_slots if n_slots else 0.0)
+        placed += inventory.get(k, 0)
+    for i, k in enumerate(order):
+        n = inventory.get(k, 0)
+        iterations *= comb(round(expected[i]), n)
+        if not iterations:
+            break
+        cost += iterations * (ITER_COST + expected[i + 1] if i + 1 < len(order) else TRACE_COST)
+    return cost
+
+
+def plan_order(inventory: Dict[str, int], slots: Sequence[int], prune: Optional[TargetPrune] = None) -> OrderPlan:
+    """Cheapest nesting order for this board's inventory and (pruned) slot pools."""
+    n = len(slots)
+    pools = {k: n for k in "ABC"}
+    if prune is not None:
+        for k in "ABC":
+            bit = 1 << KIND_CODES[k]
+            pools[k] = sum(1 for ci in slots if prune.allowed[ci] & bit)
+    costs = {o: order_cost(o, inventory, pools, n) for o in ORDERS}
+    best = min(ORDERS, key=lambda o: (costs[o], [TIE_BREAK.index(k) for k in o]))
+    return OrderPlan(order=best, cost=costs[best], costs=costs)
@@ -0,0 +1,184 @@
+# lazor_core/parallel.py
+"""Process-pool parallel solve with cooperative early cancellation.
+
+The search space is cut into rank-ordered tasks whose concatenation is the
+sequential enumeration order:
+
+- ``combinations``: one task per first position of the outermost non-empty
+  nesting level (see :meth:`CombinationSearch.run`);
+- ``backtrack``: decision prefixes from :meth:`BacktrackSearch.split`.
+
+Workers share one ``cancel`` value. A task of rank ``r`` stops as soon as
+``cancel < r``. The first solution sets it to -1 so every worker stops; with
+``deterministic=True`` it is lowered to the solving task's rank instead, so only
+later-ranked tasks stop and the lowest-ranked solution wins (the same answer the
+sequential search gives).
+
+With a ``deadline`` every task also stops once it has passed (tasks that start
+after it return at once), and the result is marked ``timed_out``.
+"""
+from __future__ import annotations
+import multiprocessing as mp
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .anytime import stop_at
+from .counters import TraceCounters
+from .kernel import FAST, CompiledBoard
+from .models import Laser
+from .backward import TargetPrune, backward_prune, target_reach
+from .order import AUTO
+from .sat import SatSearch
+from .search import BacktrackSearch, CombinationSearch
+
+NO_CANCEL = 1 << 62
+
+_CTX: Dict[str, object] = {}
+
+
+@dataclass
+class ParallelResult:
+    cells: Optional[bytearray]
+    best_hit: int = 0
+    best_cells: Optional[bytearray] = None
+    layouts: int = 0
+    tasks: int = 0
+    counters: Optional[TraceCounters] = None
+    coverage: float = 0.0       # summed over the tasks (see the searches' coverage())
+    timed_out: bool = False
+
+
+def make_search(cb: CompiledBoard, inventory: Dict[str, int], slots: Sequence[int], strategy: str,
+                order: str = AUTO, diagnose: bool = False, nogood_cap: int = 200_000,
+                backend: str = "kernel", counters: Optional[TraceCounters] = None,
+                prune: Optional[TargetPrune] = None, trace_mode: Optional[str] = None,
+                reach: Optional[List[int]] = None):
+    """Search object for ``strategy`` ('backtrack', 'combinations' or 'sat').
+
+    ``trace_mode`` / ``reach`` go to the kernel tracer (see :mod:`lazor_core.search`);
+    the sat strategy always traces its candidates in ``SHORT`` mode.
+    """
+    if strategy == "sat":
+        if backend != "kernel":
+            raise ValueError("the sat strategy verifies its layouts with the kernel backend only")
+        return SatSearch(cb, inventory, slots, diagnose=diagnose, counters=counters, prune=prune)
+    if strategy == "backtrack":
+        return BacktrackSearch(cb, inventory, slots, diagnose=diagnose, backend=backend, counters=counters,
+                               prune=prune, trace_mode=trace_mode, reach=reach)
+    if strategy == "combinations":
+        return CombinationSearch(cb, inventory, slots, order=order, diagnose=diagnose, nogood_cap=nogood_cap,
+                                 backend=backend, counters=counters, prune=prune, trace_mode=trace_mode,
+                                 reach=reach)
+    raise ValueError(f"Unknown strategy: {strategy}")
+
+
+def _init_worker(cancel, grid, lasers, targets, inventory, slots, strategy, order, diagnose,
+                 nogood_cap, backend, deterministic, count, backward, trace_mode, deadline) -> None:
+    cb = CompiledBoard(grid, [Laser(*l) for l in lasers], targets)
+    prune = backward_prune(cb, slots, stop_at(deadline) if deadline is not None else None) if backward else None
+    _CTX.update(
+        cancel=cancel,
+        cb=cb,
+        args=(inventory, slots, strategy, order, diagnose, nogood_cap, backend, trace_mode),
+        prune=prune,
+        # the FAST trace table, built once per worker rather than per task
+        reach=target_reach(cb, slots, prune) if trace_mode == FAST else None,
+        deterministic=deterministic,
+        count=count,
+        deadline=deadline,
+    )
+
+
+def _run_task(rank: int, task) -> Tuple[int, Optional[bytes], int, Optional[bytes], int, Optional[dict], float, bool]:
+    cancel = _CTX["cancel"]
+    deadline = _CTX["deadline"]
+    if cancel.value < rank:
+        return rank, None, 0, None, 0, None, 0.0, False
+    if deadline is not None and time.monotonic() >= deadline:
+        return rank, None, 0, None, 0, None, 0.0, True
+    inventory, slots, strategy, order, diagnose, nogood_cap, backend, trace_mode = _CTX["args"]
+    counters = TraceCounters() if _CTX["count"] else None
+    search = make_search(_CTX["cb"], inventory, slots, strategy, order, diagnose, nogood_cap, backend, counters,
+                         _CTX["prune"], trace_mode, _CTX["reach"])
+    cancelled = lambda: cancel.value < rank
+    search.should_stop = cancelled if deadline is None else stop_at(deadline, also=cancelled)
+    if strategy == "backtrack":
+        cells = search.run(prefix=task)
+    else:
+        cells = search.run(first=task)
+    if cells is not None:
+        with cancel.get_lock():
+            if _CTX["deterministic"]:
+                cancel.value = min(cancel.value, rank)
+            else:
+                cancel.value = -1
+    best = search.best_cells
+    timed_out = search.cancelled and not cancelled()
+    return (rank, bytes(cells) if cells is not None else None, search.best_hit,
+            bytes(best) if best is not None else None, search.layouts,
+            counters.as_dict() if counters is not None else None, search.coverage(), timed_out)
+
+
+def parallel_solve(cb: CompiledBoard, grid, lasers, targets, inventory: Dict[str, int], slots: Sequence[int],
+                   strategy: str = "backtrack", order: str = AUTO, workers: int = 2,
+                   deterministic: bool = False, diagnose: bool = False,
+                   nogood_cap: int = 200_000, backend: str = "kernel",
+                   counters: Optional[TraceCounters] = None, backward: bool = False,
+                   trace_mode: Optional[str] = None, deadline: Optional[float] = None) -> ParallelResult:
+    """Run the search for ``cb`` on ``workers`` processes.
+
+    ``grid``/``lasers``/``targets`` are the letter-grid puzzle ``cb`` was compiled
+    from; they are shipped to the workers, which compile their own copy. With
+    ``counters`` set, every task counts its traces and the totals are merged into it.
+    With ``backward`` every worker (and the task planner) prunes with
+    :func:`lazor_core.backward.backward_prune`. ``trace_mode`` is passed to every
+    task's search (see :func:`make_search`). ``deadline`` is a :func:`time.monotonic`
+    timestamp (see :mod:`lazor_core.anytime`).
+    """
+    if strategy == "sat":
+        raise ValueError("the sat strategy runs in a single process")
+    prune = backward_prune(cb, slots, stop_at(deadline) if deadline is not None else None) if backward else None
+    planner = make_search(cb, inventory, slots, strategy, order, backend=backend, prune=prune,
+                          trace_mode=trace_mode)
+    if strategy == "backtrack":
+        tasks: List = planner.split(workers * 4)
+    else:
+        tasks = list(range(planner.n_splits()))
+        order = planner.order   # an "auto" order is planned once, here
+
+    ctx = mp.get_context()
+    cancel = ctx.Value("q", NO_CANCEL)
+    laser_tuples = [(l.x, l.y, l.vx, l.vy) for l in lasers]
+    result = ParallelResult(cells=None, tasks=len(tasks), counters=counters)
+    best_rank = NO_CANCEL
+    best_hit_rank = NO_CANCEL
+
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=ctx, initializer=_init_worker,
+        initargs=(cancel, [list(r) for r in grid], laser_tuples, list(targets), dict(inventory),
+                  list(slots), strategy, order, diagnose, nogood_cap, backend, deterministic,
+                  counters is not None, backward, trace_mode, deadline),
+    ) as ex:
+        futures = {ex.submit(_run_task, rank, task): rank for rank, task in enumerate(tasks)}
+        for fut in as_completed(futures):
+            if fut.cancelled():
+                continue
+            rank, cells, best_hit, best_cells, layouts, counts, coverage, timed_out = fut.result()
+            result.layouts += layouts
+            result.coverage += coverage
+            result.timed_out |= timed_out
+            if counts is not None:
+                counters.merge(TraceCounters(**counts))
+            if best_hit > result.best_hit or (best_hit == result.best_hit and best_cells and rank < best_hit_rank):
+                result.best_hit, result.best_cells, best_hit_rank = best_hit, bytearray(best_cells), rank
+            if cells is not None and rank < best_rank:
+                best_rank = rank
+                result.cells = bytearray(cells)
+                for other, r in futures.items():
+                    if r > rank or not deterministic:
+                        other.cancel()
+                if not deterministic:
+                    break
+    return result
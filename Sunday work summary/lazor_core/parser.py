@@ -2,12 +2,19 @@
 # lazor_core/parser.py
 from __future__ import annotations
 import re
-from typing import List, Tuple, Dict
+from typing import BinaryIO, Iterator, List, Tuple, Dict, Union
 from .models import BFFSpec, BlockType, Laser
 
 GRID_START = re.compile(r"^\s*GRID\s+START\s*$", re.IGNORECASE)
 GRID_STOP  = re.compile(r"^\s*GRID\s+STOP\s*$", re.IGNORECASE)
 
+_GRID_ROW = re.compile(r"[oxabcOXABC]+")
+_COUNT = re.compile(r"^(?P<typ>[ABCabc])\s+(?P<n>\d+)$")
+_LASER = re.compile(r"^[Ll]\s+(-?\d+)\s+(-?\d+)\s+(-?\d+)\s+(-?\d+)$")
+_POINT = re.compile(r"^[Pp]\s+(-?\d+)\s+(-?\d+)$")
+_COMMENT = re.compile(r"\s#")
+_EQ_MINUS = re.compile(r"\s=\s*(-?\d+)")
+
 def _normalize(line: str) -> str:
     """Normalize a raw line for robust parsing.
 
@@ -15,23 +22,34 @@ def _normalize(line: str) -> str:
     - Replace Unicode minus and dashes with ASCII '-'.
     - Collapse multiple spaces/tabs.
     - Trim.
+
+    Each rewrite only runs when its trigger character is present (a corpus
+    run normalizes every line of every puzzle).
     """
     # Remove comments
-    line = re.split(r"\s#", line, maxsplit=1)[0]
-    if line.strip().startswith('#'):
-        return ""
+    if '#' in line:
+        line = _COMMENT.split(line, maxsplit=1)[0]
+        if line.strip().startswith('#'):
+            return ""
     # Normalize unicode minuses/dashes
-    line = line.replace('−', '-').replace('–', '-').replace('—', '-')
+    if not line.isascii():
+        line = line.replace('−', '-').replace('–', '-').replace('—', '-')
     # Some OCR glitches sometimes produce '=1' instead of '-1'; be lenient
-    line = re.sub(r"\s=\s*(-?\d+)", r" -\1", line)
-    # Collapse whitespace
-    line = re.sub(r"\s+", " ", line).strip()
-    return line
+    if '=' in line:
+        line = _EQ_MINUS.sub(r" -\1", line)
+    # Collapse whitespace (str.split() splits on the same characters as \s)
+    return " ".join(line.split())
 
 def parse_bff(path: str) -> BFFSpec:
     with open(path, 'r', encoding='utf-8') as f:
         raw_lines = f.readlines()
+    return parse_lines(raw_lines)
 
+def parse_bff_bytes(data: bytes) -> BFFSpec:
+    """Parse one puzzle from the UTF-8 bytes of a .bff file."""
+    return parse_lines(bytes(data).decode('utf-8').splitlines())
+
+def parse_lines(raw_lines: List[str]) -> BFFSpec:
     lines = [_normalize(ln) for ln in raw_lines]
     lines = [ln for ln in lines if ln]  # drop empty
 
@@ -53,7 +71,7 @@ def parse_bff(path: str) -> BFFSpec:
                 row = lines[i]
                 tokens = row.split()
                 # Handle both spaced (o o o) and non-spaced (oooo) formats
-                if len(tokens) == 1 and re.fullmatch(r"[oxabcOXABC]+", tokens[0]):
+                if len(tokens) == 1 and _GRID_ROW.fullmatch(tokens[0]):
                     row_tokens = list(tokens[0])
                 else:
                     row_tokens = [tok.strip() for tok in tokens if tok.strip()]
@@ -66,7 +84,7 @@ def parse_bff(path: str) -> BFFSpec:
             continue
 
         # Counts: A 2 / B 1 / C 0
-        m_count = re.match(r"^(?P<typ>[ABCabc])\s+(?P<n>\d+)$", ln)
+        m_count = _COUNT.match(ln)
         if m_count:
             t = BlockType.from_letter(m_count.group('typ'))
             n = int(m_count.group('n'))
@@ -75,7 +93,7 @@ def parse_bff(path: str) -> BFFSpec:
             continue
 
         # Laser: L x y vx vy
-        m_laser = re.match(r"^[Ll]\s+(-?\d+)\s+(-?\d+)\s+(-?\d+)\s+(-?\d+)$", ln)
+        m_laser = _LASER.match(ln)
         if m_laser:
             x, y, vx, vy = map(int, m_laser.groups())
             lasers.append(Laser(x=x, y=y, vx=vx, vy=vy))
@@ -83,7 +101,7 @@ def parse_bff(path: str) -> BFFSpec:
             continue
 
         # Point: P x y
-        m_point = re.match(r"^[Pp]\s+(-?\d+)\s+(-?\d+)$", ln)
+        m_point = _POINT.match(ln)
         if m_point:
             x, y = map(int, m_point.groups())
             points.append((x, y))
@@ -107,3 +125,76 @@ def parse_bff(path: str) -> BFFSpec:
         lasers=lasers,
         points=points,
     )
+
+
+# ---------------------------------------------------------------------------
+# Streams of puzzles
+#
+# A stream is a run of .bff texts, each introduced by a separator line
+# "--- <name>" (the name is optional; unnamed puzzles are called "#<index>").
+# Text before the first separator is a puzzle too unless it is blank or only
+# comments, so a plain .bff file is a one-puzzle stream.
+# ---------------------------------------------------------------------------
+
+SEPARATOR = b"---"
+CHUNK_SIZE = 1 << 20
+
+Source = Union[bytes, bytearray, memoryview, BinaryIO]
+
+def _is_blank(body: bytes) -> bool:
+    return all(not ln.strip() or ln.lstrip().startswith(b"#") for ln in body.splitlines())
+
+def _records(buf, start: int, end: int) -> Iterator[Tuple[Union[str, None], bytes]]:
+    """(name or None, body) for each record in buf[start:end].
+
+    Separators are located with ``find`` over the buffer (bytes, bytearray or
+    mmap); only the body of one record at a time is copied out.
+    """
+    name, body = None, start
+    sep = start if buf[start:start + len(SEPARATOR)] == SEPARATOR else -1
+    while True:
+        if sep < 0:
+            nl = buf.find(b"\n" + SEPARATOR, body, end)
+            sep = -1 if nl < 0 else nl + 1
+        stop = end if sep < 0 else sep
+        if name is not None or (stop > body and not _is_blank(buf[body:stop])):
+            yield name, bytes(buf[body:stop])
+        if sep < 0:
+            return
+        eol = buf.find(b"\n", sep, end)
+        eol = end if eol < 0 else eol
+        name = bytes(buf[sep + len(SEPARATOR):eol]).decode('utf-8').strip()
+        body, sep = min(eol + 1, end), -1
+
+def _stream_records(f: BinaryIO, chunk_size: int) -> Iterator[Tuple[Union[str, None], bytes]]:
+    buf = bytearray()
+    while True:
+        data = f.read(chunk_size)
+        if not data:
+            yield from _records(buf, 0, len(buf))
+            return
+        scan = max(0, len(buf) - len(SEPARATOR))
+        buf += data
+        # everything before the last separator seen so far is complete
+        last = buf.rfind(b"\n" + SEPARATOR, scan)
+        if last > 0:
+            yield from _records(buf, 0, last + 1)
+            del buf[:last + 1]
+
+def iter_raw_bff(source: Source, chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[str, bytes]]:
+    """Yield (name, .bff bytes) for each puzzle of a stream.
+
+    ``source`` is a bytes-like buffer (bytes, bytearray, mmap) or a binary file
+    object such as ``sys.stdin.buffer``, which is read ``chunk_size`` bytes at
+    a time.
+    """
+    if isinstance(source, memoryview):
+        source = source.obj if source.contiguous and source.nbytes == len(source.obj) else source.tobytes()
+    records = _stream_records(source, chunk_size) if hasattr(source, 'read') else _records(source, 0, len(source))
+    for index, (name, body) in enumerate(records):
+        yield name or f"#{index}", body
+
+def iter_bff(source: Source, chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[str, BFFSpec]]:
+    """Yield (name, BFFSpec) for each puzzle of a stream (see :func:`iter_raw_bff`)."""
+    for name, body in iter_raw_bff(source, chunk_size):
+        yield name, parse_bff_bytes(body)
@@ -0,0 +1,124 @@
+# lazor_core/rank.py
+"""Combinadic ranking of the nested-combinations layouts (``--shard`` / ``--range``).
+
+:class:`lazor_core.search.CombinationSearch` without ``prune`` visits the
+layouts as nested :func:`itertools.combinations`: the outer level chooses its
+positions among all open slots, and each inner level chooses among the slots
+the outer levels left free. :class:`LayoutRank` numbers the layouts in exactly
+that order, from 0 to ``total - 1``, and maps a rank back to its position
+tuples.
+
+Each level is a mixed-radix digit, ``rank = (r1 * C2 + r2) * C3 + r3``. A digit
+is the lexicographic rank of the level's combination over its free pool, taken
+from the combinatorial number system::
+
+    rank(c_0 < ... < c_{k-1} of n) = C(n, k) - 1 - sum_i C(n - 1 - c_i, k - i)
+
+Ranking a layout costs O(k) binomials for k placed blocks (plus a bisect per
+block to turn slot indices into free-pool indices); unranking needs a binary
+search per block, O(k log n) binomials.
+"""
+from __future__ import annotations
+from bisect import bisect_left, insort
+from math import comb
+from typing import List, Sequence, Tuple
+
+Layout = Tuple[Tuple[int, ...], ...]
+
+
+def rank_combination(idx: Sequence[int], n: int) -> int:
+    """Rank of the increasing indices ``idx`` in ``combinations(range(n), len(idx))``."""
+    k = len(idx)
+    r = comb(n, k) - 1
+    for i, c in enumerate(idx):
+        r -= comb(n - 1 - c, k - i)
+    return r
+
+
+def unrank_combination(r: int, n: int, k: int) -> List[int]:
+    """The ``r``-th combination of ``combinations(range(n), k)`` as increasing indices."""
+    total = comb(n, k)
+    if not 0 <= r < total:
+        raise ValueError(f"rank {r} outside [0, {total})")
+    m = total - 1 - r           # the complement's rank in the co-lexicographic order
+    out = []
+    hi = n                      # every digit stays below the previous one
+    for j in range(k, 0, -1):
+        # largest d < hi with C(d, j) <= m
+        lo, top = j - 1, hi - 1
+        while lo < top:
+            mid = (lo + top + 1) // 2
+            if comb(mid, j) <= m:
+                lo = mid
+            else:
+                top = mid - 1
+        m -= comb(lo, j)
+        out.append(n - 1 - lo)
+        hi = lo
+    return out
+
+
+def _nth_free(used: Sequence[int], j: int) -> int:
+    """The ``j``-th index (from 0) that is not in the sorted list ``used``."""
+    for u in used:
+        if u > j:
+            break
+        j += 1
+    return j
+
+
+class LayoutRank:
+    """Ranks of the layouts of the nested enumeration over ``slots``.
+
+    ``counts`` is the number of blocks per nesting level, outermost first (the
+    search's ``levels``). Layouts are tuples with one tuple of slot ids per
+    level, like :attr:`lazor_core.search.CombinationSearch.cursor`.
+    """
+
+    def __init__(self, slots: Sequence[int], counts: Sequence[int]):
+        self.slots = list(slots)
+        self.counts = list(counts)
+        self.index = {p: i for i, p in enumerate(self.slots)}
+        self.pools = []
+        free = len(self.slots)
+        for k in self.counts:
+            self.pools.append(free)
+            free -= k
+        self.radix = [comb(n, k) if n >= k else 0 for n, k in zip(self.pools, self.counts)]
+        self.total = 1
+        for c in self.radix:
+            self.total *= c
+
+    def rank(self, layout: Sequence[Sequence[int]]) -> int:
+        used: List[int] = []    # slot indices taken by the outer levels, sorted
+        r = 0
+        for pos, n, radix in zip(layout, self.pools, self.radix):
+            idx = [self.index[p] for p in pos]
+            r = r * radix + rank_combination([i - bisect_left(used, i) for i in idx], n)
+            for i in idx:
+                insort(used, i)
+        return r
+
+    def unrank(self, r: int) -> Layout:
+        if not 0 <= r < self.total:
+            raise ValueError(f"rank {r} outside [0, {self.total})")
+        digits = []
+        for radix in reversed(self.radix):
+            r, d = divmod(r, radix)
+            digits.append(d)
+        digits.reverse()
+        used: List[int] = []
+        layout = []
+        for d, n, k in zip(digits, self.pools, self.counts):
+            idx = [_nth_free(used, j) for j in unrank_combination(d, n, k)]
+            layout.append(tuple(self.slots[i] for i in idx))
+            for i in idx:
+                insort(used, i)
+        return tuple(layout)
+
+
+def shard_range(total: int, k: int, n: int) -> Tuple[int, int]:
+    """Rank range ``[start, end)`` of shard ``k`` (from 0) of ``n`` equal shards."""
+    if not 0 <= k < n:
+        raise ValueError(f"shard {k} outside 0..{n - 1}")
+    return total * k // n, total * (k + 1) // n
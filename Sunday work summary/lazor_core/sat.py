@@ -0,0 +1,351 @@
+# lazor_core/sat.py
+"""Constraint-model search (``--strategy sat``) on the bundled CDCL solver.
+
+The puzzle becomes a boolean formula over the compiled lattice
+(:mod:`lazor_core.kernel`):
+
+- ``a_i`` / ``b_i`` / ``c_i``: open slot ``i`` holds an A / B / C block (at most
+  one each, exact-count inventory constraints as sequential counters);
+- ``v_s``: the beam passes through lattice state ``s``. Only states some layout
+  could reach from a laser get a variable;
+- one literal per beam step ``s -> t`` (straight when the cell is empty or C,
+  bounce when it is A, the spawned copy when it is C): ``v_s`` itself when the
+  consulted cell is fixed, otherwise an auxiliary ``x <-> v_s & condition``.
+
+The A/B/C rules of ``trace_all_rays`` are the step conditions; every step
+forces its successor lit, every lit state other than a laser start needs an
+incoming step, and each target needs a lit step landing on it (B absorbs the
+beam before it lands, so it has no outgoing steps).
+
+Those support clauses alone accept a beam loop that lights itself. Such a model
+is caught by tracing its layout with the kernel: the states the formula lit
+but the trace did not reach form an unfounded set ``U``, and the loop formula
+"a state of ``U`` is lit only if a step enters ``U`` from outside" is added
+before solving again. Every layout the search returns has been traced, so it
+is a real solution; unsatisfiable means no layout exists.
+"""
+from __future__ import annotations
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from .backward import TargetPrune
+from .cdcl import Solver
+from .counters import TraceCounters
+from .kernel import EMPTY, KIND_A, KIND_B, KIND_C, SHORT, CompiledBoard, popcount, trace_mask
+
+Step = Tuple[int, int, int]  # (source state, destination state, literal)
+ENCODE_POLL = 256   # lattice states encoded between should_stop polls
+
+
+def exactly(solver: Solver, lits: Sequence[int], k: int) -> None:
+    """Exactly ``k`` of ``lits`` are true (unsatisfiable when ``k > len(lits)``).
+
+    A sequential counter defined in both directions: after literal ``i``,
+    register ``j`` holds iff at least ``j + 1`` of ``lits[:i + 1]`` are true,
+    for ``j <= k``. The last row must reach ``k`` but not ``k + 1``. That takes
+    about ``n (k + 1)`` auxiliary variables for ``n`` literals.
+    """
+    n = len(lits)
+    if k > n:
+        solver.add_clause([])
+        return
+    if k in (0, n):
+        for x in lits:
+            solver.add_clause([x] if k else [-x])
+        return
+    prev: List[int] = []
+    for i, x in enumerate(lits):
+        cur = [solver.new_var() for _ in range(min(i + 1, k + 1))]
+        for j, r in enumerate(cur):
+            up = prev[j] if j < len(prev) else None     # already j + 1 before x
+            # r <-> up | (x & prev[j - 1]), with prev[-1] true
+            if up is not None:
+                solver.add_clause([-up, r])
+                solver.add_clause([-r, up, x])
+            else:
+                solver.add_clause([-r, x])
+            if j == 0:
+                solver.add_clause([-x, r])
+            else:
+                solver.add_clause([-x, -prev[j - 1], r])
+                solver.add_clause([-r, prev[j - 1]] + ([up] if up is not None else []))
+        prev = cur
+    solver.add_clause([prev[k - 1]])
+    if len(prev) > k:
+        solver.add_clause([-prev[k]])
+
+
+class SatSearch:
+    """CDCL search over the beam model; call :meth:`run` once.
+
+    Same interface as :class:`lazor_core.search.BacktrackSearch`: ``layouts``
+    counts the candidate layouts the solver proposed (each is traced once),
+    ``best_hit`` / ``best_cells`` the best of them when ``diagnose`` is set, and
+    ``should_stop`` is polled while the formula is built (at the start of
+    :meth:`run`, every ``ENCODE_POLL`` lattice states) and every
+    :data:`lazor_core.cdcl.STOP_POLL` propagations while it is solved.
+    :meth:`coverage` is unknown (None) until the formula is proved unsatisfiable.
+    """
+
+    def __init__(self, cb: CompiledBoard, inventory: Dict[str, int], slots: Sequence[int],
+                 diagnose: bool = False, counters: Optional[TraceCounters] = None,
+                 prune: Optional[TargetPrune] = None):
+        self.cb = cb
+        self.slots = list(slots)
+        self.inventory = {k: inventory.get(k, 0) for k in "ABC"}
+        self.diagnose = diagnose
+        self.counters = counters
+        self.prune = prune
+        self.solver = Solver()
+
+        self.layouts = 0        # candidate layouts traced
+        self.loops = 0          # loop formulas added
+        self.pruned = 0         # unit clauses added from ``prune``
+        self.best_hit = 0
+        self.best_cells: Optional[bytearray] = None
+        self.should_stop: Optional[Callable[[], bool]] = None
+        self.cancelled = False
+        self.exhausted = False
+
+        self.kind_var: Dict[int, Tuple[int, int, int]] = {}
+        self.state_var: Dict[int, int] = {}
+        self.steps: List[Step] = []
+        self.steps_into: Dict[int, List[Step]] = {}
+        self.encoded = False
+
+    # -- encoding ------------------------------------------------------------
+
+    def _reachable_states(self) -> List[int]:
+        """States some layout could reach from a laser start."""
+        cb = self.cb
+        open_cell = set(self.slots)
+        seen: Set[int] = set()
+        stack = [s for s in cb.starts]
+        while stack:
+            s = stack.pop()
+            if s < 0 or s in seen:
+                continue
+            seen.add(s)
+            ci = cb.cell_of[s]
+            kinds = (EMPTY, KIND_A, KIND_B, KIND_C) if ci in open_cell else (cb.base_cells[ci],)
+            if EMPTY in kinds or KIND_C in kinds:
+                stack.append(cb.straight[s])
+            if KIND_A in kinds:
+                stack.append(cb.bounce[s])
+            if KIND_C in kinds:
+                stack.append(cb.spawn[s])
+        return sorted(seen)
+
+    def _step(self, src: int, dst: int, cond: Sequence[int]) -> int:
+        """Literal of the step src -> dst taken when every literal of ``cond`` holds."""
+        solver = self.solver
+        vs = self.state_var[src]
+        if not cond:
+            lit = vs
+        else:
+            lit = solver.new_var()
+            solver.add_clause([-lit, vs])
+            for c in cond:
+                solver.add_clause([-lit, c])
+            solver.add_clause([lit, -vs, *(-c for c in cond)])
+        solver.add_clause([-lit, self.state_var[dst]])
+        step = (src, dst, lit)
+        self.steps.append(step)
+        self.steps_into.setdefault(dst, []).append(step)
+        return lit
+
+    def _stopped(self) -> bool:
+        return self.should_stop is not None and self.should_stop()
+
+    def _encode(self) -> bool:
+        """Build the formula; False when ``should_stop`` fired first (the formula is then partial)."""
+        cb, solver = self.cb, self.solver
+        for ci in self.slots:
+            a, b, c = solver.new_var(), solver.new_var(), solver.new_var()
+            self.kind_var[ci] = (a, b, c)
+            solver.add_clause([-a, -b])
+            solver.add_clause([-a, -c])
+            solver.add_clause([-b, -c])
+        for letter, idx in (("A", 0), ("B", 1), ("C", 2)):
+            exactly(solver, [kv[idx] for kv in self.kind_var.values()], self.inventory[letter])
+
+        states = self._reachable_states()
+        for s in states:
+            self.state_var[s] = solver.new_var()
+
+        landing: List[List[int]] = [[] for _ in cb.targets]  # step literals that light each target
+        for i, s in enumerate(states):
+            if not i % ENCODE_POLL and self._stopped():
+                return False
+            ci = cb.cell_of[s]
+            # (successor, condition, lands on the next point): a spawned copy starts where it is
+            if ci in self.kind_var:
+                a, b, c = self.kind_var[ci]
+                moves = [(cb.straight[s], (-a, -b), True), (cb.bounce[s], (a,), True), (cb.spawn[s], (c,), False)]
+            else:
+                k = cb.base_cells[ci]
+                moves = []
+                if k in (EMPTY, KIND_C):
+                    moves.append((cb.straight[s], (), True))
+                if k == KIND_A:
+                    moves.append((cb.bounce[s], (), True))
+                if k == KIND_C:
+                    moves.append((cb.spawn[s], (), False))
+            for dst, cond, lands in moves:
+                if dst < 0:
+                    continue    # leaves the lattice; no target lies off it
+                lit = self._step(s, dst, cond)
+                if lands:
+                    for k in range(len(cb.targets)):
+                        if cb.hit_bit[s] >> k & 1:
+                            landing[k].append(lit)
+
+        starts = set(cb.starts)
+        for s in states:
+            if s not in starts:
+                solver.add_clause([-self.state_var[s], *(lit for _, _, lit in self.steps_into.get(s, ()))])
+        for s in starts:
+            solver.add_clause([self.state_var[s]])
+        for lits in landing:
+            solver.add_clause(lits)
+        if self.prune is not None:
+            self._add_prune(self.prune)
+        self.encoded = True
+        return True
+
+    def _add_prune(self, prune: TargetPrune) -> None:
+        """Unit clauses for the kinds the backward pass rules out (see lazor_core.backward)."""
+        if not prune.feasible:
+            self.solver.add_clause([])
+            return
+        for ci, lits in self.kind_var.items():
+            ok = prune.allowed[ci]
+            for code, lit in zip((KIND_A, KIND_B, KIND_C), lits):
+                if not ok >> code & 1:
+                    self.solver.add_clause([-lit])
+                    self.pruned += 1
+            if not ok >> EMPTY & 1:
+                self.solver.add_clause(list(lits))
+                self.pruned += 1
+
+    # -- search --------------------------------------------------------------
+
+    def run(self) -> Optional[bytearray]:
+        """Cells of a solution, or None when none exists (or the run was cancelled)."""
+        cb, solver = self.cb, self.solver
+        full = cb.full_mask
+        if not self.encoded and not self._encode():
+            self.cancelled = True
+            return None
+        while True:
+            result = solver.solve(self.should_stop)
+            if result is None:
+                self.cancelled = True
+                return None
+            if not result:
+                self.exhausted = True
+                return None
+            model = solver.model()
+            cells = bytearray(cb.base_cells)
+            for ci, (a, b, c) in self.kind_var.items():
+                cells[ci] = KIND_A if model[a] else KIND_B if model[b] else KIND_C if model[c] else EMPTY
+            self.layouts += 1
+            got = trace_mask(cb, cells, self.counters, SHORT)
+            if got == full:
+                return cells
+            if self.diagnose:
+                n = popcount(got)
+                if n > self.best_hit:
+                    self.best_hit = n
+                    self.best_cells = cells
+            self._add_loop_formula(model, cells)
+
+    def coverage(self) -> Optional[float]:
+        """1.0 once no layout is left; a CDCL run has no meaningful partial share."""
+        return 1.0 if self.exhausted else None
+
+    def _reached(self, cells: bytearray) -> bytearray:
+        """Lattice states the beams visit over ``cells`` (the kernel trace's seen set)."""
+        cb = self.cb
+        seen = bytearray(cb.n_states)
+        stack = list(cb.starts)
+        while stack:
+            s = stack.pop()
+            while s >= 0 and not seen[s]:
+                seen[s] = 1
+                k = cells[cb.cell_of[s]]
+                if k == EMPTY:
+                    s = cb.straight[s]
+                elif k == KIND_A:
+                    s = cb.bounce[s]
+                elif k == KIND_B:
+                    break
+                else:
+                    stack.append(cb.spawn[s])
+                    s = cb.straight[s]
+        return seen
+
+    def _add_loop_formula(self, model: List[bool], cells: bytearray) -> None:
+        """Exclude the unfounded states the model lit without a laser reaching them.
+
+        ``U`` is split into the strongly connected components of the steps the
+        model takes inside it, and each component gets its own loop formula:
+        one without a lit entry from the rest of ``U`` always exists, and its
+        formula is what this model violates. A single state has no step to
+        itself, so its formula would repeat its support clause and is skipped.
+        """
+        seen = self._reached(cells)
+        unfounded = {s for s, v in self.state_var.items() if model[v] and not seen[s]}
+        # a lit target step always has a lit source, so a failed model has a nonempty U
+        assert unfounded, "model lights every target yet the trace does not"
+        succ: Dict[int, List[int]] = {s: [] for s in unfounded}
+        for src, dst, lit in self.steps:
+            if src in unfounded and dst in unfounded and model[lit]:
+                succ[src].append(dst)
+        for comp in _components(succ):
+            if len(comp) == 1:
+                continue
+            entries = [lit for s in comp for src, _, lit in self.steps_into.get(s, ()) if src not in comp]
+            for s in comp:
+                self.solver.add_clause([-self.state_var[s], *entries])
+            self.loops += 1
+
+
+def _components(succ: Dict[int, List[int]]) -> List[Set[int]]:
+    """Strongly connected components of a graph given as successor lists (iterative Tarjan)."""
+    index: Dict[int, int] = {}
+    low: Dict[int, int] = {}
+    on_stack: Set[int] = set()
+    stack: List[int] = []
+    comps: List[Set[int]] = []
+    for root in succ:
+        if root in index:
+            continue
+        work = [(root, 0)]
+        while work:
+            v, i = work.pop()
+            if i == 0:
+                index[v] = low[v] = len(index)
+                stack.append(v)
+                on_stack.add(v)
+            nxt = succ[v]
+            if i < len(nxt):
+                work.append((v, i + 1))
+                w = nxt[i]
+                if w not in index:
+                    work.append((w, 0))
+                elif w in on_stack:
+                    low[v] = min(low[v], index[w])
+                continue
+            if low[v] == index[v]:
+                comp = set()
+                while True:
+                    w = stack.pop()
+                    on_stack.discard(w)
+                    comp.add(w)
+                    if w == v:
+                        break
+                comps.append(comp)
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[v])
+    return comps
@@ -0,0 +1,815 @@
+# lazor_core/search.py
+"""Layout searches over a compiled board.
+
+:class:`BacktrackSearch` (beam-guided backtracking)
+    Traces the lasers on the current partial layout (undecided slots behave as
+    empty) and branches only on the first undecided slot a beam is about to
+    enter: leave it empty, or put one of the remaining A/B/C blocks there. When
+    no beam touches an undecided slot the trace is final, so the leftover
+    inventory can go into any of the untouched slots without changing the
+    result. The search size depends on beam path length, not on slot count.
+    With the kernel backend (and no ``counters``) the frontier comes from a
+    :class:`lazor_core.incremental.IncrementalTracer` that each decision
+    extends and each undo cuts back, instead of a trace of every beam per node.
+
+:class:`CombinationSearch` (nested combinations)
+    The original enumeration: every combination of positions for each block
+    type in nesting order, with nogood learning (see :mod:`lazor_core.nogood`).
+    ``order="auto"`` picks the order per board (:func:`lazor_core.order.plan_order`);
+    with ``prune`` the two inner levels are also swapped per outer combination
+    when the other nesting has fewer middle-loop iterations over the actual pools.
+
+Both expose the same counters (``layouts``, ``best_hit``, ``best_cells``), a
+``should_stop`` hook, polled every few hundred layouts, that cancels the run, and
+:meth:`coverage`, the share of the layout space the run has decided so far.
+``counters`` (a :class:`lazor_core.counters.TraceCounters`, kernel backend only)
+accumulates tracer statistics over the whole search.
+``prune`` (a :class:`lazor_core.backward.TargetPrune`) skips slot assignments
+the backward pass from the targets rules out: a block kind a slot may not hold
+is never tried there, and a subtree fails as soon as the slots that need a block
+outnumber the blocks left. ``pruned`` counts the branches (or layouts) skipped.
+:meth:`state` / :meth:`restore` save and reload a run's cursor and counters
+(see :mod:`lazor_core.checkpoint`): the decision path of the node being
+entered for :class:`BacktrackSearch`, the position tuples of the layout about
+to be traced for :class:`CombinationSearch`. A restored run continues with
+that node or layout and evaluates nothing it had already covered.
+:meth:`CombinationSearch.run_range` visits only the layouts whose rank in the
+nested enumeration (:class:`lazor_core.rank.LayoutRank`) falls in ``[start, end)``.
+``backend`` selects the tracer: ``"kernel"`` (bytearray cells, the default),
+``"bitboard"`` (three occupancy ints, see :mod:`lazor_core.bitboard`) or, for
+:class:`CombinationSearch` only, ``"numpy"`` (candidates are evaluated in chunks
+by :func:`lazor_core.batch.trace_cells_batch`).
+``trace_mode`` picks the kernel tracer's early stop (see :mod:`lazor_core.kernel`):
+``SHORT`` by default, or ``FAST`` with ``reach`` (built by
+:func:`lazor_core.backward.target_reach` when not given). A ``FAST`` trace that
+gives up reports a partial mask, so ``best_hit`` is then only a lower bound.
+The other backends always trace in ``FULL``.
+"""
+from __future__ import annotations
+from itertools import chain, combinations, islice
+from math import comb
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .kernel import (
+    DEAD, EMPTY, FAST, FULL, KIND_A, KIND_B, KIND_C, KIND_CODES, SHORT, TRACE_MODES, CompiledBoard,
+    popcount, trace_frontier, trace_mask, trace_touched,
+)
+from .counters import TraceCounters
+from .incremental import UNDECIDED, IncrementalTracer
+from .batch import BatchTables, np, trace_cells_batch
+from .bitboard import BitBoard, OccupancyView, trace_bits, trace_bits_frontier, trace_bits_touched
+from .nogood import NogoodTrie
+from .backward import TargetPrune, target_reach
+from .order import AUTO, OrderPlan, plan_order
+from .rank import LayoutRank
+
+BACKENDS = ("kernel", "bitboard", "numpy")
+BATCH_SIZE = 4096  # candidates per chunk for the numpy backend
+
+BRANCH_ORDER = (KIND_A, KIND_C, KIND_B, EMPTY)
+STOP_POLL = 255  # poll should_stop when (counter & STOP_POLL) == 0
+
+Decision = Tuple[int, int]  # (cell index, kind code)
+_SOLVED, _CLOSED = -1, -2   # BacktrackSearch._node: a solving leaf / nothing to branch on
+
+
+def layout_space(n: int, a: int, b: int, c: int) -> int:
+    """Ways to place ``a`` A, ``b`` B and ``c`` C blocks on ``n`` slots."""
+    if a + b + c > n:
+        return 0
+    return comb(n, a) * comb(n - a, b) * comb(n - a - b, c)
+
+
+def combinations_from(pool: Sequence[int], n: int, start: Sequence[int]) -> Iterator[tuple]:
+    """``combinations(pool, n)`` from the combination ``start`` (inclusive) on."""
+    if len(start) != n:
+        raise ValueError("resume position does not match the level size")
+    m = len(pool)
+    idx = [pool.index(p) for p in start]
+    while True:
+        yield tuple(pool[i] for i in idx)
+        for i in reversed(range(n)):
+            if idx[i] != i + m - n:
+                break
+        else:
+            return
+        idx[i] += 1
+        for j in range(i + 1, n):
+            idx[j] = idx[j - 1] + 1
+
+
+def _hex(cells: Optional[bytearray]) -> Optional[str]:
+    return cells.hex() if cells is not None else None
+
+
+def _unhex(text: Optional[str]) -> Optional[bytearray]:
+    return bytearray.fromhex(text) if text is not None else None
+
+
+def resolve_trace_mode(cb: CompiledBoard, slots: Sequence[int], trace_mode: Optional[str], backend: str,
+                       reach: Optional[List[int]] = None,
+                       prune: Optional[TargetPrune] = None) -> Tuple[str, Optional[List[int]]]:
+    """``(mode, reach)`` for a search: the default mode for ``backend`` when
+    ``trace_mode`` is None, and the reach table ``FAST`` needs."""
+    if trace_mode is None:
+        trace_mode = SHORT if backend == "kernel" else FULL
+    if trace_mode not in TRACE_MODES:
+        raise ValueError(f"Unknown trace mode: {trace_mode}")
+    if trace_mode != FULL and backend != "kernel":
+        raise ValueError("early-stopping trace modes need the kernel backend")
+    if trace_mode == FAST and reach is None:
+        reach = target_reach(cb, slots, prune)
+    return trace_mode, reach
+
+
+class BacktrackSearch:
+    """Depth-first search; call :meth:`run` once.
+
+    ``slots`` are flat cell indices (r * W + c) of the open slots and
+    ``inventory`` maps 'A'/'B'/'C' to the number of blocks that must be placed.
+    """
+
+    def __init__(self, cb: CompiledBoard, inventory: Dict[str, int], slots: Sequence[int],
+                 diagnose: bool = False, backend: str = "kernel", counters: Optional[TraceCounters] = None,
+                 prune: Optional[TargetPrune] = None, trace_mode: Optional[str] = None,
+                 reach: Optional[List[int]] = None):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend: {backend}")
+        if counters is not None and backend != "kernel":
+            raise ValueError("trace counters need the kernel backend")
+        if backend == "numpy":
+            raise ValueError("the numpy backend batches candidates for the combinations strategy only")
+        self.cb = cb
+        self.slots = list(slots)
+        self.remaining = [0, inventory.get("A", 0), inventory.get("B", 0), inventory.get("C", 0)]
+        self.diagnose = diagnose
+        self.counters = counters
+        self.trace_mode, self.reach = resolve_trace_mode(cb, self.slots, trace_mode, backend, reach, prune)
+        self.cells = bytearray(cb.base_cells)
+        self.undecided = bytearray(cb.n_cells + 1)
+        for ci in self.slots:
+            self.undecided[ci] = 1
+        self.n_undecided = len(self.slots)
+        self.prune = prune
+        self.allowed = prune.allowed if prune is not None else None
+        # undecided slots that need a block
+        self.n_forced = sum(prune.forces_block(ci) for ci in self.slots) if prune is not None else 0
+        self.bits = BitBoard(cb) if backend == "bitboard" else None
+        if self.bits is not None:
+            self.occ = [0, *self.bits.base]
+            self.undecided_bits = sum(1 << ci for ci in self.slots)
+        # kernel frontiers come from a tracer that _decide / _undo update in place
+        self.tracer = IncrementalTracer(cb, self.cells, self.undecided) \
+            if self.bits is None and counters is None else None
+
+        self.nodes = 0          # frontier traces run
+        self.layouts = 0        # complete traces (layout classes) evaluated
+        self.space = self._subtree()
+        self.covered = 0        # layouts in the subtrees closed so far
+        self.pruned = 0         # branches skipped by ``prune``
+        self.dead = 0           # subtrees a FAST frontier trace ruled out
+        self.best_hit = 0
+        self.best_cells: Optional[bytearray] = None
+        self.should_stop: Optional[Callable[[], bool]] = None
+        self.cancelled = False
+        self.path: List[Decision] = []      # decisions down to the current node
+        self._resume: Optional[List[Decision]] = None
+
+    def state(self) -> dict:
+        """Cursor (the current node's decision path) and counters, for :meth:`restore`."""
+        return {"cursor": [list(d) for d in self.path], "nodes": self.nodes, "layouts": self.layouts,
+                "covered": self.covered, "pruned": self.pruned, "dead": self.dead,
+                "best_hit": self.best_hit, "best_cells": _hex(self.best_cells)}
+
+    def restore(self, state: dict) -> None:
+        """Continue from a :meth:`state` of the same search in the next :meth:`run`."""
+        for key in ("nodes", "layouts", "covered", "pruned", "dead", "best_hit"):
+            setattr(self, key, state[key])
+        self.best_cells = _unhex(state["best_cells"])
+        self._resume = [(ci, code) for ci, code in state["cursor"]]
+
+    def run(self, prefix: Iterable[Decision] = ()) -> Optional[bytearray]:
+        """Cells of the first solution found, or None when the space is exhausted.
+
+        ``prefix`` replays decisions produced by :meth:`split` so that a run only
+        covers the subtree below them.
+        """
+        if self._start(prefix) and self._dfs():
+            return self.cells
+        return None
+
+    def solutions(self) -> Iterator[bytearray]:
+        """Cells of every solving layout, lazily, instead of :meth:`run`.
+
+        The same bytearray is yielded each time (copy it to keep it). At a
+        solving leaf no beam touches the undecided slots, so the leftover
+        inventory is placed there in every possible way.
+        """
+        if not self._start(()):
+            return
+        for _ in self._solving_leaves():
+            yield from self._completions()
+
+    def count(self, limit: Optional[int] = None) -> int:
+        """Number of solving layouts, instead of :meth:`run`; stops once ``limit`` is reached.
+
+        The layouts below a solving leaf are counted with :meth:`_subtree`, not
+        enumerated. With ``limit`` the result is at most ``limit``.
+        """
+        total = 0
+        if not self._start(()):
+            return 0
+        for _ in self._solving_leaves():
+            total += self._subtree()
+            if limit is not None and total >= limit:
+                return limit
+        return total
+
+    def _start(self, prefix: Iterable[Decision]) -> bool:
+        """Replay ``prefix`` (or a restored path); False when nothing below can solve."""
+        if self._resume is not None:
+            prefix = ()         # the restored path replays every decision
+        for ci, code in prefix:
+            self._decide(ci, code)
+        if self._blocks_left() > self.n_undecided:
+            return False
+        if self.prune is not None and not self.prune.feasible:
+            self.covered += self._subtree()
+            return False
+        return True
+
+    def _completions(self) -> Iterator[bytearray]:
+        """Every placement of the remaining blocks on the undecided slots, in ``self.cells``."""
+        cells = self.cells
+        free0 = [ci for ci in self.slots if self.undecided[ci]]
+        ka, kb, kc = self.remaining[KIND_A], self.remaining[KIND_B], self.remaining[KIND_C]
+        for pa in combinations(free0, ka):
+            for p in pa: cells[p] = KIND_A
+            free1 = [p for p in free0 if not cells[p]]
+            for pb in combinations(free1, kb):
+                for p in pb: cells[p] = KIND_B
+                free2 = [p for p in free1 if not cells[p]]
+                for pc in combinations(free2, kc):
+                    for p in pc: cells[p] = KIND_C
+                    yield cells
+                    for p in pc: cells[p] = EMPTY
+                for p in pb: cells[p] = EMPTY
+            for p in pa: cells[p] = EMPTY
+
+    def split(self, n_tasks: int, max_depth: int = 8) -> List[List[Decision]]:
+        """Decision prefixes covering the whole tree, in depth-first order.
+
+        The tree is expanded level by level until there are at least ``n_tasks``
+        prefixes; running each prefix in order visits layouts in the same order as
+        a single :meth:`run`.
+        """
+        prefixes: List[List[Decision]] = [[]]
+        for _ in range(max_depth):
+            if len(prefixes) >= n_tasks:
+                break
+            expanded: List[List[Decision]] = []
+            grew = False
+            for prefix in prefixes:
+                children = self._children(prefix)
+                if children is None:
+                    expanded.append(prefix)
+                else:
+                    expanded.extend(children)
+                    grew = True
+            prefixes = expanded
+            if not grew:
+                break
+        return prefixes
+
+    def _children(self, prefix: List[Decision]) -> Optional[List[List[Decision]]]:
+        for ci, code in prefix:
+            self._decide(ci, code)
+        try:
+            if self._blocks_left() > self.n_undecided:
+                return []
+            _, ci = self._frontier()
+            if ci == DEAD:
+                return []
+            if ci < 0:
+                return None
+            n_left = self.n_undecided - 1
+            return [
+                prefix + [(ci, code)] for code in BRANCH_ORDER
+                if (self.remaining[code] if code else self._blocks_left() <= n_left)
+                and (self.allowed is None or self.allowed[ci] >> code & 1)
+            ]
+        finally:
+            for ci, code in reversed(prefix):
+                self._undo(ci, code)
+
+    def _frontier(self) -> Tuple[int, int]:
+        if self.tracer is not None:
+            return self.tracer.frontier(self.trace_mode, self.reach)
+        if self.bits is None:
+            return trace_frontier(self.cb, self.cells, self.undecided, self.counters, self.trace_mode, self.reach)
+        occ = self.occ
+        return trace_bits_frontier(self.bits, occ[KIND_A], occ[KIND_B], occ[KIND_C], self.undecided_bits)
+
+    def _decide(self, ci: int, code: int) -> None:
+        self.path.append((ci, code))
+        self.undecided[ci] = 0
+        self.n_undecided -= 1
+        if self.allowed is not None and not self.allowed[ci] & 1:
+            self.n_forced -= 1
+        self.cells[ci] = code
+        if code:
+            self.remaining[code] -= 1
+        if self.tracer is not None:
+            self.tracer.set_index(ci, code)
+        if self.bits is not None:
+            self.undecided_bits &= ~(1 << ci)
+            self.occ[code] |= 1 << ci
+
+    def _undo(self, ci: int, code: int) -> None:
+        self.path.pop()
+        if code:
+            self.remaining[code] += 1
+        self.cells[ci] = EMPTY
+        self.undecided[ci] = 1
+        self.n_undecided += 1
+        if self.tracer is not None:
+            self.tracer.set_index(ci, UNDECIDED)
+        if self.allowed is not None and not self.allowed[ci] & 1:
+            self.n_forced += 1
+        if self.bits is not None:
+            self.undecided_bits |= 1 << ci
+            self.occ[code] &= ~(1 << ci)
+
+    def _blocks_left(self) -> int:
+        r = self.remaining
+        return r[KIND_A] + r[KIND_B] + r[KIND_C]
+
+    def _subtree(self, code: Optional[int] = None) -> int:
+        """Complete layouts below the current node (below its ``code`` child when given)."""
+        r = self.remaining
+        n, a, b, c = self.n_undecided, r[KIND_A], r[KIND_B], r[KIND_C]
+        if code is not None:
+            n -= 1
+            a -= code == KIND_A
+            b -= code == KIND_B
+            c -= code == KIND_C
+        return layout_space(n, a, b, c)
+
+    def coverage(self) -> float:
+        """Share of the layout space (over ``slots``) decided so far; 1.0 once exhausted."""
+        return self.covered / self.space if self.space else 1.0
+
+    def _fill_leftover(self, cells: bytearray) -> bytearray:
+        """Drop the remaining inventory into undecided slots (row-major order)."""
+        todo: List[int] = []
+        for code in (KIND_A, KIND_B, KIND_C):
+            todo.extend([code] * self.remaining[code])
+        free = (ci for ci in self.slots if self.undecided[ci])
+        for code, ci in zip(todo, free):
+            cells[ci] = code
+        return cells
+
+    def _node(self) -> int:
+        """Evaluate the current node: the slot to branch on, ``_SOLVED`` or ``_CLOSED``."""
+        self.nodes += 1
+        if self.should_stop is not None and not (self.nodes & STOP_POLL) and self.should_stop():
+            self.cancelled = True
+        if self.cancelled:
+            return _CLOSED
+        if self._resume is not None and len(self.path) == len(self._resume):
+            self._resume = None     # back at the restored node: search on as usual
+        if self.n_forced > self._blocks_left():
+            self.pruned += 1
+            self.covered += self._subtree()
+            return _CLOSED
+        mask, ci = self._frontier()
+
+        if ci == DEAD:
+            self.dead += 1
+            self.covered += self._subtree()
+            return _CLOSED
+        if ci < 0:
+            self.layouts += 1
+            self.covered += self._subtree()
+            if mask == self.cb.full_mask:
+                return _SOLVED
+            if self.diagnose:
+                n = popcount(mask)
+                if n > self.best_hit:
+                    self.best_hit = n
+                    self.best_cells = self._fill_leftover(bytearray(self.cells))
+            return _CLOSED
+        return ci
+
+    def _branches(self, ci: int) -> List[int]:
+        """Kinds to try at slot ``ci``, in order (the ones ``prune`` rules out are counted and skipped)."""
+        remaining = self.remaining
+        allowed = self.allowed
+        codes = BRANCH_ORDER
+        if self._resume is not None:
+            # on the restored path: the branches before it were covered already
+            rci, rcode = self._resume[len(self.path)]
+            if rci != ci:
+                raise ValueError("the checkpoint does not belong to this search")
+            codes = BRANCH_ORDER[BRANCH_ORDER.index(rcode):]
+        out = []
+        for code in codes:
+            if code == EMPTY:
+                if self._blocks_left() > self.n_undecided - 1:
+                    continue
+            elif not remaining[code]:
+                continue
+            if allowed is not None and not allowed[ci] >> code & 1:
+                self.pruned += 1
+                self.covered += self._subtree(code)
+                continue
+            out.append(code)
+        return out
+
+    def _dfs(self) -> bool:
+        ci = self._node()
+        if ci < 0:
+            if ci == _SOLVED:
+                self._fill_leftover(self.cells)
+                return True
+            return False
+        for code in self._branches(ci):
+            self._decide(ci, code)
+            if self._dfs():
+                return True
+            self._undo(ci, code)
+        return False
+
+    def _solving_leaves(self) -> Iterator[None]:
+        """:meth:`_dfs` that goes on after a solution: yields at every solving leaf."""
+        ci = self._node()
+        if ci < 0:
+            if ci == _SOLVED:
+                yield
+            return
+        for code in self._branches(ci):
+            self._decide(ci, code)
+            yield from self._solving_leaves()
+            self._undo(ci, code)
+
+
+class CombinationSearch:
+    """Nested combinations over ``slots`` for the block types in ``order``.
+
+    ``order`` is the loop nesting, outermost first (``"CAB"`` for
+    ``lazor_solver``, ``"ABC"`` for ``lazor_core.solver``). Failed layouts are
+    learned as nogoods over the slots their beams touched; ``nogood_cap`` bounds
+    the trie (0 disables learning). The numpy backend traces ``batch_size``
+    candidates at a time and does not learn nogoods.
+    """
+
+    def __init__(self, cb: CompiledBoard, inventory: Dict[str, int], slots: Sequence[int],
+                 order: str = "CAB", diagnose: bool = False, nogood_cap: int = 200_000,
+                 backend: str = "kernel", batch_size: int = BATCH_SIZE,
+                 counters: Optional[TraceCounters] = None, prune: Optional[TargetPrune] = None,
+                 adaptive: bool = True, trace_mode: Optional[str] = None, reach: Optional[List[int]] = None):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend: {backend}")
+        if counters is not None and backend != "kernel":
+            raise ValueError("trace counters need the kernel backend")
+        self.plan: Optional[OrderPlan] = None
+        if order == AUTO:
+            self.plan = plan_order(inventory, slots, prune)
+            order = self.plan.order
+        self.order = order
+        self.cb = cb
+        self.counters = counters
+        self.trace_mode, self.reach = resolve_trace_mode(cb, slots, trace_mode, backend, reach, prune)
+        self.bits = BitBoard(cb) if backend == "bitboard" else None
+        self.batch = BatchTables(cb) if backend == "numpy" else None
+        self.batch_size = batch_size
+        self.slots = list(slots)
+        self.levels = [(KIND_CODES[k], inventory.get(k, 0)) for k in order]
+        self.diagnose = diagnose
+        self.nogoods = NogoodTrie(nogood_cap) if nogood_cap > 0 else None
+        self.prune = prune
+        self.adaptive = adaptive and prune is not None
+        self.total = sum(n for _, n in self.levels)
+        counts = [inventory.get(k, 0) for k in "ABC"]
+        self.space = prune.space(inventory) if prune is not None else layout_space(len(self.slots), *counts)
+
+        self.layouts = 0        # layouts visited (traced or skipped by a nogood)
+        self.traces = 0
+        self.pruned = 0         # position tuples skipped by ``prune``
+        self.reorders = 0       # outer combinations whose inner levels were swapped
+        self.best_hit = 0
+        self.best_cells: Optional[bytearray] = None
+        self.should_stop: Optional[Callable[[], bool]] = None
+        self.cancelled = False
+        self.cursor: Optional[tuple] = None     # the layout at the last should_stop poll, per nesting level
+        self._resume: Optional[tuple] = None
+        self.limit: Optional[int] = None        # stop, unsolved, once this many layouts were visited
+
+    def state(self) -> dict:
+        """Cursor (the position tuples of the layout at the last poll, not yet traced) and counters."""
+        cursor = [list(pos) for pos in self.cursor] if self.cursor is not None else None
+        return {"cursor": cursor, "layouts": self.layouts - (cursor is not None), "traces": self.traces,
+                "pruned": self.pruned, "best_hit": self.best_hit, "best_cells": _hex(self.best_cells)}
+
+    def restore(self, state: dict) -> None:
+        """Continue from a :meth:`state` of the same search in the next :meth:`run`."""
+        for key in ("layouts", "traces", "pruned", "best_hit"):
+            setattr(self, key, state[key])
+        self.best_cells = _unhex(state["best_cells"])
+        if state["cursor"] is not None:
+            self._resume = tuple(tuple(pos) for pos in state["cursor"])
+
+    def coverage(self) -> float:
+        """Share of the (pruned) layout space visited so far; each split task counts toward the whole."""
+        return min(1.0, self.layouts / self.space) if self.space else 1.0
+
+    def ranks(self) -> LayoutRank:
+        """Ranking of this search's layouts in visiting order (not available with ``prune``)."""
+        if self.prune is not None:
+            raise ValueError("layout ranks follow the unpruned enumeration")
+        return LayoutRank(self.slots, [n for _, n in self.levels])
+
+    def run_range(self, start: int, end: int) -> Optional[bytearray]:
+        """Like :meth:`run`, over the layouts ranked ``start`` to ``end - 1`` only.
+
+        The solution found, if any, has rank ``start + layouts - 1``;
+        :meth:`coverage` is then relative to the range.
+        """
+        ranks = self.ranks()
+        start, end = max(0, start), min(end, ranks.total)
+        self.space = max(0, end - start)
+        if start >= end:
+            return None
+        self._resume = ranks.unrank(start)
+        self.limit = end - start
+        return self.run()
+
+    def split_level(self) -> int:
+        """Nesting level whose first position the search can be split on (-1: none)."""
+        for i, (_, n) in enumerate(self.levels):
+            if n:
+                return i
+        return -1
+
+    def n_splits(self) -> int:
+        """Number of values ``first`` can take in :meth:`run` (1 when unsplittable)."""
+        lvl = self.split_level()
+        if lvl < 0:
+            return 1
+        return max(1, len(self._pool(self.slots, lvl)) - self.levels[lvl][1] + 1)
+
+    def _pool(self, pool: Sequence[int], lvl: int) -> Sequence[int]:
+        """The part of ``pool`` where level ``lvl``'s kind is allowed."""
+        if self.prune is None:
+            return pool
+        bit = 1 << self.levels[lvl][0]
+        return [p for p in pool if self.prune.allowed[p] & bit]
+
+    def run(self, first: Optional[int] = None) -> Optional[bytearray]:
+        """Cells of the first solution, or None.
+
+        With ``first`` set, only layouts whose outermost non-empty combination
+        starts at ``slots[first]`` are visited; the ranges for first = 0, 1, ...
+        concatenate to the full enumeration order.
+        """
+        split = self.split_level() if first is not None else -1
+        if self._resume is not None and (first is not None or self.batch is not None):
+            raise ValueError("a restored combinations run needs the kernel or bitboard backend and no split")
+        if self.prune is not None and not self.prune.feasible:
+            return None
+        # swapping the inner levels keeps the split level's enumeration intact only when it is outermost
+        self._swap_ok = self.adaptive and split <= 0
+
+        def level(pool, n, lvl, start=None):
+            if self.prune is not None:
+                return self._pruned_level(pool, n, lvl, split, first, start)
+            if n > len(pool):
+                return [()]
+            if start is not None:
+                return combinations_from(pool, n, start)
+            if lvl == split:
+                return ((pool[first],) + rest for rest in combinations(pool[first + 1:], n - 1))
+            return combinations(pool, n)
+
+        if self.batch is not None:
+            return self._run_batch(level)
+        if self.bits is not None:
+            return self._run_bits(level)
+        return self._run_cells(level)
+
+    def _pruned_level(self, pool, n, lvl, split, first, start=None) -> Iterator[tuple]:
+        """``level`` under ``prune``: allowed slots only, and every slot that needs
+        a block must still fit into the levels below."""
+        forced = [p for p in pool if self.prune.forces_block(p)]
+        # ``pool`` is the free slots, so the blocks still to place after this level are
+        later = self.total - (len(self.slots) - len(pool)) - n
+        cand = self._pool(pool, lvl)
+        if n > len(cand):
+            return iter(())
+        if lvl == split:
+            combos = ((cand[first],) + rest for rest in combinations(cand[first + 1:], n - 1))
+        elif start is not None:
+            combos = combinations_from(cand, n, start)
+        else:
+            combos = combinations(cand, n)
+        if len(forced) <= later:
+            return combos
+        return self._cover(combos, forced, later)
+
+    def _cover(self, combos, forced, later) -> Iterator[tuple]:
+        for pos in combos:
+            if sum(p not in pos for p in forced) <= later:
+                yield pos
+            else:
+                self.pruned += 1
+
+    def _inner_order(self, free: Sequence[int]) -> Tuple[int, int]:
+        """Level ids for the middle and innermost loop over the free slots ``free``."""
+        if not self._swap_ok:
+            return 1, 2
+        (_, n2), (_, n3) = self.levels[1], self.levels[2]
+        if comb(len(self._pool(free, 2)), n3) < comb(len(self._pool(free, 1)), n2):
+            self.reorders += 1
+            return 2, 1
+        return 1, 2
+
+    def _run_cells(self, level) -> Optional[bytearray]:
+        cb = self.cb
+        full = cb.full_mask
+        base_cells = cb.base_cells
+        slots = self.slots
+        levels = self.levels
+        k1, n1 = levels[0]
+        watch = bytearray(cb.n_cells + 1)
+        for ci in slots:
+            watch[ci] = 1
+        nogoods = self.nogoods
+        should_stop = self.should_stop
+        limit = self.limit
+        counters = self.counters
+        mode, reach = self.trace_mode, self.reach
+
+        # One board for every layout: each level writes its blocks in place and
+        # clears them when it moves on; the free slots of a level are the EMPTY ones.
+        cells = bytearray(base_cells)
+        r1, r2, r3 = self._resume or (None, None, None)
+        self._resume = None
+        for pos1 in level(slots, n1, 0, r1):
+            for p in pos1: cells[p] = k1
+            free1 = [p for p in slots if not cells[p]]
+            i2, i3 = self._inner_order(free1)
+            (k2, n2), (k3, n3) = levels[i2], levels[i3]
+            for pos2 in level(free1, n2, i2, r2):
+                for p in pos2: cells[p] = k2
+                free2 = [p for p in free1 if not cells[p]]
+                for pos3 in level(free2, n3, i3, r3):
+                    if self.layouts == limit:
+                        return None
+                    self.layouts += 1
+                    if should_stop is not None and not (self.layouts & STOP_POLL):
+                        self.cursor = (pos1, pos2, pos3)
+                        if should_stop():
+                            self.cancelled = True
+                            return None
+                    for p in pos3: cells[p] = k3
+                    if nogoods is None:
+                        got = trace_mask(cb, cells, counters, mode, reach)
+                        self.traces += 1
+                    elif nogoods.match(cells):
+                        got = -1
+                    else:
+                        got, touched = trace_touched(cb, cells, watch, counters, mode, reach)
+                        self.traces += 1
+                        if got != full:
+                            nogoods.add([(ci, cells[ci]) for ci in touched])
+                    if got == full:
+                        return bytearray(cells)
+                    if self.diagnose and got > 0:
+                        n = popcount(got)
+                        if n > self.best_hit:
+                            self.best_hit = n
+                            self.best_cells = bytearray(cells)
+                    for p in pos3: cells[p] = EMPTY
+                r3 = None
+                for p in pos2: cells[p] = EMPTY
+            r2 = None
+            for p in pos1: cells[p] = EMPTY
+        return None
+
+    def _run_bits(self, level) -> Optional[bytearray]:
+        bb = self.bits
+        full = self.cb.full_mask
+        slots = self.slots
+        levels = self.levels
+        n1 = levels[0][1]
+        # Which level holds A, B and C: occupancy = base | that level's bits (lv is indexed by level id)
+        at = {k: i for i, (k, _) in enumerate(levels)}
+        ia, ib, ic = at[KIND_A], at[KIND_B], at[KIND_C]
+        base_a, base_b, base_c = bb.base
+        watch = sum(1 << ci for ci in slots)
+        nogoods = self.nogoods
+        should_stop = self.should_stop
+        limit = self.limit
+        lv = [0, 0, 0]
+        r1, r2, r3 = self._resume or (None, None, None)
+        self._resume = None
+
+        for pos1 in level(slots, n1, 0, r1):
+            lv[0] = used1 = sum(1 << p for p in pos1)
+            free1 = [p for p in slots if not used1 >> p & 1]
+            i2, i3 = self._inner_order(free1)
+            n2, n3 = levels[i2][1], levels[i3][1]
+            for pos2 in level(free1, n2, i2, r2):
+                lv[i2] = used2 = sum(1 << p for p in pos2)
+                free2 = [p for p in free1 if not used2 >> p & 1]
+                for pos3 in level(free2, n3, i3, r3):
+                    if self.layouts == limit:
+                        return None
+                    self.layouts += 1
+                    if should_stop is not None and not (self.layouts & STOP_POLL):
+                        self.cursor = (pos1, pos2, pos3)
+                        if should_stop():
+                            self.cancelled = True
+                            return None
+                    o = 0
+                    for p in pos3: o |= 1 << p
+                    lv[i3] = o
+                    a = base_a | lv[ia]
+                    b = base_b | lv[ib]
+                    c = base_c | lv[ic]
+                    if nogoods is None:
+                        got = trace_bits(bb, a, b, c)
+                        self.traces += 1
+                    elif nogoods.match_bits(a, b, c):
+                        continue
+                    else:
+                        got, touched = trace_bits_touched(bb, a, b, c, watch)
+                        self.traces += 1
+                        if got != full:
+                            view = OccupancyView(a, b, c)
+                            nogoods.add([(ci, view[ci]) for ci in touched])
+                    if got == full:
+                        return bb.cells_for(a, b, c)
+                    if self.diagnose:
+                        n = popcount(got)
+                        if n > self.best_hit:
+                            self.best_hit = n
+                            self.best_cells = bb.cells_for(a, b, c)
+                r3 = None
+            r2 = None
+        return None
+
+    def _candidates(self, level) -> Iterator[tuple]:
+        """Concatenated position tuples of the non-empty levels, in enumeration order."""
+        active = [(lvl, n) for lvl, (_, n) in enumerate(self.levels) if n]
+        if not active:
+            return iter([()])
+        last = len(active) - 1
+        used = bytearray(self.cb.n_cells + 1)
+
+        def walk(pool, depth, prefix):
+            lvl, n = active[depth]
+            if depth == last:
+                yield from (map(prefix.__add__, level(pool, n, lvl)) if prefix else level(pool, n, lvl))
+                return
+            for pos in level(pool, n, lvl):
+                for p in pos: used[p] = 1
+                yield from walk([p for p in pool if not used[p]], depth + 1, prefix + pos)
+                for p in pos: used[p] = 0
+
+        return walk(self.slots, 0, ())
+
+    def _run_batch(self, level) -> Optional[bytearray]:
+        cb = self.cb
+        full = cb.full_mask
+        base = np.frombuffer(bytes(cb.base_cells), dtype=np.int8)
+        kinds = None
+        candidates = self._candidates(level)
+
+        while True:
+            chunk = list(islice(candidates, self.batch_size))
+            if not chunk:
+                return None
+            self.layouts += len(chunk)
+            if self.should_stop is not None and self.should_stop():
+                self.cancelled = True
+                return None
+            width = len(chunk[0])
+            pos = np.fromiter(chain.from_iterable(chunk), dtype=np.intp,
+                              count=len(chunk) * width).reshape(len(chunk), width)
+            if kinds is None:
+                # Every candidate places the same kinds at the same tuple positions
+                kinds = np.array([k for k, n in self.levels for _ in range(n)], dtype=np.int8)
+            cells = np.tile(base, (len(chunk), 1))
+            cells[np.arange(len(chunk))[:, None], pos] = kinds
+            got = trace_cells_batch(cb, cells, tables=self.batch)
+            self.traces += len(chunk)
+            solved = np.nonzero(got == full)[0]
+            if len(solved):
+                return bytearray(cells[solved[0]].tobytes())
+            if self.diagnose:
+                counts = [popcount(int(m)) for m in got]
+                i = max(range(len(counts)), key=counts.__getitem__)
+                if counts[i] > self.best_hit:
+                    self.best_hit = counts[i]
+                    self.best_cells = bytearray(cells[i].tobytes())
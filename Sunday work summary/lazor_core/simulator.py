@@ -8,6 +8,8 @@ from __future__ import annotations
 from typing import Set, Tuple, List, Optional
 from .models import Laser, Block, BlockType
 from .board import Board
+from .counters import TraceCounters
+from .kernel import VisitedMap
 
 
 def get_block_at_position(board: Board, row: int, col: int) -> Block | None:
@@ -144,16 +146,22 @@ def _step_and_collide(board: Board, x: int, y: int, vx: int, vy: int) -> Tuple[i
     return nx, ny, beams
 
 
-def simulate_board(board: Board) -> Set[Tuple[int, int]]:
+def simulate_board(board: Board, counters: Optional[TraceCounters] = None,
+                   visited: Optional[VisitedMap] = None) -> Set[Tuple[int, int]]:
     """
     模拟所有激光在棋盘上的路径，返回被击中的点集合。
     
     这是 Stage 3 的核心函数，实现完整的激光物理引擎。
     
     简化实现：将 half-block 坐标视为网格坐标进行模拟。
+
+    循环检测用按状态编号索引的 visited 表（共 4 × (2W+1) × (2H+1) 个状态），
+    每个状态最多入队一次，因此模拟必然结束，不需要迭代上限。
     
     参数:
         board: 完整的棋盘配置（包含所有已放置的方块）
+        counters: 可选的 TraceCounters，统计步数、分束、循环截断、越界等
+        visited: 可选的 VisitedMap（大小同上），对同一棋盘的多次模拟复用
     
     返回:
         被激光击中的所有目标点的集合 (half-block 坐标)
@@ -164,13 +172,21 @@ def simulate_board(board: Board) -> Set[Tuple[int, int]]:
     from collections import deque
     active_lasers = deque(board.lasers)
     
-    # 用于检测循环（防止无限递归）
-    visited_states: Set[Tuple[int, int, int, int]] = set()
-    
-    max_iterations = 5000  # 防止无限循环的安全阀（含分束更稳）
+    # 用于检测循环：状态 (x, y, vx, vy) 的编号与 kernel 相同
+    xmax, ymax = board.ncols * 2, board.nrows * 2
+    stride = xmax + 1
+    if visited is None:
+        visited = VisitedMap(4 * stride * (ymax + 1))
+    seen = visited.flags
+    epoch = visited.next_epoch()
     
+    count = counters is not None
+    if count:
+        counters.traces += 1
+        counters.rays += len(board.lasers)
+
     iteration = 0
-    while active_lasers and iteration < max_iterations:
+    while active_lasers:
         iteration += 1
         laser = active_lasers.popleft()
         
@@ -181,24 +197,32 @@ def simulate_board(board: Board) -> Set[Tuple[int, int]]:
         
         # 推进一步并在半步中点判定碰撞（边界）
         new_x, new_y, out_dirs = _step_and_collide(board, laser.x, laser.y, laser.vx, laser.vy)
+        if count:
+            counters.steps += 1
+            if not out_dirs:
+                counters.absorbed += 1
+            elif len(out_dirs) > 1:
+                counters.splits += 1
+                counters.rays += len(out_dirs) - 1
 
         # 记录新位置为命中点
         hit_points.add((new_x, new_y))
 
-        # 边界检查（基于棋盘大小的宽松范围）
-        if new_y < -10 or new_y > board.nrows * 2 + 10 or new_x < -10 or new_x > board.ncols * 2 + 10:
+        # 边界检查：棋盘外没有方块，离开格点范围的光束不会再回来
+        if not (0 <= new_x <= xmax and 0 <= new_y <= ymax):
+            if count:
+                counters.out_of_bounds += 1
             continue
 
         # 分支后的光束入队
         for vx, vy in out_dirs:
-            state_key = (new_x, new_y, vx, vy)
-            if state_key in visited_states:
+            state = (new_y * stride + new_x) * 4 + (vx > 0) + 2 * (vy > 0)
+            if seen[state] == epoch:
+                if count:
+                    counters.cycles += 1
                 continue
-            visited_states.add(state_key)
+            seen[state] = epoch
             active_lasers.append(Laser(x=new_x, y=new_y, vx=vx, vy=vy))
     
-    if iteration >= max_iterations:
-        print(f"警告: 模拟达到最大迭代次数 ({max_iterations})")
-    
     return hit_points
 
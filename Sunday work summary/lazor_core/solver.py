@@ -8,21 +8,52 @@ Run:
 Features
 - Robust .bff parser (GRID, inventory lines, lasers, targets).
 - Movable vs fixed blocks (A/B/C in GRID are fixed; counts lines are inventory).
-- Ray tracer on a doubled grid (half-step = 1). Physics:
-    A (Reflect): reflect on the boundary hit (vertical → flip vx; horizontal → flip vy)
+- Ray tracer on a doubled grid (half-step = 1), the compiled kernel shared with
+  lazor_solver.py (lazor_core.kernel). Physics:
+    A (Reflect): reflect on the boundary hit (vertical → flip vx; horizontal → flip vy;
+                 a corner crossing consults the diagonal cell and flips both)
     B (Opaque): absorb ray
-    C (Refract): split — original continues + a reflected copy
+    C (Refract): split — original continues + a reflected copy from the point before the crossing
 - Combinational search by block type (no factorial over empties).
 - Early exit on first valid solution; optional diagnostics for best partial hit.
+- Backward pass from the targets (lazor_core.backward) rules out block kinds per
+  slot before the search; --prune-report prints how much of the space it removed.
+- Anytime solving: --time-limit / solve(board, deadline=...) stop the search and
+  return the best partial layout and the share of the space covered
+  (lazor_core.anytime).
+- --checkpoint PATH saves the search cursor every --checkpoint-every seconds and
+  on SIGTERM; --resume continues from it (lazor_core.checkpoint).
+- Pre-solve checks (lazor_core.feasibility) reject boards no layout can solve —
+  too many blocks, targets on the wrong x + y parity or out of every beam's
+  reach — before searching, and print why.
+- iter_solutions(board) streams every solution; count_solutions(board, limit)
+  counts them without building grids (limit=2 checks uniqueness).
 """
 from __future__ import annotations
 
 from dataclasses import dataclass
-from itertools import combinations
 from pathlib import Path
-from typing import List, Tuple, Dict, Optional, Set
+from typing import Iterator, List, Tuple, Dict, Optional, Set
 import argparse
+import copy
 import sys
+import time
+
+if not __package__:  # run as a script: python lazor_core/solver.py
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from lazor_core.anytime import EXHAUSTED, INTERRUPTED, SOLVED, TIMEOUT, SolveResult, deadline_in, stop_at
+from lazor_core.backward import backward_prune
+from lazor_core.cache import DEFAULT_PATH as CACHE_PATH, SolutionCache
+from lazor_core.checkpoint import DEFAULT_EVERY, run_checkpointed, run_meta
+from lazor_core.counters import TraceCounters
+from lazor_core.feasibility import analyze
+from lazor_core.ir import load_bffc
+from lazor_core.order import AUTO, ORDERS, plan_order
+from lazor_core.kernel import TRACE_MODES, CompiledBoard, compile_board, trace_mask
+from lazor_core.models import BlockType
+from lazor_core.parallel import make_search, parallel_solve
+from lazor_core.search import BACKENDS
+from lazor_core import board as core_board
 
 Cell = str
 Point = Tuple[int, int]  # doubled-grid point (half-lattice)
@@ -123,95 +154,234 @@ def parse_bff(path: Path) -> Tuple[Board, Dict[str, int], List[Tuple[int, int]]]
 
     return Board(grid=grid, lasers=lasers, targets=targets), inv, open_slots
 
-def trace_all_rays(board: Board, step_cap: int = 2000) -> Set[Point]:
-    hit: Set[Point] = set()
-    rays: List[Ray] = list(board.lasers)
-    seen: Set[Tuple[int, int, int, int]] = set()
-    xmax, ymax = board.W * 2, board.H * 2
-
-    while rays:
-        r = rays.pop()
-        x, y, vx, vy = r.x, r.y, (1 if r.vx > 0 else -1), (1 if r.vy > 0 else -1)
-        steps = 0
-
-        while 0 <= x <= xmax and 0 <= y <= ymax:
-            if steps > step_cap:
-                break
-            state = (x, y, vx, vy)
-            if state in seen:
-                break
-            seen.add(state)
-
-            nx, ny = x + vx, y + vy
-            cur_vx, cur_vy = vx, vy
-
-            if nx % 2 == 0:
-                c_edge = nx // 2
-                r_mid = (y + ny) // 2
-                target_c = c_edge if cur_vx > 0 else c_edge - 1
-                target_r = r_mid
-                cell = board.cell_at(target_r, target_c)
-                if cell == "A":
-                    vx = -vx
-                elif cell == "B":
-                    break
-                elif cell == "C":
-                    rays.append(Ray(nx, ny, -cur_vx, cur_vy))
-
-            if ny % 2 == 0:
-                r_edge = ny // 2
-                c_mid = (x + nx) // 2
-                target_r = r_edge if cur_vy > 0 else r_edge - 1
-                target_c = c_mid
-                cell = board.cell_at(target_r, target_c)
-                if cell == "A":
-                    vy = -vy
-                elif cell == "B":
-                    break
-                elif cell == "C":
-                    rays.append(Ray(nx, ny, cur_vx, -cur_vy))
-
-            x, y = nx, ny
-            steps += 1
-            if (x, y) in board.targets:
-                hit.add((x, y))
-
-    return hit
-
-def place_and_solve(base: Board, inventory: Dict[str, int], open_slots: List[Tuple[int, int]], diagnose: bool = False) -> Optional[List[List[Cell]]]:
-    targets = set(base.targets)
-    grid0 = [row[:] for row in base.grid]
-
-    def with_layout(posA, posB, posC):
-        g = [row[:] for row in grid0]
-        for r, c in posA: g[r][c] = "A"
-        for r, c in posB: g[r][c] = "B"
-        for r, c in posC: g[r][c] = "C"
-        return g
-
-    best_hit = 0
-    best_layout: Optional[List[List[Cell]]] = None
-    slots = open_slots
-    nA, nB, nC = inventory["A"], inventory["B"], inventory["C"]
-
-    for posA in combinations(slots, nA) if nA <= len(slots) else [()]:
-        rem1 = [p for p in slots if p not in posA]
-        for posB in combinations(rem1, nB) if nB <= len(rem1) else [()]:
-            rem2 = [p for p in rem1 if p not in posB]
-            for posC in combinations(rem2, nC) if nC <= len(rem2) else [()]:
-                g = with_layout(posA, posB, posC)
-                brd = Board(grid=g, lasers=base.lasers, targets=base.targets)
-                got = trace_all_rays(brd)
-                if len(got) > best_hit:
-                    best_hit = len(got)
-                    best_layout = g
-                if got >= targets:
-                    return g
-
-    if diagnose and best_layout is not None:
-        print(f"[Diagnosis] Best hit = {best_hit}/{len(targets)}")
+def trace_all_rays(board: Board) -> Set[Point]:
+    """Targets the lasers of ``board`` light, traced on the compiled kernel.
+
+    The rules are :mod:`lazor_core.kernel`'s, which are those of
+    ``lazor_solver.trace_all_rays``: a beam crossing a corner consults the
+    diagonal cell, and a C cell spawns its reflected copy at the beam's point
+    before the crossing. The search runs on the same kernel, so every grid it
+    returns passes this check.
+    """
+    cb = compile_board(board)
+    return set(cb.mask_to_points(trace_mask(cb, cb.base_cells)))
+
+def solve_layout(base: Board, inventory: Dict[str, int], open_slots: List[Tuple[int, int]], diagnose: bool = False,
+                 strategy: str = "backtrack", nogood_cap: int = 200_000, workers: int = 1,
+                 deterministic: bool = False, backend: str = "kernel",
+                 counters: Optional[TraceCounters] = None,
+                 cache: Optional[SolutionCache] = None,
+                 compiled: Optional[CompiledBoard] = None, backward: bool = True,
+                 prune_report: bool = False, order: str = AUTO,
+                 order_report: bool = False, trace_mode: Optional[str] = None,
+                 deadline: Optional[float] = None, checkpoint: Optional[str] = None,
+                 checkpoint_every: float = DEFAULT_EVERY, resume: bool = False) -> SolveResult:
+    """Search a letter-grid board and return a :class:`lazor_core.anytime.SolveResult`.
+
+    This is the solve flow of both CLIs; ``lazor_solver.solve_layout`` calls it
+    with ``backward=False``. The best partial layout is tracked with
+    ``diagnose``, a ``deadline`` or a ``checkpoint``. ``deadline`` (a :func:`time.monotonic` timestamp, see :func:`deadline_in`)
+    stops the search early with status ``"timeout"``. ``checkpoint`` (a file
+    path) saves the search every ``checkpoint_every`` seconds, at the deadline
+    and on SIGTERM (status ``"interrupted"``); ``resume`` continues from it.
+    Checkpoints need a single-process backtrack or combinations search.
+    """
+    if checkpoint is not None and (workers > 1 or strategy == "sat" or backend == "numpy"):
+        raise ValueError("checkpoints need one worker and the backtrack or combinations strategy "
+                         "on the kernel or bitboard backend")
+    start = time.monotonic()
+    if cache is not None:
+        cached = cache.lookup(base.grid, base.lasers, base.targets, inventory)
+        if cached is not None:
+            n = len(base.targets)
+            return SolveResult(SOLVED, grid=cached, best_hit=n, best_grid=cached, targets=n,
+                               elapsed=time.monotonic() - start)
+    cb = compiled if compiled is not None else compile_board(base)
+    slots = [r * cb.W + c for r, c in open_slots]
+    cert = analyze(cb, inventory, slots)
+    if not cert.feasible:
+        return SolveResult(EXHAUSTED, targets=len(cb.targets), coverage=1.0, reason=cert.report(),
+                           elapsed=time.monotonic() - start)
+    track = diagnose or deadline is not None or checkpoint is not None
+    prune = backward_prune(cb, slots, stop_at(deadline) if deadline is not None else None) if backward else None
+    if prune is not None and prune_report:
+        print(prune.report(inventory, cb.W))
+    if strategy == "combinations" and order == AUTO:
+        plan = plan_order(inventory, slots, prune)
+        order = plan.order
+        if order_report:
+            print(plan.report())
+    stopped = None      # why a checkpointed run stopped early
+    if workers > 1:
+        res = parallel_solve(cb, base.grid, base.lasers, base.targets, inventory, slots, strategy=strategy,
+                             order=order, workers=workers, deterministic=deterministic, backend=backend,
+                             counters=counters, diagnose=track, nogood_cap=nogood_cap, backward=backward,
+                             trace_mode=trace_mode, deadline=deadline)
+        cells, best_hit, best_cells = res.cells, res.best_hit, res.best_cells
+        layouts, coverage, timed_out = res.layouts, min(res.coverage, 1.0), res.timed_out
+    else:
+        search = make_search(cb, inventory, slots, strategy, order=order, diagnose=track, nogood_cap=nogood_cap,
+                             backend=backend, counters=counters, prune=prune, trace_mode=trace_mode)
+        if checkpoint is not None:
+            meta = run_meta(base.grid, base.lasers, base.targets, inventory, strategy=strategy, order=order,
+                            backend=backend, backward=backward)
+            cells, ckpt = run_checkpointed(search, checkpoint, meta, checkpoint_every, resume, deadline, counters)
+            stopped = ckpt.stopped
+        else:
+            if deadline is not None:
+                search.should_stop = stop_at(deadline)
+            cells = search.run()
+        best_hit, best_cells = search.best_hit, search.best_cells
+        layouts, coverage, timed_out = search.layouts, search.coverage(), search.cancelled
+        if prune_report:
+            print(f"[Backward] search skipped {search.pruned:,} branches")
+
+    result = SolveResult(EXHAUSTED, best_hit=best_hit, targets=len(cb.targets), coverage=coverage, layouts=layouts)
+    if best_cells is not None:
+        result.best_grid = cb.grid_for(base.grid, best_cells)
+    if cells is not None:
+        result.status = SOLVED
+        result.grid = result.best_grid = cb.grid_for(base.grid, cells)
+        result.best_hit = len(cb.targets)
+        if cache is not None:
+            cache.store(base.grid, base.lasers, base.targets, inventory, result.grid)
+    elif timed_out:
+        result.status = INTERRUPTED if stopped == "sigterm" else TIMEOUT
+    else:
+        result.coverage = 1.0
+    result.elapsed = time.monotonic() - start
+    return result
+
+
+def place_and_solve(base: Board, inventory: Dict[str, int], open_slots: List[Tuple[int, int]], diagnose: bool = False,
+                    strategy: str = "backtrack", nogood_cap: int = 200_000, workers: int = 1,
+                    deterministic: bool = False, backend: str = "kernel",
+                    counters: Optional[TraceCounters] = None,
+                    cache: Optional[SolutionCache] = None,
+                    compiled: Optional[CompiledBoard] = None, backward: bool = True,
+                    prune_report: bool = False, order: str = AUTO,
+                    order_report: bool = False, trace_mode: Optional[str] = None,
+                    deadline: Optional[float] = None, checkpoint: Optional[str] = None,
+                    checkpoint_every: float = DEFAULT_EVERY, resume: bool = False) -> Optional[List[List[Cell]]]:
+    """Solution grid of a letter-grid board, or None (see :func:`solve_layout`)."""
+    result = solve_layout(base, inventory, open_slots, diagnose=diagnose, strategy=strategy, nogood_cap=nogood_cap,
+                          workers=workers, deterministic=deterministic, backend=backend, counters=counters,
+                          cache=cache, compiled=compiled, backward=backward, prune_report=prune_report, order=order,
+                          order_report=order_report, trace_mode=trace_mode, deadline=deadline,
+                          checkpoint=checkpoint, checkpoint_every=checkpoint_every, resume=resume)
+    if result.solved:
+        return result.grid
+    _print_diagnosis(result, diagnose)
     return None
 
+
+def _print_diagnosis(result: SolveResult, diagnose: bool) -> None:
+    if result.reason is not None:
+        print(result.reason)
+        return
+    stopped = result.status in (TIMEOUT, INTERRUPTED)
+    if stopped:
+        print(result.report())
+    if (diagnose or stopped) and result.best_hit:
+        print(f"[Diagnosis] Best hit = {result.best_hit}/{result.targets}")
+        if stopped and result.best_grid is not None:
+            print("[Diagnosis] Best partial layout:")
+            print(grid_to_string(result.best_grid))
+
+
+_LETTER = {BlockType.REFLECT: "A", BlockType.OPAQUE: "B", BlockType.REFRACT: "C"}
+
+
+def get_placeable_positions(board: "core_board.Board") -> List[Tuple[int, int]]:
+    """Open slots of a parsed ``lazor_core.board.Board`` in row-major order."""
+    return [(r, c) for r in range(board.nrows) for c in range(board.ncols) if board.is_placeable(r, c)]
+
+
+def get_blocks_to_place(board: "core_board.Board") -> List[BlockType]:
+    """Free inventory expanded to one entry per block."""
+    return [kind for kind, n in board.free_blocks.items() for _ in range(n)]
+
+
+def letter_board(board: "core_board.Board") -> Tuple[Board, Dict[str, int], List[Tuple[int, int]]]:
+    """Convert a ``lazor_core.board.Board`` into the letter-grid form the search uses."""
+    grid = [row[:] for row in board.grid]
+    for (r, c), blk in board.fixed_blocks.items():
+        grid[r][c] = _LETTER[blk.kind]
+    lasers = [Ray(l.x, l.y, 1 if l.vx > 0 else -1, 1 if l.vy > 0 else -1) for l in board.lasers]
+    inventory = {letter: board.free_blocks.get(kind, 0) for kind, letter in _LETTER.items()}
+    return (Board(grid=grid, lasers=lasers, targets=sorted(board.points)),
+            inventory, get_placeable_positions(board))
+
+
+def solve_optimized(board: "core_board.Board", diagnose: bool = False, strategy: str = "backtrack",
+                    workers: int = 1, deterministic: bool = False,
+                    cache: Optional[SolutionCache] = None) -> Optional["core_board.Board"]:
+    """Solve a parsed board; returns a copy with the placed blocks, or None.
+
+    ``cache`` (a :class:`lazor_core.cache.SolutionCache`) is consulted first and
+    filled with new solutions.
+    """
+    base, inventory, open_slots = letter_board(board)
+    solved = place_and_solve(base, inventory, open_slots, diagnose=diagnose, strategy=strategy,
+                             workers=workers, deterministic=deterministic, cache=cache)
+    if solved is None:
+        return None
+    out = copy.deepcopy(board)
+    for r, c in open_slots:
+        if solved[r][c] in ("A", "B", "C"):
+            out.place(r, c, BlockType.from_letter(solved[r][c]))
+    out.free_blocks = {kind: 0 for kind in board.free_blocks}
+    return out
+
+
+def solve(board: "core_board.Board", deadline: Optional[float] = None, time_limit: Optional[float] = None,
+          strategy: str = "backtrack", workers: int = 1, deterministic: bool = False,
+          cache: Optional[SolutionCache] = None, **kwargs) -> SolveResult:
+    """Anytime solve of a parsed board.
+
+    Stops at ``deadline`` (a :func:`time.monotonic` timestamp) or after
+    ``time_limit`` seconds, whichever comes first, and returns a
+    :class:`lazor_core.anytime.SolveResult`: the status, the solution grid or the
+    best partial layout found so far, and the share of the search space covered.
+    Other keyword arguments go to :func:`solve_layout`.
+    """
+    if time_limit is not None:
+        limit = deadline_in(time_limit)
+        deadline = limit if deadline is None else min(deadline, limit)
+    base, inventory, open_slots = letter_board(board)
+    return solve_layout(base, inventory, open_slots, strategy=strategy, workers=workers,
+                        deterministic=deterministic, cache=cache, deadline=deadline, **kwargs)
+
+
+def _solution_search(board: "core_board.Board", backward: bool):
+    base, inventory, open_slots = letter_board(board)
+    cb = compile_board(base)
+    slots = [r * cb.W + c for r, c in open_slots]
+    prune = backward_prune(cb, slots) if backward else None
+    return base, cb, make_search(cb, inventory, slots, "backtrack", prune=prune)
+
+
+def iter_solutions(board: "core_board.Board", backward: bool = True) -> Iterator[List[List[Cell]]]:
+    """Every solution of a parsed board as a letter grid, lazily.
+
+    Memory stays constant: the beam-guided search is walked depth first and
+    only the grid being yielded is built.
+    """
+    base, cb, search = _solution_search(board, backward)
+    for cells in search.solutions():
+        yield cb.grid_for(base.grid, cells)
+
+
+def count_solutions(board: "core_board.Board", limit: Optional[int] = None, backward: bool = True) -> int:
+    """Number of solutions of a parsed board, at most ``limit`` (``limit=2``: is it unique?).
+
+    No grid is built, and layouts that differ only in slots no beam touches
+    are counted combinatorially (see :meth:`lazor_core.search.BacktrackSearch.count`).
+    """
+    _, _, search = _solution_search(board, backward)
+    return search.count(limit)
+
+
 def grid_to_string(grid: List[List[Cell]]) -> str:
     return "\n".join("".join(row) for row in grid)
 
@@ -224,7 +394,54 @@ def main(argv: Optional[List[str]] = None) -> int:
     p.add_argument("-i", "--input", required=True, help=".bff file path")
     p.add_argument("-o", "--output", required=True, help="Where to write solution grid (.txt)")
     p.add_argument("--diagnose", action="store_true", help="Print best partial hit if no solution")
+    p.add_argument("--strategy", choices=("backtrack", "combinations", "sat"), default="backtrack",
+                   help="Search strategy: beam-guided backtracking (default), nested combinations, "
+                        "or a CDCL constraint model")
+    p.add_argument("--backend", choices=BACKENDS, default="kernel", help="Tracer backend")
+    p.add_argument("--workers", type=int, default=1, help="Split the search across N worker processes")
+    p.add_argument("--deterministic", action="store_true",
+                   help="With --workers, return the lowest-ranked solution")
+    p.add_argument("--counters", action="store_true",
+                   help="Count tracer steps, splits, cycles and beam exits over the search and print them")
+    p.add_argument("--trace-mode", choices=TRACE_MODES, default=None,
+                   help="Tracer early stop on the kernel backend: short (default) stops once every target is lit, "
+                        "fast also gives up once no live beam can reach an unlit target, full traces every beam")
+    p.add_argument("--bffc", action="store_true",
+                   help="Load the puzzle from its compiled .bffc (written next to the .bff, rebuilt when stale)")
+    p.add_argument("--cache", nargs="?", const=str(CACHE_PATH), default=None, metavar="PATH",
+                   help=f"Look up / store solutions in an on-disk cache (default file: {CACHE_PATH})")
+    p.add_argument("--order", choices=(AUTO,) + ORDERS, default=AUTO,
+                   help="Block-type nesting order for --strategy combinations (outermost first); "
+                        "auto picks the cheapest estimate per board and prints it")
+    p.add_argument("--no-backward", dest="backward", action="store_false",
+                   help="Skip the backward pass from the targets before the search")
+    p.add_argument("--prune-report", action="store_true",
+                   help="Print how many layouts the backward pass ruled out, and which slots each target constrains")
+    p.add_argument("--time-limit", type=float, default=None, metavar="SECONDS",
+                   help="Stop the search after SECONDS and report the best partial layout and the share of "
+                        "the search space covered (exit status 3)")
+    p.add_argument("--checkpoint", default=None, metavar="PATH",
+                   help="Save the search cursor, best partial layout and counters to PATH periodically "
+                        "and on SIGTERM (exit status 143); removed once the search finishes")
+    p.add_argument("--checkpoint-every", type=float, default=DEFAULT_EVERY, metavar="SECONDS",
+                   help=f"Seconds between periodic checkpoints (default {DEFAULT_EVERY:g})")
+    p.add_argument("--resume", action="store_true",
+                   help="Continue from the --checkpoint file, if there is one")
     args = p.parse_args(argv)
+    if args.backend == "numpy" and args.strategy != "combinations":
+        p.error("--backend numpy requires --strategy combinations")
+    if args.counters and args.backend != "kernel":
+        p.error("--counters requires --backend kernel")
+    if args.strategy == "sat" and (args.backend != "kernel" or args.workers > 1):
+        p.error("--strategy sat runs in one process on the kernel backend")
+    if args.trace_mode not in (None, "full") and args.backend != "kernel":
+        p.error("--trace-mode short/fast requires --backend kernel")
+    if args.resume and args.checkpoint is None:
+        p.error("--resume requires --checkpoint")
+    if args.checkpoint is not None and (args.workers > 1 or args.strategy == "sat" or args.backend == "numpy"):
+        p.error("--checkpoint runs in one process with --strategy backtrack/combinations on the kernel or "
+                "bitboard backend")
+    deadline = deadline_in(args.time_limit)
 
     bff = Path(args.input)
     if not bff.exists():
@@ -236,11 +453,40 @@ def main(argv: Optional[List[str]] = None) -> int:
             print(f"Input not found: {args.input}", file=sys.stderr)
             return 2
 
-    board, inventory, open_slots = parse_bff(bff)
+    compiled = None
+    if args.bffc:
+        puzzle = load_bffc(bff, zero_copy=False)
+        board = Board(puzzle.grid, [Ray(l.x, l.y, l.vx, l.vy) for l in puzzle.lasers], puzzle.targets)
+        inventory, open_slots, compiled = puzzle.inventory, puzzle.open_slots, puzzle.cb
+    else:
+        board, inventory, open_slots = parse_bff(bff)
+    counters = TraceCounters() if args.counters else None
+    cache = SolutionCache(args.cache) if args.cache else None
     print(f"Processing {bff.name}... Inventory: A={inventory['A']}, B={inventory['B']}, C={inventory['C']} | slots={len(open_slots)}")
-    solved = place_and_solve(board, inventory, open_slots, diagnose=args.diagnose)
+    result = solve_layout(board, inventory, open_slots, diagnose=args.diagnose, strategy=args.strategy,
+                          workers=args.workers, deterministic=args.deterministic, backend=args.backend,
+                          counters=counters, cache=cache, compiled=compiled, backward=args.backward,
+                          prune_report=args.prune_report, order=args.order, order_report=True,
+                          trace_mode=args.trace_mode, deadline=deadline, checkpoint=args.checkpoint,
+                          checkpoint_every=args.checkpoint_every, resume=args.resume)
+    solved = result.grid
+    if solved is None:
+        _print_diagnosis(result, args.diagnose)
+    if cache is not None:
+        hits, _, rejected = cache.stats()
+        print(f"[Cache] {'hit' if hits else 'miss'}" + (" (stale entry dropped)" if rejected else ""))
+        cache.close()
     outp = Path(args.output)
-
+    if counters is not None:
+        print("[Counters]")
+        print(counters.report())
+
+    if result.status == TIMEOUT:
+        print("No solution found within the time limit.")
+        return 3
+    if result.status == INTERRUPTED:
+        print(f"Interrupted; resume with --checkpoint {args.checkpoint} --resume")
+        return 143
     if solved is None:
         print("No solution found." + (" (See diagnosis above)" if args.diagnose else ""))
         return 1
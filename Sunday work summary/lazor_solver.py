@@ -3,7 +3,11 @@
 Lazor Stage 2 — single-file solver
 
 Run:
-    python lazor_solver.py -i <path_to_bff> -o <output_path> [--diagnose]
+    python lazor_solver.py -i <path_to_bff> -o <output_path> [--diagnose] [--strategy backtrack|combinations|sat]
+    python lazor_solver.py batch <dir> [--workers N] [--timeout S] [--out-dir DIR]   (one JSONL record per board)
+    python lazor_solver.py pack <out.bffpack> <dir|.bff|-> ...   (batch also reads .bffpack corpora and - for stdin)
+    python lazor_solver.py -i <bff> -o <out> --strategy combinations --shard K/N   (or --range START:END)
+    python lazor_solver.py merge <shard logs|-> ... [-o <out>]   (combine the [Range] records of the shards)
 
 Features
 - Robust .bff parser (GRID, inventory lines, lasers, targets).
@@ -12,16 +16,50 @@ Features
     A (Reflect): reflect on the boundary hit (vertical → flip vx; horizontal → flip vy)
     B (Opaque): absorb ray
     C (Refract): split — original continues + a reflected copy
-- Combinational search by block type (no factorial over empties).
+- Beam-guided backtracking: branch only on the open slot a beam is about to enter
+  (--strategy combinations keeps the nested search by block type; --strategy sat
+  solves a boolean beam model with the bundled CDCL solver, see lazor_core.sat).
+- Candidates are traced on a compiled flat-array kernel (lazor_core.kernel): the
+  puzzle's lattice lookups are built once and each layout is a bytearray of cells
+  (--backend bitboard: three occupancy ints, see lazor_core.bitboard;
+  --backend numpy with --strategy combinations: chunks of candidates traced in
+  lockstep, see lazor_core.batch).
 - Early exit on first valid solution; optional diagnostics for best partial hit.
+- --time-limit SECONDS stops the search and reports the best partial layout and the
+  share of the search space covered (lazor_core.anytime).
+- --checkpoint PATH saves the search cursor periodically and on SIGTERM; --resume
+  continues where the run stopped (lazor_core.checkpoint).
+- --shard K/N / --range START:END search one contiguous slice of the nested
+  combinations, by layout rank (lazor_core.rank); `merge` combines the slices.
+- Boards no layout can solve (too many blocks, a target on the wrong x + y parity
+  or out of every beam's reach) are rejected before the search, with the reason
+  printed (lazor_core.feasibility).
 """
 from __future__ import annotations
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
 from dataclasses import dataclass
-from itertools import combinations
+from math import comb
 from pathlib import Path
-from typing import List, Tuple, Dict, Optional, Set
+from typing import Iterable, Iterator, List, Tuple, Dict, Optional, Set
 import argparse
+import json
 import sys
+import time
+
+from lazor_core.anytime import EXHAUSTED, INTERRUPTED, SOLVED, TIMEOUT, SolveResult, deadline_in, stop_at
+from lazor_core.cache import DEFAULT_PATH as CACHE_PATH, SolutionCache, puzzle_key
+from lazor_core.checkpoint import DEFAULT_EVERY
+from lazor_core.corpus import SUFFIX as CORPUS_SUFFIX, iter_corpus, pack_corpus
+from lazor_core.counters import TraceCounters
+from lazor_core.ir import load_bffc
+from lazor_core.order import AUTO, ORDERS, plan_order
+from lazor_core.kernel import TRACE_MODES, CompiledBoard, VisitedMap, compile_board
+from lazor_core.models import BFFSpec, BlockType
+from lazor_core.parser import parse_bff_bytes
+from lazor_core.parallel import make_search
+from lazor_core.rank import shard_range
+from lazor_core.search import BACKENDS
+from lazor_core import solver as core_solver
 
 Cell = str
 Point = Tuple[int, int]  # doubled-grid point (half-lattice)
@@ -131,35 +169,58 @@ def parse_bff(path: Path) -> Tuple[Board, Dict[str, int], List[Tuple[int, int]]]
 
     return Board(grid=grid, lasers=lasers, targets=targets), inv, open_slots
 
+def board_from_spec(spec: BFFSpec) -> Tuple[Board, Dict[str, int], List[Tuple[int, int]]]:
+    """Same triple as parse_bff, from a lazor_core BFFSpec (corpus packs and streams)."""
+    grid = [[tok.upper() if tok.upper() in "ABC" else tok.lower() for tok in row] for row in spec.grid_tokens]
+    lasers = [Ray(l.x, l.y, 1 if l.vx > 0 else -1, 1 if l.vy > 0 else -1) for l in spec.lasers]
+    inv = {letter: spec.free_blocks.get(BlockType.from_letter(letter), 0) for letter in "ABC"}
+    open_slots = [(r, c) for r, row in enumerate(grid) for c, ch in enumerate(row) if ch == "o"]
+    return Board(grid=grid, lasers=lasers, targets=list(spec.points)), inv, open_slots
+
 # ---------------------------
 # Physics
 # ---------------------------
 
-def trace_all_rays(board: Board, step_cap: int = 10000) -> Set[Point]:
+def trace_all_rays(board: Board, counters: Optional[TraceCounters] = None,
+                   visited: Optional[VisitedMap] = None) -> Set[Point]:
     """
     Trace all lasers. Corner hits handled correctly.
     'C' mirrors split light: original beam passes through, reflected copy spawns at impact.
+    Pass a TraceCounters as ``counters`` to count steps, splits and how beams end.
+
+    Seen states (x, y, vx, vy) are flagged in a visited map indexed like the
+    kernel's state ids; there are 4 * (2W+1) * (2H+1) of them, so every beam
+    stops within that many steps. Pass ``visited`` (a VisitedMap of that size)
+    to reuse one map across many layouts of the same board.
     """
     hit: Set[Point] = set()
     rays: List[Ray] = list(board.lasers)
-    seen: Set[Tuple[int, int, int, int]] = set()
 
     xmax, ymax = board.W * 2, board.H * 2
+    stride = xmax + 1
+    if visited is None:
+        visited = VisitedMap(4 * stride * (ymax + 1))
+    seen = visited.flags
+    epoch = visited.next_epoch()
+    count = counters is not None
+    if count:
+        counters.traces += 1
 
     while rays:
         r = rays.pop()
+        if count:
+            counters.rays += 1
         x, y = r.x, r.y
         vx = 1 if r.vx > 0 else -1
         vy = 1 if r.vy > 0 else -1
-        steps = 0
 
         while 0 <= x <= xmax and 0 <= y <= ymax:
-            if steps > step_cap:
-                break
-            state = (x, y, vx, vy)
-            if state in seen:
+            state = (y * stride + x) * 4 + (vx > 0) + 2 * (vy > 0)
+            if seen[state] == epoch:
+                if count:
+                    counters.cycles += 1
                 break
-            seen.add(state)
+            seen[state] = epoch
 
             nx, ny = x + vx, y + vy
             cur_vx, cur_vy = vx, vy
@@ -177,9 +238,13 @@ def trace_all_rays(board: Board, step_cap: int = 10000) -> Set[Point]:
                 if cell == "A":
                     vx, vy = -vx, -vy
                 elif cell == "B":
+                    if count:
+                        counters.absorbed += 1
                     break
                 elif cell == "C":
                     rays.append(Ray(x, y, -cur_vx, -cur_vy))
+                    if count:
+                        counters.splits += 1
 
             elif crossed_vertical:
                 c_edge = nx // 2
@@ -190,9 +255,13 @@ def trace_all_rays(board: Board, step_cap: int = 10000) -> Set[Point]:
                 if cell == "A":
                     vx = -vx
                 elif cell == "B":
+                    if count:
+                        counters.absorbed += 1
                     break
                 elif cell == "C":
                     rays.append(Ray(x, y, -cur_vx, cur_vy))
+                    if count:
+                        counters.splits += 1
 
             elif crossed_horizontal:
                 r_edge = ny // 2
@@ -203,15 +272,23 @@ def trace_all_rays(board: Board, step_cap: int = 10000) -> Set[Point]:
                 if cell == "A":
                     vy = -vy
                 elif cell == "B":
+                    if count:
+                        counters.absorbed += 1
                     break
                 elif cell == "C":
                     rays.append(Ray(x, y, cur_vx, -cur_vy))
+                    if count:
+                        counters.splits += 1
 
             x, y = nx, ny
-            steps += 1
+            if count:
+                counters.steps += 1
 
             if (x, y) in board.targets:
                 hit.add((x, y))
+        else:
+            if count:
+                counters.out_of_bounds += 1
 
     return hit
 
@@ -221,49 +298,55 @@ def trace_all_rays(board: Board, step_cap: int = 10000) -> Set[Point]:
 # Search
 # ---------------------------
 
-def place_and_solve(base: Board, inventory: Dict[str, int], open_slots: List[Tuple[int, int]], diagnose: bool = False) -> Optional[List[List[Cell]]]:
-    if inventory["A"] + inventory["B"] + inventory["C"] > len(open_slots):
-        if diagnose:
-            print(f"[Diagnosis] Best hit = 0/{len(base.targets)}")
-        return None
+STRATEGIES = ("backtrack", "combinations", "sat")
 
-    targets = set(base.targets)
-    grid0 = [row[:] for row in base.grid]
-
-    def with_layout(posA, posB, posC):
-        g = [row[:] for row in grid0]
-        for r, c in posA: g[r][c] = "A"
-        for r, c in posB: g[r][c] = "B"
-        for r, c in posC: g[r][c] = "C"
-        return g
-
-    best_hit = 0
-    best_layout: Optional[List[List[Cell]]] = None
-    slots = open_slots
-    nA, nB, nC = inventory["A"], inventory["B"], inventory["C"]
-
-    for posC in combinations(slots, nC) if nC <= len(slots) else [()]:
-        rem1 = [p for p in slots if p not in posC]
-        for posA in combinations(rem1, nA) if nA <= len(rem1) else [()]:
-            rem2 = [p for p in rem1 if p not in posA]
-            for posB in combinations(rem2, nB) if nB <= len(rem2) else [()]:
-                g = with_layout(posA, posB, posC)
-                brd = Board(grid=g, lasers=base.lasers, targets=base.targets)
-                got = trace_all_rays(brd)
-                if len(got) > best_hit:
-                    best_hit = len(got)
-                    best_layout = g
-                if got >= targets:
-                    return g
-
-    if diagnose:
-        print(f"[Diagnosis] Best hit = {best_hit}/{len(targets)}")
-        if best_layout:
-            print("[Diagnosis] Best partial layout:")
-            print(grid_to_string(best_layout))
+
+def solve_layout(base: Board, inventory: Dict[str, int], open_slots: List[Tuple[int, int]], diagnose: bool = False,
+                 backward: bool = False, **options) -> SolveResult:
+    """Search and return a :class:`lazor_core.anytime.SolveResult`.
+
+    This is :func:`lazor_core.solver.solve_layout` (see there for ``options``:
+    strategy, workers, backend, cache, order, deadline, checkpoint, ...), with
+    the backward pass off unless ``backward`` is set.
+    """
+    return core_solver.solve_layout(base, inventory, open_slots, diagnose=diagnose, backward=backward, **options)
+
+
+def place_and_solve(base: Board, inventory: Dict[str, int], open_slots: List[Tuple[int, int]], diagnose: bool = False,
+                    strategy: str = "backtrack", nogood_cap: int = 200_000, workers: int = 1,
+                    deterministic: bool = False, backend: str = "kernel",
+                    counters: Optional[TraceCounters] = None,
+                    cache: Optional[SolutionCache] = None,
+                    compiled: Optional[CompiledBoard] = None, order: str = AUTO,
+                    order_report: bool = False, trace_mode: Optional[str] = None,
+                    deadline: Optional[float] = None, checkpoint: Optional[str] = None,
+                    checkpoint_every: float = DEFAULT_EVERY, resume: bool = False) -> Optional[List[List[Cell]]]:
+    result = solve_layout(base, inventory, open_slots, diagnose=diagnose, strategy=strategy, nogood_cap=nogood_cap,
+                          workers=workers, deterministic=deterministic, backend=backend, counters=counters,
+                          cache=cache, compiled=compiled, order=order, order_report=order_report,
+                          trace_mode=trace_mode, deadline=deadline, checkpoint=checkpoint,
+                          checkpoint_every=checkpoint_every, resume=resume)
+    if result.solved:
+        return result.grid
+    print_diagnosis(result, diagnose)
     return None
 
 
+def print_diagnosis(result: SolveResult, diagnose: bool) -> None:
+    """``--diagnose`` output for an unsolved run (always printed after a timeout or interruption)."""
+    if result.reason is not None:
+        print(result.reason)
+        return
+    stopped = result.status in (TIMEOUT, INTERRUPTED)
+    if stopped:
+        print(result.report())
+    if diagnose or stopped:
+        print(f"[Diagnosis] Best hit = {result.best_hit}/{result.targets}")
+        if result.best_grid is not None:
+            print("[Diagnosis] Best partial layout:")
+            print(grid_to_string(result.best_grid))
+
+
 # ---------------------------
 # IO
 # ---------------------------
@@ -275,16 +358,381 @@ def write_solution(path: Path, grid: List[List[Cell]]):
     path.parent.mkdir(parents=True, exist_ok=True)
     path.write_text(grid_to_string(grid))
 
+# ---------------------------
+# Batch
+# ---------------------------
+
+def search_space_size(inventory: Dict[str, int], n_slots: int) -> int:
+    """Number of distinct layouts: C(n, a) * C(n - a, b) * C(n - a - b, c)."""
+    a, b, c = inventory["A"], inventory["B"], inventory["C"]
+    if a + b + c > n_slots:
+        return 0
+    return comb(n_slots, a) * comb(n_slots - a, b) * comb(n_slots - a - b, c)
+
+_RECORD_STATUS = {SOLVED: "solved", TIMEOUT: "timeout", EXHAUSTED: "unsolved"}
+
+def _solve_record(name: str, path: Optional[str], board: Board, inventory: Dict[str, int],
+                  open_slots: List[Tuple[int, int]], strategy: str, backend: str, nogood_cap: int, timeout: Optional[float],
+                  cache_path: Optional[str], diagnose: bool = False) -> dict:
+    start = time.perf_counter()
+    cache = SolutionCache(cache_path) if cache_path else None
+    result = solve_layout(board, inventory, open_slots, diagnose=diagnose, strategy=strategy, backend=backend,
+                          nogood_cap=nogood_cap, cache=cache, deadline=deadline_in(timeout))
+    record = {"board": name, "path": path, "status": _RECORD_STATUS[result.status],
+              "time": 0.0, "layouts": result.layouts, "solution": None}
+    if result.solved:
+        record["solution"] = ["".join(row) for row in result.grid]
+    if cache is not None:
+        if cache.stats()[0]:
+            record["cached"] = True
+        cache.close()
+    if result.reason is not None:
+        record["reason"] = result.reason
+    elif diagnose and not result.solved:
+        record.update(best_hit=result.best_hit, targets=result.targets, best_layout=None)
+        if result.best_grid is not None:
+            record["best_layout"] = ["".join(row) for row in result.best_grid]
+    record["time"] = round(time.perf_counter() - start, 4)
+    return record
+
+def _jobs(items: Iterable) -> Iterator[tuple]:
+    """Parse each item lazily: a (name, path, board, inventory, open_slots) job or an error record."""
+    for item in items:
+        if isinstance(item, tuple):
+            name, spec = item
+            try:
+                if isinstance(spec, (bytes, bytearray)):
+                    spec = parse_bff_bytes(spec)
+                yield (name, None, *board_from_spec(spec))
+            except ValueError as e:
+                yield {"board": name, "path": None, "status": "error", "error": str(e),
+                       "time": 0.0, "layouts": 0, "solution": None}
+            continue
+        path = Path(item)
+        try:
+            yield (path.stem, str(path), *parse_bff(path))
+        except (OSError, ValueError) as e:
+            yield {"board": path.stem, "path": str(path), "status": "error", "error": str(e),
+                   "time": 0.0, "layouts": 0, "solution": None}
+
+def solve_many(paths: Iterable, workers: int = 1, timeout: Optional[float] = None, strategy: str = "backtrack",
+               backend: str = "kernel", nogood_cap: int = 200_000, cache: Optional[str] = None,
+               largest_first: bool = True, diagnose: bool = False) -> Iterator[dict]:
+    """Solve many boards in one process (or one pool); yields a record per board as it finishes.
+
+    ``paths`` holds .bff paths and/or ``(name, BFFSpec or .bff bytes)`` pairs (as
+    yielded by ``lazor_core.corpus.iter_corpus``). With ``largest_first`` every board is
+    parsed up front and the largest search spaces are scheduled first;
+    otherwise boards are read lazily and solved in input order, with at most
+    ``2 * workers`` in flight, so a corpus of any size streams through.
+    ``timeout`` (seconds) is enforced per board through the search's
+    ``should_stop`` hook. Records carry ``board``, ``path``, ``status`` (solved /
+    unsolved / timeout / error), ``time``, ``layouts`` and ``solution`` (grid rows);
+    ``path`` is None for boards that did not come from a file. ``cache`` is the path of a :class:`SolutionCache` file; cache hits are marked
+    ``"cached": true``. Boards the pre-solve checks rule out (:mod:`lazor_core.feasibility`)
+    are unsolved without a search and carry the certificate report in ``reason``. With
+    ``diagnose``, searched boards left unsolved also carry ``best_hit`` of ``targets`` and
+    ``best_layout``, the rows of the layout lighting the most targets.
+    """
+    opts = (strategy, backend, nogood_cap, timeout, str(cache) if cache else None, diagnose)
+    jobs: Iterable[tuple] = _jobs(paths)
+    if largest_first:
+        queued = []
+        for job in jobs:
+            if isinstance(job, dict):
+                yield job
+            else:
+                queued.append(job)
+        queued.sort(key=lambda job: search_space_size(job[3], len(job[4])), reverse=True)
+        jobs = queued
+
+    if workers <= 1:
+        for job in jobs:
+            yield job if isinstance(job, dict) else _solve_record(*job, *opts)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        pending = set()
+        for job in jobs:
+            if isinstance(job, dict):
+                yield job
+                continue
+            pending.add(ex.submit(_solve_record, *job, *opts))
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    yield fut.result()
+        for fut in as_completed(pending):
+            yield fut.result()
+
 # ---------------------------
 # CLI
 # ---------------------------
 
+def _batch_items(inputs: List[str]) -> Iterator:
+    """Paths and corpus puzzles for ``batch``, read lazily in the order given."""
+    for inp in inputs:
+        if inp == "-":
+            yield from iter_corpus(sys.stdin.buffer, raw=True)
+            continue
+        path = Path(inp)
+        if path.suffix == CORPUS_SUFFIX:
+            yield from iter_corpus(path, raw=True)
+        elif path.is_dir():
+            yield from sorted(path.glob("*.bff"))
+        else:
+            yield path
+
+def batch_main(argv: List[str]) -> int:
+    p = argparse.ArgumentParser(prog="lazor_solver.py batch",
+                                description="Solve every .bff in a directory; one JSONL record per board on stdout")
+    p.add_argument("inputs", nargs="+",
+                   help="Directories (their *.bff files), .bff files, .bffpack corpora, or - for a puzzle stream on stdin")
+    p.add_argument("--workers", type=int, default=1, help="Solve N boards at a time in worker processes")
+    p.add_argument("--timeout", type=float, default=None, help="Per-board time limit in seconds")
+    p.add_argument("--strategy", choices=STRATEGIES, default="backtrack")
+    p.add_argument("--backend", choices=BACKENDS, default="kernel")
+    p.add_argument("--nogood-cap", type=int, default=200_000)
+    p.add_argument("--out-dir", default=None, help="Also write <board>.sol for every solved board here")
+    p.add_argument("--diagnose", action="store_true",
+                   help="Add the best hit and best partial layout to the records of unsolved boards")
+    p.add_argument("--cache", nargs="?", const=str(CACHE_PATH), default=None, metavar="PATH",
+                   help="Look up / store solutions in an on-disk cache")
+    args = p.parse_args(argv)
+    if args.backend == "numpy" and args.strategy != "combinations":
+        p.error("--backend numpy requires --strategy combinations")
+    if args.strategy == "sat" and args.backend != "kernel":
+        p.error("--strategy sat requires --backend kernel")
+
+    streamed = any(inp == "-" or Path(inp).suffix == CORPUS_SUFFIX for inp in args.inputs)
+    solved = total = 0
+    for record in solve_many(_batch_items(args.inputs), workers=args.workers, timeout=args.timeout,
+                             strategy=args.strategy, backend=args.backend, nogood_cap=args.nogood_cap,
+                             cache=args.cache, largest_first=not streamed, diagnose=args.diagnose):
+        print(json.dumps(record), flush=True)
+        total += 1
+        if record["status"] == "solved":
+            solved += 1
+            if args.out_dir:
+                write_solution(Path(args.out_dir) / (record["board"] + ".sol"), [list(r) for r in record["solution"]])
+    print(f"solved {solved}/{total}", file=sys.stderr)
+    return 0 if solved == total else 1
+
+
+# ---------------------------
+# Shards
+# ---------------------------
+
+RANGE_TAG = "[Range] "
+
+def solve_range(base: Board, inventory: Dict[str, int], open_slots: List[Tuple[int, int]], start: int, end: int,
+                order: str = AUTO, nogood_cap: int = 200_000, backend: str = "kernel",
+                counters: Optional[TraceCounters] = None, compiled: Optional[CompiledBoard] = None,
+                trace_mode: Optional[str] = None, deadline: Optional[float] = None) -> dict:
+    """Search the nested-combinations layouts ranked ``start`` to ``end - 1``.
+
+    Returns a record for :func:`merge_ranges`: ``puzzle`` (the puzzle key),
+    ``order``, ``total``, the clipped ``start`` / ``end``, ``status`` (solved,
+    exhausted or timeout), ``covered`` (every rank below it, from ``start``, was
+    checked), the solution's ``rank`` and ``solution`` rows, ``layouts`` and ``time``.
+    """
+    t0 = time.monotonic()
+    cb = compiled if compiled is not None else compile_board(base)
+    slots = [r * cb.W + c for r, c in open_slots]
+    if order == AUTO:
+        order = plan_order(inventory, slots).order
+    search = make_search(cb, inventory, slots, "combinations", order=order, nogood_cap=nogood_cap,
+                         backend=backend, counters=counters, trace_mode=trace_mode)
+    if deadline is not None:
+        search.should_stop = stop_at(deadline)
+    total = search.ranks().total
+    start, end = min(max(0, start), total), min(max(0, end), total)
+    end = max(start, end)
+    cells = search.run_range(start, end)
+    record = {"puzzle": puzzle_key(base.grid, base.lasers, base.targets, inventory), "order": order,
+              "total": total, "start": start, "end": end, "status": EXHAUSTED, "covered": end,
+              "rank": None, "solution": None, "layouts": search.layouts}
+    if cells is not None:
+        rank = start + search.layouts - 1
+        record.update(status=SOLVED, covered=rank + 1, rank=rank,
+                      solution=["".join(row) for row in cb.grid_for(base.grid, cells)])
+    elif search.cancelled:
+        record.update(status=TIMEOUT, covered=start + search.layouts - 1)
+    record["time"] = round(time.monotonic() - t0, 4)
+    return record
+
+def merge_ranges(records: List[dict]) -> dict:
+    """Combine :func:`solve_range` records of one puzzle.
+
+    Returns ``total``, the lowest-ranked ``solution`` found (with its ``rank``)
+    and the ``gaps``: rank ranges ``[start, end)`` no record covered. With no gap
+    below ``rank`` the solution is the one a single unsharded run returns.
+    """
+    if not records:
+        raise ValueError("no [Range] records to merge")
+    first = records[0]
+    for rec in records[1:]:
+        for key in ("puzzle", "order", "total"):
+            if rec[key] != first[key]:
+                raise ValueError(f"records differ in {key}: {first[key]!r} vs {rec[key]!r}")
+    solved = [rec for rec in records if rec["status"] == SOLVED]
+    best = min(solved, key=lambda rec: rec["rank"]) if solved else None
+    gaps = []
+    at = 0
+    for lo, hi in sorted((rec["start"], rec["covered"]) for rec in records):
+        if lo > at:
+            gaps.append((at, lo))
+        at = max(at, hi)
+    if at < first["total"]:
+        gaps.append((at, first["total"]))
+    return {"puzzle": first["puzzle"], "order": first["order"], "total": first["total"],
+            "rank": best["rank"] if best else None, "solution": best["solution"] if best else None,
+            "gaps": gaps}
+
+def _read_range_records(inputs: List[str]) -> List[dict]:
+    records = []
+    for inp in inputs:
+        text = sys.stdin.read() if inp == "-" else Path(inp).read_text()
+        for line in text.splitlines():
+            if line.startswith(RANGE_TAG):
+                records.append(json.loads(line[len(RANGE_TAG):]))
+    return records
+
+def merge_main(argv: List[str]) -> int:
+    p = argparse.ArgumentParser(prog="lazor_solver.py merge",
+                                description="Combine the [Range] records printed by --shard / --range runs")
+    p.add_argument("inputs", nargs="+", help="Saved outputs of the shard runs, or - for stdin")
+    p.add_argument("-o", "--output", default=None, help="Where to write the solution grid (.txt)")
+    args = p.parse_args(argv)
+    try:
+        merged = merge_ranges(_read_range_records(args.inputs))
+    except (OSError, ValueError) as e:
+        print(f"merge: {e}", file=sys.stderr)
+        return 2
+    gaps = merged["gaps"]
+    total = merged["total"]
+    if merged["solution"] is not None:
+        rank = merged["rank"]
+        below = [(lo, min(hi, rank)) for lo, hi in gaps if lo < rank]
+        print(f"Lowest-ranked solution: rank {rank:,} of {total:,} (order {merged['order']})")
+        if below:
+            print("Ranks below it were not all searched: "
+                  + " ".join(f"--range {lo}:{hi}" for lo, hi in below))
+        grid = [list(row) for row in merged["solution"]]
+        if args.output:
+            write_solution(Path(args.output), grid)
+            print(f"Solution written to {args.output}")
+        print(grid_to_string(grid))
+        return 0
+    if gaps:
+        print("No solution in the searched ranks; missing: " + " ".join(f"--range {lo}:{hi}" for lo, hi in gaps))
+        return 3
+    print(f"No solution: all {total:,} layouts searched.")
+    return 1
+
+def _parse_rank_range(text: str, total: int) -> Tuple[int, int]:
+    """``K/N`` (shard K of N, from 0) or ``START:END`` (END may be empty: to the last rank)."""
+    if "/" in text:
+        k, n = text.split("/")
+        return shard_range(total, int(k), int(n))
+    lo, hi = text.split(":")
+    return int(lo or 0), int(hi) if hi else total
+
+
+def pack_main(argv: List[str]) -> int:
+    p = argparse.ArgumentParser(prog="lazor_solver.py pack",
+                                description="Pack puzzles into one memory-mapped .bffpack corpus")
+    p.add_argument("output", help="Corpus file to write (.bffpack)")
+    p.add_argument("inputs", nargs="+",
+                   help="Directories (their *.bff files), .bff (stream) files, .bffpack corpora, or - for stdin")
+    args = p.parse_args(argv)
+
+    def items():
+        for inp in args.inputs:
+            if inp == "-":
+                yield from iter_corpus(sys.stdin.buffer, raw=True)
+            elif Path(inp).is_dir():
+                for bff in sorted(Path(inp).glob("*.bff")):
+                    yield from iter_corpus(bff, raw=True)
+            else:
+                yield from iter_corpus(inp, raw=True)
+
+    n = pack_corpus(items(), args.output)
+    print(f"packed {n} puzzles into {args.output}", file=sys.stderr)
+    return 0
+
+
 def main(argv: Optional[List[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == "batch":
+        return batch_main(argv[1:])
+    if argv and argv[0] == "pack":
+        return pack_main(argv[1:])
+    if argv and argv[0] == "merge":
+        return merge_main(argv[1:])
     p = argparse.ArgumentParser(description="Lazor Stage 2 Solver (single file)")
     p.add_argument("-i", "--input", required=True, help=".bff file path")
     p.add_argument("-o", "--output", required=True, help="Where to write solution grid (.txt)")
     p.add_argument("--diagnose", action="store_true", help="Print best partial hit if no solution")
+    p.add_argument("--strategy", choices=STRATEGIES, default="backtrack",
+                   help="Search strategy: beam-guided backtracking (default), nested combinations, "
+                        "or a CDCL constraint model")
+    p.add_argument("--backend", choices=BACKENDS, default="kernel",
+                   help="Tracer: compiled bytearray kernel (default), bitboard occupancy ints, "
+                        "or numpy batches (--strategy combinations only)")
+    p.add_argument("--workers", type=int, default=1,
+                   help="Split the search across N worker processes (first solution cancels the rest)")
+    p.add_argument("--deterministic", action="store_true",
+                   help="With --workers, return the lowest-ranked solution (same as a single-process run)")
+    p.add_argument("--nogood-cap", type=int, default=200_000,
+                   help="Max nogood trie nodes for --strategy combinations (0 disables nogood learning)")
+    p.add_argument("--order", choices=(AUTO,) + ORDERS, default=AUTO,
+                   help="Block-type nesting order for --strategy combinations (outermost first); "
+                        "auto picks the cheapest estimate per board and prints it")
+    p.add_argument("--counters", action="store_true",
+                   help="Count tracer steps, splits, cycles and beam exits over the search and print them")
+    p.add_argument("--trace-mode", choices=TRACE_MODES, default=None,
+                   help="Tracer early stop on the kernel backend: short (default) stops once every target is lit, "
+                        "fast also gives up once no live beam can reach an unlit target, full traces every beam")
+    p.add_argument("--bffc", action="store_true",
+                   help="Load the puzzle from its compiled .bffc (written next to the .bff, rebuilt when stale)")
+    p.add_argument("--cache", nargs="?", const=str(CACHE_PATH), default=None, metavar="PATH",
+                   help=f"Look up / store solutions in an on-disk cache (default file: {CACHE_PATH})")
+    p.add_argument("--time-limit", type=float, default=None, metavar="SECONDS",
+                   help="Stop the search after SECONDS and report the best partial layout and the share of "
+                        "the search space covered (exit status 3)")
+    p.add_argument("--checkpoint", default=None, metavar="PATH",
+                   help="Save the search cursor, best partial layout and counters to PATH periodically "
+                        "and on SIGTERM (exit status 143); removed once the search finishes")
+    p.add_argument("--checkpoint-every", type=float, default=DEFAULT_EVERY, metavar="SECONDS",
+                   help=f"Seconds between periodic checkpoints (default {DEFAULT_EVERY:g})")
+    p.add_argument("--resume", action="store_true",
+                   help="Continue from the --checkpoint file, if there is one")
+    ranged = p.add_mutually_exclusive_group()
+    ranged.add_argument("--shard", default=None, metavar="K/N",
+                        help="With --strategy combinations, search only shard K (0..N-1) of N equal, contiguous "
+                             "slices of the layout ranks and print a [Range] record for `merge`")
+    ranged.add_argument("--range", dest="rank_range", default=None, metavar="START:END",
+                        help="Like --shard, for the layout ranks START..END-1")
     args = p.parse_args(argv)
+    if args.backend == "numpy" and args.strategy != "combinations":
+        p.error("--backend numpy requires --strategy combinations")
+    if args.counters and args.backend != "kernel":
+        p.error("--counters requires --backend kernel")
+    if args.strategy == "sat" and (args.backend != "kernel" or args.workers > 1):
+        p.error("--strategy sat runs in one process on the kernel backend")
+    if args.trace_mode not in (None, "full") and args.backend != "kernel":
+        p.error("--trace-mode short/fast requires --backend kernel")
+    if args.resume and args.checkpoint is None:
+        p.error("--resume requires --checkpoint")
+    ranged = args.shard or args.rank_range
+    if ranged and (args.strategy != "combinations" or args.workers > 1 or args.backend == "numpy"
+                   or args.checkpoint is not None):
+        p.error("--shard / --range run --strategy combinations in one process on the kernel or bitboard "
+                "backend, without --checkpoint")
+    if args.checkpoint is not None and (args.workers > 1 or args.strategy == "sat" or args.backend == "numpy"):
+        p.error("--checkpoint runs in one process with --strategy backtrack/combinations on the kernel or "
+                "bitboard backend")
+    deadline = deadline_in(args.time_limit)
 
     bff = Path(args.input)
     if not bff.exists():
@@ -296,11 +744,42 @@ def main(argv: Optional[List[str]] = None) -> int:
             print(f"Input not found: {args.input}", file=sys.stderr)
             return 2
 
-    board, inventory, open_slots = parse_bff(bff)
+    compiled = None
+    if args.bffc:
+        puzzle = load_bffc(bff, zero_copy=False)
+        board = Board(puzzle.grid, [Ray(l.x, l.y, l.vx, l.vy) for l in puzzle.lasers], puzzle.targets)
+        inventory, open_slots, compiled = puzzle.inventory, puzzle.open_slots, puzzle.cb
+    else:
+        board, inventory, open_slots = parse_bff(bff)
+    counters = TraceCounters() if args.counters else None
+    if ranged:
+        return _range_main(p, args, board, inventory, open_slots, compiled, counters, deadline)
+    cache = SolutionCache(args.cache) if args.cache else None
     print(f"Processing {bff.name}... Inventory: A={inventory['A']}, B={inventory['B']}, C={inventory['C']} | slots={len(open_slots)}")
-    solved = place_and_solve(board, inventory, open_slots, diagnose=args.diagnose)
+    result = solve_layout(board, inventory, open_slots, diagnose=args.diagnose, strategy=args.strategy,
+                          nogood_cap=args.nogood_cap, workers=args.workers,
+                          deterministic=args.deterministic, backend=args.backend,
+                          counters=counters, cache=cache, compiled=compiled, order=args.order,
+                          order_report=True, trace_mode=args.trace_mode, deadline=deadline,
+                          checkpoint=args.checkpoint, checkpoint_every=args.checkpoint_every, resume=args.resume)
+    solved = result.grid
+    if solved is None:
+        print_diagnosis(result, args.diagnose)
+    if cache is not None:
+        hits, _, rejected = cache.stats()
+        print(f"[Cache] {'hit' if hits else 'miss'}" + (" (stale entry dropped)" if rejected else ""))
+        cache.close()
     outp = Path(args.output)
-
+    if counters is not None:
+        print("[Counters]")
+        print(counters.report())
+
+    if result.status == TIMEOUT:
+        print("No solution found within the time limit.")
+        return 3
+    if result.status == INTERRUPTED:
+        print(f"Interrupted; resume with --checkpoint {args.checkpoint} --resume")
+        return 143
     if solved is None:
         print("No solution found." + (" (See diagnosis above)" if args.diagnose else ""))
         return 1
@@ -310,5 +789,35 @@ def main(argv: Optional[List[str]] = None) -> int:
     print(grid_to_string(solved))
     return 0
 
+def _range_main(p: argparse.ArgumentParser, args, board: Board, inventory: Dict[str, int],
+                open_slots: List[Tuple[int, int]], compiled: Optional[CompiledBoard],
+                counters: Optional[TraceCounters], deadline: Optional[float]) -> int:
+    """``--shard`` / ``--range``: search one slice of the layout ranks and print its record."""
+    n_blocks = inventory["A"] + inventory["B"] + inventory["C"]
+    total = search_space_size(inventory, len(open_slots))
+    try:
+        start, end = _parse_rank_range(args.shard or args.rank_range, total)
+    except ValueError as e:
+        p.error(f"bad --shard / --range: {e}")
+    print(f"Searching layout ranks {start:,}..{end:,} of {total:,} ({n_blocks} blocks, {len(open_slots)} slots)")
+    record = solve_range(board, inventory, open_slots, start, end, order=args.order, nogood_cap=args.nogood_cap,
+                         backend=args.backend, counters=counters, compiled=compiled, trace_mode=args.trace_mode,
+                         deadline=deadline)
+    print(RANGE_TAG + json.dumps(record), flush=True)
+    if counters is not None:
+        print("[Counters]")
+        print(counters.report())
+    if record["status"] == SOLVED:
+        grid = [list(row) for row in record["solution"]]
+        write_solution(Path(args.output), grid)
+        print(f"Solution (rank {record['rank']:,}) written to {args.output}")
+        print(grid_to_string(grid))
+        return 0
+    if record["status"] == TIMEOUT:
+        print(f"Stopped at the time limit; ranks {record['covered']:,}..{record['end']:,} not searched.")
+        return 3
+    print("No solution in this range.")
+    return 1
+
 if __name__ == "__main__":
     raise SystemExit(main())
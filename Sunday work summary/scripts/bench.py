@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+官方棋盘基准测试 (examples/official)
+
+    python scripts/bench.py run [--repeat 3] [--label NAME]    # append one entry to the history
+    python scripts/bench.py run --corpus stress.bffpack        # same, over a packed corpus
+    python scripts/bench.py compare [--threshold 0.2]          # last entry vs the one before it
+    python scripts/bench.py check [--budget bench/budgets.json]  # last entry vs per-board time limits
+
+Every board runs ``--repeat`` times in its own worker process (so peak RSS is
+per board). A run is timed the way ``lazor_solver.py -i board.bff`` spends it:
+parsing the .bff, then ``lazor_solver.solve_layout`` with the CLI defaults
+(auto order, no backward pass, feasibility check first). An entry records
+those options, and per board: status, wall time (min / median / max), layouts
+evaluated, layouts per second and peak RSS. ``compare`` and ``check`` exit 1
+when they find a regression or a blown budget.
+"""
+from __future__ import annotations
+import argparse
+import json
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from lazor_solver import STRATEGIES, board_from_spec, parse_bff, solve_layout
+from lazor_core.anytime import SOLVED
+from lazor_core.corpus import iter_corpus
+from lazor_core.order import AUTO
+from lazor_core.parser import parse_bff_bytes
+from lazor_core.search import BACKENDS
+
+OFFICIAL = ROOT / "examples" / "official"
+HISTORY = ROOT / "bench" / "history.json"
+BUDGET = ROOT / "bench" / "budgets.json"
+
+
+def _peak_rss_kb() -> int:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss  # macOS reports bytes
+
+
+def options(strategy: str, backend: str) -> dict:
+    """The solve_layout options every timed run uses (the ``lazor_solver.py`` CLI defaults)."""
+    return {"strategy": strategy, "backend": backend, "order": AUTO, "backward": False,
+            "workers": 1, "nogood_cap": 200_000}
+
+
+def bench_board(path: str, repeat: int, strategy: str, backend: str) -> dict:
+    """Parse and solve one board ``repeat`` times in this process."""
+    return _bench(lambda: parse_bff(Path(path)), repeat, options(strategy, backend))
+
+
+def bench_corpus(path: str, repeat: int, strategy: str, backend: str) -> Dict[str, dict]:
+    """Benchmark every puzzle of a corpus (.bffpack or stream file) in this process.
+
+    Puzzles are read one at a time and parsed inside the timed runs;
+    ``peak_rss_kb`` is the process peak so far.
+    """
+    opts = options(strategy, backend)
+    return {name: _bench(lambda: board_from_spec(parse_bff_bytes(body)), repeat, opts)
+            for name, body in iter_corpus(path, raw=True)}
+
+
+def _bench(load, repeat: int, opts: dict) -> dict:
+    times: List[float] = []
+    layouts = 0
+    status = "unsolved"
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = solve_layout(*load(), **opts)
+        times.append(time.perf_counter() - start)
+        layouts = result.layouts
+        status = "solved" if result.status == SOLVED else "unsolved"
+    median = statistics.median(times)
+    return {
+        "status": status,
+        "runs": repeat,
+        "wall_min": round(min(times), 6),
+        "wall_median": round(median, 6),
+        "wall_max": round(max(times), 6),
+        "layouts": layouts,
+        "layouts_per_s": round(layouts / median) if median > 0 else None,
+        "peak_rss_kb": _peak_rss_kb(),
+    }
+
+
+def run_suite(boards: List[Path], repeat: int = 3, strategy: str = "backtrack", backend: str = "kernel",
+              label: Optional[str] = None, corpus: Optional[Path] = None) -> dict:
+    results: Dict[str, dict] = {}
+    for bff in boards:
+        # a fresh worker per board keeps peak RSS per board
+        with ProcessPoolExecutor(max_workers=1) as ex:
+            results[bff.stem] = ex.submit(bench_board, str(bff), repeat, strategy, backend).result()
+    if corpus is not None:
+        # one worker for the whole corpus: thousands of processes would dominate the run
+        with ProcessPoolExecutor(max_workers=1) as ex:
+            results.update(ex.submit(bench_corpus, str(corpus), repeat, strategy, backend).result())
+    entry = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "label": label,
+        "commit": _git_rev(),
+        "python": platform.python_version(),
+        "strategy": strategy,
+        "backend": backend,
+        "options": options(strategy, backend),
+        "boards": results,
+    }
+    if corpus is not None:
+        entry["corpus"] = str(corpus)
+    return entry
+
+
+def _git_rev() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                             capture_output=True, text=True, check=False)
+    except OSError:
+        return None
+    return out.stdout.strip() or None
+
+
+def load_history(path: Path) -> List[dict]:
+    return json.loads(path.read_text()) if path.exists() else []
+
+
+def compare(base: dict, head: dict, threshold: float = 0.2, min_delta: float = 0.005) -> List[str]:
+    """Boards whose median wall time grew by more than ``threshold`` (and ``min_delta`` seconds),
+    or that stopped solving."""
+    problems = []
+    for name, new in head["boards"].items():
+        old = base["boards"].get(name)
+        if old is None:
+            continue
+        if old["status"] == "solved" and new["status"] != "solved":
+            problems.append(f"{name}: {old['status']} -> {new['status']}")
+            continue
+        a, b = old["wall_median"], new["wall_median"]
+        if b - a > min_delta and b > a * (1 + threshold):
+            problems.append(f"{name}: median {a:.4f}s -> {b:.4f}s (+{(b / a - 1) * 100 if a else float('inf'):.0f}%)")
+    return problems
+
+
+def check_budget(entry: dict, budget: dict) -> List[str]:
+    """Boards whose slowest run exceeds their budget (``boards.<name>`` or ``default`` seconds)."""
+    limits = budget.get("boards", {})
+    default = budget.get("default")
+    problems = []
+    for name, res in entry["boards"].items():
+        limit = limits.get(name, default)
+        if limit is not None and res["wall_max"] > limit:
+            problems.append(f"{name}: {res['wall_max']:.3f}s > budget {limit}s")
+    return problems
+
+
+def _print_entry(entry: dict) -> None:
+    print(f"{'board':<15}{'status':<10}{'median s':>10}{'max s':>10}{'layouts':>10}{'layouts/s':>12}{'RSS MB':>8}")
+    for name, r in entry["boards"].items():
+        lps = r.get("layouts_per_s")
+        print(f"{name:<15}{r['status']:<10}{r['wall_median']:>10.4f}{r['wall_max']:>10.4f}"
+              f"{r['layouts']:>10}{'-' if lps is None else lps:>12}{r['peak_rss_kb'] / 1024:>8.1f}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="Benchmark the solver on examples/official")
+    sub = p.add_subparsers(dest="cmd", required=True)
+
+    run = sub.add_parser("run", help="Benchmark every board and append the result to the history")
+    run.add_argument("--repeat", type=int, default=3)
+    run.add_argument("--strategy", choices=STRATEGIES, default="backtrack")
+    run.add_argument("--backend", choices=BACKENDS, default="kernel")
+    run.add_argument("--label", default=None)
+    run.add_argument("--boards", nargs="*", default=None, help="Board names (default: all of examples/official)")
+    run.add_argument("--corpus", type=Path, default=None,
+                     help="Benchmark the puzzles of a .bffpack (or .bff stream file) instead, read lazily")
+    run.add_argument("--history", type=Path, default=HISTORY)
+
+    cmp_ = sub.add_parser("compare", help="Flag regressions between two history entries")
+    cmp_.add_argument("--history", type=Path, default=HISTORY)
+    cmp_.add_argument("--base", type=int, default=-2, help="History index of the baseline (default: previous)")
+    cmp_.add_argument("--head", type=int, default=-1, help="History index to check (default: latest)")
+    cmp_.add_argument("--threshold", type=float, default=0.2, help="Allowed relative slowdown of the median")
+    cmp_.add_argument("--min-delta", type=float, default=0.005, help="Ignore slowdowns below this many seconds")
+
+    chk = sub.add_parser("check", help="Check the latest history entry against the budget file")
+    chk.add_argument("--history", type=Path, default=HISTORY)
+    chk.add_argument("--budget", type=Path, default=BUDGET)
+
+    args = p.parse_args(argv)
+
+    if args.cmd == "run":
+        boards = [] if args.corpus else sorted(OFFICIAL.glob("*.bff"))
+        if args.boards:
+            boards = [b for b in boards if b.stem in args.boards]
+        entry = run_suite(boards, args.repeat, args.strategy, args.backend, args.label, args.corpus)
+        _print_entry(entry)
+        history = load_history(args.history)
+        history.append(entry)
+        args.history.parent.mkdir(parents=True, exist_ok=True)
+        args.history.write_text(json.dumps(history, indent=2))
+        print(f"appended entry #{len(history) - 1} to {args.history}")
+        return 0
+
+    history = load_history(args.history)
+    if args.cmd == "compare":
+        if len(history) < 2:
+            print("need at least two history entries", file=sys.stderr)
+            return 2
+        base, head = history[args.base], history[args.head]
+        if base.get("options") != head.get("options"):
+            # entries without options timed compile + search only (order CAB, no parse)
+            print(f"note: comparing runs with different options: {base.get('options')} vs {head.get('options')}")
+        problems = compare(base, head, args.threshold, args.min_delta)
+    else:
+        if not history:
+            print("history is empty; run 'bench.py run' first", file=sys.stderr)
+            return 2
+        problems = check_budget(history[-1], json.loads(args.budget.read_text()))
+
+    for line in problems:
+        print(f"✗ {line}")
+    if not problems:
+        print("✓ no regressions" if args.cmd == "compare" else "✓ every board within budget")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -27,27 +27,28 @@ print(f"需要放置的方块: {blocks}")
 
 print("\n=== 5. 手动尝试第一个组合 ===")
 if len(positions) >= len(blocks):
-    import copy
-    test_board = copy.deepcopy(board)
-    
     # 尝试第一个位置组合
     from itertools import combinations, permutations
-    first_combo = list(combinations(positions, len(blocks)))[0]
+    first_combo = next(combinations(positions, len(blocks)))
     print(f"尝试位置组合: {first_combo}")
     
     # 尝试第一种方块排列
-    first_perm = list(permutations(blocks))[0]
+    first_perm = next(permutations(blocks))
     print(f"尝试方块排列: {first_perm}")
     
+    # 直接在 board 上放置，试完用 rollback 撤销（不再整盘 deepcopy）
+    token = board.snapshot()
     try:
         for i, (r, c) in enumerate(first_combo):
-            test_board.place_block(r, c, first_perm[i])
+            board.place(r, c, first_perm[i])
         
-        hit = simulate_board(test_board)
+        hit = simulate_board(board)
         print(f"击中点: {sorted(hit)}")
         print(f"匹配: {hit == board.points}")
     except Exception as e:
         print(f"错误: {e}")
+    finally:
+        board.rollback(token)
 
 print("\n=== 6. 检查求解器统计 ===")
 from itertools import combinations, permutations
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+合成谜题生成器 (规模基准用)
+
+    python scripts/gen_puzzles.py OUT_DIR --size 8x8 --size 10x10 --slots 0.6 --fixed 0.05 \\
+        --inventory A=6,B=2,C=1 --lasers 2 --targets 3 --count 10 --seed 1
+    python lazor_solver.py pack gen.bffpack OUT_DIR && python scripts/bench.py run --corpus gen.bffpack
+
+:func:`generate_puzzle` lays out a ``width`` x ``height`` grid: a
+``fixed_density`` share of the cells hold a fixed A/B/C block, a
+``slot_density`` share are open slots and the rest are holes (``x``). It plants
+the inventory on random open slots and traces random lasers over that layout
+with the reference tracer (``lazor_solver.trace_all_rays``). The
+targets are picked from the lit points, first from those the planted blocks
+are needed for, so the planted layout solves the puzzle by construction. The
+same arguments and seed always give the same puzzle, and the seed is written
+into the ``.bff`` header comment.
+"""
+from __future__ import annotations
+import argparse
+import random
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from lazor_solver import Board, Ray, trace_all_rays
+
+ATTEMPTS = 200  # laser draws per puzzle before giving up
+
+Grid = List[List[str]]
+Point = Tuple[int, int]
+
+
+@dataclass
+class GeneratedPuzzle:
+    """A generated board, its planted solution and the arguments that produced it."""
+    grid: Grid                                  # "o" slots, "x" holes, fixed "A"/"B"/"C"
+    inventory: Dict[str, int]
+    lasers: List[Tuple[int, int, int, int]]     # x, y, vx, vy
+    targets: List[Point]
+    solution: Grid                              # ``grid`` with the planted blocks
+    seed: int
+    params: Dict[str, object] = field(default_factory=dict)
+
+    @property
+    def name(self) -> str:
+        return f"gen_{len(self.grid[0])}x{len(self.grid)}_s{self.seed}"
+
+    def to_bff(self) -> str:
+        args = " ".join(f"{k}={v}" for k, v in self.params.items())
+        lines = [f"# generated by scripts/gen_puzzles.py: seed={self.seed} {args}".rstrip(), "", "GRID START"]
+        lines += [" ".join(row) for row in self.grid]
+        lines += ["GRID STOP", ""]
+        lines += [f"{k} {n}" for k, n in self.inventory.items() if n]
+        lines.append("")
+        lines += [f"L {x} {y} {vx} {vy}" for x, y, vx, vy in self.lasers]
+        lines.append("")
+        lines += [f"P {x} {y}" for x, y in self.targets]
+        return "\n".join(lines) + "\n"
+
+    def write(self, out_dir) -> Path:
+        path = Path(out_dir) / f"{self.name}.bff"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(self.to_bff())
+        return path
+
+
+def generate_puzzle(width: int, height: int, slot_density: float = 0.6, inventory: Optional[Dict[str, int]] = None,
+                    lasers: int = 1, fixed_density: float = 0.0, targets: int = 3,
+                    seed: int = 0) -> GeneratedPuzzle:
+    """One solvable puzzle (see the module docstring); raises ValueError when the
+    arguments leave no room for the inventory or no laser draw lights enough points."""
+    inventory = {k: (inventory or {}).get(k, 0) for k in "ABC"}
+    n_cells = width * height
+    n_fixed = round(fixed_density * n_cells)
+    n_slots = round(slot_density * n_cells)
+    if width < 1 or height < 1 or lasers < 1 or targets < 1:
+        raise ValueError("the grid, the lasers and the targets must not be empty")
+    if n_fixed + n_slots > n_cells:
+        raise ValueError(f"slot and fixed-block densities add up to more than the {n_cells} cells")
+    if sum(inventory.values()) > n_slots:
+        raise ValueError(f"inventory of {sum(inventory.values())} blocks does not fit on {n_slots} slots")
+    rng = random.Random(seed)
+
+    cells = [(r, c) for r in range(height) for c in range(width)]
+    rng.shuffle(cells)
+    grid = [["x"] * width for _ in range(height)]
+    for r, c in cells[:n_fixed]:
+        grid[r][c] = rng.choice("ABC")
+    slots = cells[n_fixed:n_fixed + n_slots]
+    for r, c in slots:
+        grid[r][c] = "o"
+    solution = [row[:] for row in grid]
+    placed = [k for k in "ABC" for _ in range(inventory[k])]
+    for (r, c), k in zip(rng.sample(slots, len(placed)), placed):
+        solution[r][c] = k
+
+    # every lattice point a beam can light: x + y odd, on or inside the border
+    points = [(x, y) for y in range(2 * height + 1) for x in range(2 * width + 1) if (x + y) % 2]
+    for _ in range(ATTEMPTS):
+        rays = [Ray(*rng.choice(points), rng.choice((-1, 1)), rng.choice((-1, 1))) for _ in range(lasers)]
+        lit = trace_all_rays(Board(solution, rays, points))
+        if len(lit) < targets:
+            continue
+        needed = sorted(lit - trace_all_rays(Board(grid, rays, points)))
+        if placed and not needed:
+            continue
+        picked = rng.sample(needed, min(targets, len(needed)))
+        picked += rng.sample(sorted(lit - set(picked)), targets - len(picked))
+        params = {"size": f"{width}x{height}", "slots": slot_density, "fixed": fixed_density,
+                  "lasers": lasers, "targets": targets}
+        return GeneratedPuzzle(grid=grid, inventory=inventory, lasers=[(l.x, l.y, l.vx, l.vy) for l in rays],
+                               targets=sorted(picked), solution=solution, seed=seed, params=params)
+    raise ValueError(f"no laser draw lit {targets} points in {ATTEMPTS} attempts (seed {seed})")
+
+
+def _size(text: str) -> Tuple[int, int]:
+    w, h = text.lower().split("x")
+    return int(w), int(h)
+
+
+def _inventory(text: str) -> Dict[str, int]:
+    inv = {}
+    for part in text.split(","):
+        k, n = part.split("=")
+        if k.strip().upper() not in ("A", "B", "C"):
+            raise ValueError(f"unknown block type {k!r}")
+        inv[k.strip().upper()] = int(n)
+    return inv
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="Write seeded, solvable-by-construction .bff puzzles")
+    p.add_argument("out_dir", help="Directory for the .bff files (gen_<W>x<H>_s<seed>.bff)")
+    p.add_argument("--size", type=_size, action="append", default=None, metavar="WxH",
+                   help="Grid size in blocks; repeat for a scaling series (default 6x6)")
+    p.add_argument("--slots", type=float, default=0.6, help="Share of the cells that are open slots")
+    p.add_argument("--fixed", type=float, default=0.0, help="Share of the cells holding a fixed block")
+    p.add_argument("--inventory", type=_inventory, default={"A": 3}, metavar="A=n,B=n,C=n",
+                   help="Blocks to place per type (default A=3)")
+    p.add_argument("--lasers", type=int, default=1, help="Number of lasers")
+    p.add_argument("--targets", type=int, default=3, help="Number of target points")
+    p.add_argument("--count", type=int, default=1, help="Puzzles per size (seeds SEED, SEED+1, ...)")
+    p.add_argument("--seed", type=int, default=0, help="First seed")
+    args = p.parse_args(argv)
+
+    written = 0
+    for width, height in args.size or [(6, 6)]:
+        for seed in range(args.seed, args.seed + args.count):
+            try:
+                puzzle = generate_puzzle(width, height, args.slots, args.inventory, args.lasers, args.fixed,
+                                         args.targets, seed)
+            except ValueError as e:
+                print(f"{width}x{height} seed {seed}: {e}", file=sys.stderr)
+                continue
+            print(puzzle.write(args.out_dir))
+            written += 1
+    return 0 if written else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""限时求解 (deadline / SolveResult / coverage) 测试"""
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from lazor_core import parse_bff, Board, solve, SolveResult
+from lazor_core.backward import backward_prune
+from lazor_core.kernel import FAST, CompiledBoard, trace_mask
+from lazor_core.models import Laser
+from lazor_core.parallel import make_search
+
+OFFICIAL = ROOT / "examples" / "official"
+
+
+def _load(name):
+    return Board.from_bffspec(parse_bff(str(OFFICIAL / f"{name}.bff")))
+
+
+def test_exhausted_searches_cover_the_whole_space():
+    rng = random.Random(17)
+    for _ in range(200):
+        W, H = rng.randint(2, 4), rng.randint(2, 4)
+        grid = [[rng.choice("oooooxABC") for _ in range(W)] for _ in range(H)]
+        lasers = [Laser(rng.randrange(0, 2 * W, 2) + 1, rng.randrange(0, 2 * H + 1, 2),
+                        rng.choice((-1, 1)), rng.choice((-1, 1))) for _ in range(rng.randint(1, 2))]
+        slots = [r * W + c for r in range(H) for c in range(W) if grid[r][c] == "o"]
+        inv = {k: rng.randint(0, 2) for k in "ABC"}
+        points = [(x, y) for x in range(2 * W + 1) for y in range(2 * H + 1) if (x + y) % 2]
+        cb = CompiledBoard(grid, lasers, rng.sample(points, 3))
+        prune = backward_prune(cb, slots)
+        for strategy in ("backtrack", "combinations"):
+            for kw in ({}, {"prune": prune}, {"prune": prune, "trace_mode": FAST}):
+                search = make_search(cb, inv, slots, strategy, **kw)
+                cells = search.run()
+                if cells is None:
+                    assert search.coverage() == 1.0, (strategy, kw)
+                else:
+                    assert trace_mask(cb, cells) == cb.full_mask
+                    assert 0.0 < search.coverage() <= 1.0
+
+
+def test_solve_statuses():
+    result = solve(_load("mad_7"))
+    assert isinstance(result, SolveResult) and result.status == "solved" and result.solved
+    assert result.best_hit == result.targets and result.grid == result.best_grid
+
+    result = solve(_load("mad_1"), time_limit=30)
+    assert result.status == "exhausted" and result.grid is None
+    assert result.coverage == 1.0 and result.best_hit == 3 and result.best_grid is not None
+    assert result.as_dict()["best_grid"][0] == "".join(result.best_grid[0])
+
+
+def test_deadline_is_respected():
+    board = _load("yarn_5")
+    for workers in (1, 2):
+        limit = 0.05
+        t0 = time.monotonic()
+        result = solve(board, time_limit=limit, strategy="combinations", order="CAB", backward=False,
+                       workers=workers)
+        took = time.monotonic() - t0
+        assert result.status == "timeout", result.report()
+        assert 0.0 < result.coverage < 1.0 and result.layouts > 0
+        assert result.best_grid is not None and 0 < result.best_hit < result.targets
+        if workers == 1:
+            assert took < limit + 0.03, took
+        assert result.report().startswith("[Result] timeout after ")
+    # an earlier absolute deadline wins over time_limit
+    result = solve(board, deadline=time.monotonic(), time_limit=10, strategy="combinations", order="CAB",
+                   backward=False)
+    assert result.status == "timeout"
+
+
+def test_sat_deadline_is_respected():
+    sys.path.insert(0, str(ROOT / "scripts"))
+    from gen_puzzles import generate_puzzle
+    limit = 0.05
+    with tempfile.TemporaryDirectory() as tmp:
+        for seed in (0, 2):
+            # 12x12: building the formula alone takes longer than the limit
+            puzzle = generate_puzzle(12, 12, inventory={"A": 6, "B": 2, "C": 2}, lasers=2, targets=6, seed=seed)
+            board = Board.from_bffspec(parse_bff(str(puzzle.write(tmp))))
+            for backward in (True, False):
+                t0 = time.monotonic()
+                result = solve(board, time_limit=limit, strategy="sat", backward=backward)
+                took = time.monotonic() - t0
+                assert result.status == "timeout", result.report()
+                assert took < limit + 0.05, (seed, backward, took)
+
+
+if __name__ == "__main__":
+    test_exhausted_searches_cover_the_whole_space()
+    test_solve_statuses()
+    test_deadline_is_respected()
+    test_sat_deadline_is_respected()
+    print("✓ 限时求解正常")
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""目标反向可达剪枝 (lazor_core.backward) 测试"""
+import random
+import sys
+from itertools import combinations
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from lazor_solver import parse_bff
+from lazor_core.backward import backward_prune
+from lazor_core.kernel import CompiledBoard, compile_board, trace_mask
+from lazor_core.models import Laser
+from lazor_core.parallel import make_search
+
+
+def _layouts(base, slots, inv):
+    """Every way to place ``inv`` (A/B/C counts) on ``slots``."""
+    na, nb, nc = inv["A"], inv["B"], inv["C"]
+    for pa in combinations(slots, na):
+        rest = [s for s in slots if s not in pa]
+        for pb in combinations(rest, nb):
+            rest2 = [s for s in rest if s not in pb]
+            for pc in combinations(rest2, nc):
+                cells = bytearray(base)
+                for group, code in ((pa, 1), (pb, 2), (pc, 3)):
+                    for ci in group:
+                        cells[ci] = code
+                yield cells
+
+
+def _random_puzzle(rng):
+    W, H = rng.randint(2, 4), rng.randint(2, 4)
+    grid = [[rng.choice("oooooxABC") for _ in range(W)] for _ in range(H)]
+    lasers = []
+    for _ in range(rng.randint(1, 2)):
+        x, y = rng.randrange(0, 2 * W, 2) + 1, rng.randrange(0, 2 * H + 1, 2)
+        lasers.append(Laser(x, y, rng.choice((-1, 1)), rng.choice((-1, 1))))
+    slots = [r * W + c for r in range(H) for c in range(W) if grid[r][c] == "o"]
+    kinds = [rng.choice((1, 2, 3)) for _ in range(rng.randint(0, min(4, len(slots))))]
+    inv = {k: kinds.count(code) for k, code in (("A", 1), ("B", 2), ("C", 3))}
+    points = [(x, y) for x in range(2 * W + 1) for y in range(2 * H + 1) if (x + y) % 2]
+    cb0 = CompiledBoard(grid, lasers, points)
+    plant = bytearray(cb0.base_cells)
+    for ci, k in zip(rng.sample(slots, len(kinds)), kinds):
+        plant[ci] = k
+    lit = cb0.mask_to_points(trace_mask(cb0, plant))
+    targets = rng.sample(lit, min(len(lit), 3)) if lit and rng.random() < 0.7 else rng.sample(points, 2)
+    return CompiledBoard(grid, lasers, targets), inv, slots
+
+
+def test_prune_is_sound_and_counts_match():
+    """No solution is ever ruled out, and space() counts exactly the layouts it keeps."""
+    rng = random.Random(5)
+    removed = 0
+    for _ in range(300):
+        cb, inv, slots = _random_puzzle(rng)
+        prune = backward_prune(cb, slots)
+        every = list(_layouts(cb.base_cells, slots, inv))
+        kept = [cells for cells in every if all(prune.allowed[ci] >> cells[ci] & 1 for ci in slots)]
+        if not prune.feasible:
+            kept = []
+        for cells in every:
+            if trace_mask(cb, cells) == cb.full_mask:
+                assert cells in kept, (bytes(cb.base_cells), cb.targets, inv)
+        assert prune.space(inv, pruned=False) == len(every)
+        assert prune.space(inv) == len(kept)
+        removed += len(every) - len(kept)
+    assert removed > 0
+
+
+def test_pruned_searches_agree():
+    rng = random.Random(9)
+    for _ in range(200):
+        cb, inv, slots = _random_puzzle(rng)
+        prune = backward_prune(cb, slots)
+        expected = make_search(cb, inv, slots, "combinations", nogood_cap=0).run()
+        for strategy in ("backtrack", "combinations", "sat"):
+            cells = make_search(cb, inv, slots, strategy, prune=prune).run()
+            assert (cells is None) == (expected is None), (strategy, bytes(cb.base_cells), cb.targets, inv)
+            if cells is not None:
+                assert trace_mask(cb, cells) == cb.full_mask
+
+
+def test_official_boards_report():
+    for bff in sorted((ROOT / "examples" / "official").glob("*.bff")):
+        board, inv, open_slots = parse_bff(bff)
+        cb = compile_board(board)
+        slots = [r * cb.W + c for r, c in open_slots]
+        prune = backward_prune(cb, slots)
+        assert prune.feasible
+        assert 0 < prune.space(inv) < prune.space(inv, pruned=False), bff.stem
+        text = prune.report(inv, cb.W)
+        assert text.startswith("[Backward] layouts ")
+        cells = make_search(cb, inv, slots, "backtrack", prune=prune).run()
+        assert (cells is None) == (bff.stem == "mad_1"), bff.stem
+
+
+if __name__ == "__main__":
+    test_prune_is_sound_and_counts_match()
+    test_pruned_searches_agree()
+    test_official_boards_report()
+    print("✓ 反向可达剪枝正常")
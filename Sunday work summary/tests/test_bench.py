@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""基准测试脚本 (scripts/bench.py) 的比较与预算检查测试"""
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "scripts"))
+
+import bench
+
+
+def _entry(**medians):
+    return {"strategy": "backtrack", "backend": "kernel", "boards": {
+        name: {"status": "solved", "wall_median": t, "wall_max": t * 1.5} for name, t in medians.items()}}
+
+
+def test_compare_flags_regressions():
+    base = _entry(tiny_5=0.001, mad_7=0.5, yarn_5=1.0)
+    head = _entry(tiny_5=0.003, mad_7=0.55, yarn_5=2.0)
+    head["boards"]["mad_7"]["status"] = "unsolved"
+    problems = bench.compare(base, head, threshold=0.2, min_delta=0.005)
+    # tiny_5 tripled but only by 2 ms (noise floor)
+    assert [p.split(":")[0] for p in problems] == ["mad_7", "yarn_5"]
+
+
+def test_check_budget():
+    entry = _entry(tiny_5=1.0, yarn_5=10.0)
+    budget = {"default": 60, "boards": {"tiny_5": 5, "yarn_5": 5}}
+    assert [p.split(":")[0] for p in bench.check_budget(entry, budget)] == ["yarn_5"]
+
+
+def test_run_suite_records_metrics():
+    entry = bench.run_suite([bench.OFFICIAL / "tiny_5.bff"], repeat=2)
+    res = entry["boards"]["tiny_5"]
+    assert res["status"] == "solved" and res["runs"] == 2
+    assert res["wall_min"] <= res["wall_median"] <= res["wall_max"]
+    assert res["layouts"] > 0 and res["layouts_per_s"] > 0 and res["peak_rss_kb"] > 0
+    assert entry["options"] == {"strategy": "backtrack", "backend": "kernel", "order": "auto",
+                                "backward": False, "workers": 1, "nogood_cap": 200_000}
+
+
+if __name__ == "__main__":
+    test_compare_flags_regressions()
+    test_check_budget()
+    test_run_suite_records_metrics()
+    print("✓ bench 比较与预算检查正常")
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""可变棋盘 place / undo / snapshot 日志测试"""
+import copy
+import random
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from lazor_core import parse_bff, Board, simulate_board, get_placeable_positions
+from lazor_core.models import BlockType
+
+
+def test_place_undo_rollback():
+    board = Board.from_bffspec(parse_bff(str(ROOT / "examples" / "official" / "tiny_5.bff")))
+    original = copy.deepcopy(board)
+    slots = get_placeable_positions(board)
+    kinds = list(BlockType)
+    rng = random.Random(2)
+
+    for _ in range(50):
+        token = board.snapshot()
+        picks = rng.sample(slots, 3)
+        for r, c in picks:
+            board.place(r, c, rng.choice(kinds))
+        # the in-place board traces like a fresh copy with the same blocks
+        fresh = copy.deepcopy(original)
+        for r, c in picks:
+            fresh.place_block(r, c, board.fixed_blocks[(r, c)].kind)
+        assert simulate_board(board) == simulate_board(fresh)
+        assert board.placed() == picks
+        assert board.undo() == picks[-1]
+        board.rollback(token)
+        assert board == original and board.snapshot() == 0
+
+    try:
+        board.undo()
+    except IndexError:
+        pass
+    else:
+        raise AssertionError("undo on an empty journal must fail")
+
+
+if __name__ == "__main__":
+    test_place_undo_rollback()
+    print("✓ place / undo / rollback 正常")
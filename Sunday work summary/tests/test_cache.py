@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""磁盘解缓存 (lazor_core.cache) 测试：规范化键、LRU 淘汰、命中复验"""
+import json
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from lazor_solver import parse_bff, place_and_solve
+from lazor_core.cache import SolutionCache, puzzle_key
+
+OFFICIAL = ROOT / "examples" / "official"
+
+
+def _key(path):
+    board, inv, _ = parse_bff(path)
+    return puzzle_key(board.grid, board.lasers, board.targets, inv)
+
+
+def test_key_ignores_formatting_and_order():
+    text = (OFFICIAL / "tiny_5.bff").read_text().splitlines()
+    lasers = [l for l in text if l.startswith("L")]
+    points = [l for l in text if l.startswith("P")]
+    rest = [l for l in text if not l.startswith(("L", "P"))]
+    shuffled = ["# same puzzle, reformatted", ""] + ["  " + l for l in rest] + lasers[::-1] + points[::-1]
+    with tempfile.TemporaryDirectory() as tmp:
+        alt = Path(tmp) / "alt.bff"
+        alt.write_text("\n".join(shuffled))
+        assert _key(alt) == _key(OFFICIAL / "tiny_5.bff")
+    assert _key(OFFICIAL / "mad_1.bff") != _key(OFFICIAL / "mad_4.bff")
+
+
+def test_hit_lru_and_reverification():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Path(tmp) / "cache.sqlite3"
+        with SolutionCache(db, max_entries=2) as cache:
+            solved = {}
+            for name in ("tiny_5", "dark_1", "mad_4"):
+                board, inv, slots = parse_bff(OFFICIAL / f"{name}.bff")
+                solved[name] = place_and_solve(board, inv, slots, cache=cache)
+                assert solved[name] is not None
+            assert len(cache) == 2  # tiny_5 evicted (least recently used)
+
+            board, inv, slots = parse_bff(OFFICIAL / "mad_4.bff")
+            assert place_and_solve(board, inv, slots, cache=cache) == solved["mad_4"]
+            assert cache.hits == 1
+
+        # a corrupted entry is rejected and dropped instead of returned
+        key = _key(OFFICIAL / "mad_4.bff")
+        with sqlite3.connect(str(db)) as conn:
+            conn.execute("UPDATE solutions SET solution = ? WHERE key = ?", (json.dumps(["oooo"] * 5), key))
+        with SolutionCache(db, max_entries=2) as cache:
+            assert cache.lookup(board.grid, board.lasers, board.targets, inv) is None
+            assert cache.rejected == 1 and len(cache) == 1
+
+
+if __name__ == "__main__":
+    test_key_ignores_formatting_and_order()
+    test_hit_lru_and_reverification()
+    print("✓ 解缓存正常")
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""断点续算 (checkpoint / --resume) 测试"""
+import json
+import os
+import signal
+import sys
+import tempfile
+from itertools import combinations
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import lazor_solver
+from lazor_core.backward import backward_prune
+from lazor_core.checkpoint import CheckpointError, Checkpointer, load_checkpoint, run_meta
+from lazor_core.counters import TraceCounters
+from lazor_core import search as search_mod
+from lazor_core.kernel import compile_board
+from lazor_core.parallel import make_search
+from lazor_core.search import CombinationSearch, combinations_from
+
+OFFICIAL = ROOT / "examples" / "official"
+
+
+def _setup(name):
+    board, inv, open_slots = lazor_solver.parse_bff(OFFICIAL / f"{name}.bff")
+    cb = compile_board(board)
+    return board, cb, inv, [r * cb.W + c for r, c in open_slots]
+
+
+def _stop_after(n):
+    calls = [0]
+
+    def hook():
+        calls[0] += 1
+        return calls[0] >= n
+    return hook
+
+
+def test_combinations_from_resumes_the_enumeration():
+    pool = [1, 3, 4, 7, 8, 9]
+    for n in range(4):
+        full = list(combinations(pool, n))
+        for i, start in enumerate(full):
+            assert list(combinations_from(pool, n, start)) == full[i:]
+
+
+def _interrupted(cb, inv, slots, strategy, polls, **kw):
+    """State saved at the ``polls``-th should_stop poll (None when the search ended first)."""
+    search = make_search(cb, inv, slots, strategy, diagnose=True, **kw)
+    stop = _stop_after(polls)
+    saved = []
+    search.should_stop = lambda: stop() and not saved.append(json.loads(json.dumps(search.state())))
+    if search.run() is not None or not saved:
+        return None
+    return saved[0]
+
+
+def test_restored_search_finishes_like_an_uninterrupted_one():
+    cases = [("mad_1", "backtrack", {}, 0),
+             ("mad_7", "backtrack", {"prune": True}, 0),
+             ("mad_1", "backtrack", {"backend": "bitboard"}, 0),
+             ("mad_1", "combinations", {"order": "CAB", "nogood_cap": 0}, 31),
+             ("mad_1", "combinations", {"order": "auto", "prune": True}, 15),
+             ("numbered_6", "combinations", {"order": "ABC"}, 255),
+             ("mad_4", "combinations", {"order": "BCA", "backend": "bitboard"}, 255)]
+    poll = search_mod.STOP_POLL
+    try:
+        for name, strategy, kw, every in cases:
+            search_mod.STOP_POLL = every        # poll (and so checkpoint) every ``every + 1`` nodes / layouts
+            _, cb, inv, slots = _setup(name)
+            if kw.pop("prune", False):
+                kw["prune"] = backward_prune(cb, slots)
+            ref = make_search(cb, inv, slots, strategy, diagnose=True, **kw)
+            expected = ref.run()
+            polls = 1
+            while True:
+                state = _interrupted(cb, inv, slots, strategy, polls, **kw)
+                if state is None:
+                    break
+                search = make_search(cb, inv, slots, strategy, diagnose=True, **kw)
+                search.restore(state)
+                assert search.run() == expected, (name, strategy, polls)
+                # nothing covered before the checkpoint is evaluated again
+                assert search.layouts == ref.layouts, (name, strategy, polls)
+                assert search.best_hit == ref.best_hit and search.coverage() == ref.coverage()
+                if kw.get("nogood_cap") == 0:
+                    assert search.traces == ref.traces
+                polls += 1
+            assert polls > 3, (name, strategy)
+    finally:
+        search_mod.STOP_POLL = poll
+
+
+def test_checkpoint_belongs_to_its_search():
+    _, cb, inv, slots = _setup("mad_7")
+    state = _interrupted(cb, inv, slots, "backtrack", 1)
+    _, cb2, inv2, slots2 = _setup("yarn_5")
+    other = make_search(cb2, inv2, slots2, "backtrack")
+    other.restore(state)
+    try:
+        other.run()
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("a foreign cursor was accepted")
+    search = CombinationSearch(cb, inv, slots, order="CAB", backend="numpy")
+    search.restore({"cursor": [[], [], []], "layouts": 0, "traces": 0, "pruned": 0, "best_hit": 0,
+                    "best_cells": None})
+    try:
+        search.run()
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("the numpy backend cannot resume")
+
+
+def test_solve_layout_resumes_from_file():
+    board, inv, open_slots = lazor_solver.parse_bff(OFFICIAL / "mad_7.bff")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "run.ckpt"
+        counters = TraceCounters()
+        result = lazor_solver.solve_layout(board, inv, open_slots, strategy="combinations", order="CAB",
+                                           counters=counters, checkpoint=str(path), deadline=0.0)
+        assert result.status == "timeout" and path.exists()
+        doc = json.loads(path.read_text())
+        assert doc["counters"]["traces"] == counters.traces and doc["state"]["cursor"] is not None
+
+        meta = run_meta(board.grid, board.lasers, board.targets, inv, strategy="backtrack", order="CAB",
+                        backend="kernel")
+        try:
+            load_checkpoint(path, meta)
+        except CheckpointError as e:
+            assert "strategy" in str(e)
+        else:
+            raise AssertionError("a checkpoint of another strategy was accepted")
+
+        resumed = TraceCounters()
+        result = lazor_solver.solve_layout(board, inv, open_slots, strategy="combinations", order="CAB",
+                                           counters=resumed, checkpoint=str(path), resume=True)
+        assert result.solved and not path.exists()
+        plain = lazor_solver.solve_layout(board, inv, open_slots, strategy="combinations", order="CAB")
+        assert result.grid == plain.grid and result.layouts == plain.layouts
+        assert resumed.traces >= counters.traces
+
+
+def test_sigterm_saves_and_stops():
+    _, cb, inv, slots = _setup("yarn_5")
+    search = make_search(cb, inv, slots, "combinations", order="CAB", diagnose=True)
+    calls = [0]
+
+    def also():
+        calls[0] += 1
+        if calls[0] == 3:
+            os.kill(os.getpid(), signal.SIGTERM)
+        return False
+    previous = signal.getsignal(signal.SIGTERM)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "run.ckpt"
+        with Checkpointer(path, search, {"puzzle": "x"}, every=3600, also=also) as ckpt:
+            search.should_stop = ckpt
+            assert search.run() is None
+        assert ckpt.stopped == "sigterm" and ckpt.saves == 1 and search.cancelled
+        assert signal.getsignal(signal.SIGTERM) is previous
+        ckpt.finish()
+        assert load_checkpoint(path, {"puzzle": "x"})["state"]["layouts"] == search.layouts - 1
+
+
+if __name__ == "__main__":
+    test_combinations_from_resumes_the_enumeration()
+    test_restored_search_finishes_like_an_uninterrupted_one()
+    test_checkpoint_belongs_to_its_search()
+    test_solve_layout_resumes_from_file()
+    test_sigterm_saves_and_stops()
+    print("✓ 断点续算正常")
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""谜题语料包 (.bffpack, lazor_core.corpus) 与流式解析测试"""
+import io
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from lazor_core.corpus import HEADER, Corpus, iter_corpus, pack_corpus
+from lazor_core.parser import iter_bff, parse_bff
+from lazor_solver import solve_many
+
+BFFS = sorted((ROOT / "examples").rglob("*.bff"))
+
+
+def _stream():
+    # official files do not all end with a newline
+    return b"# corpus\n\n" + b"".join(b"--- " + f.stem.encode() + b"\n" + f.read_bytes().rstrip(b"\n") + b"\n"
+                                      for f in BFFS)
+
+
+def test_stream_parser_buffer_and_chunked_file():
+    expected = [(f.stem, parse_bff(str(f))) for f in BFFS]
+    assert list(iter_bff(_stream())) == expected
+    for chunk_size in (1, 3, 64):
+        assert list(iter_bff(io.BytesIO(_stream()), chunk_size)) == expected
+    # a plain .bff is a one-puzzle stream
+    assert list(iter_bff(BFFS[0].read_bytes())) == [("#0", parse_bff(str(BFFS[0])))]
+
+
+def test_pack_random_access_and_lazy_batch():
+    with tempfile.TemporaryDirectory() as tmp:
+        pack = Path(tmp) / "all.bffpack"
+        assert pack_corpus(BFFS, pack) == len(BFFS)
+        with Corpus(pack) as corpus:
+            assert len(corpus) == len(BFFS)
+            for i in (5, 0, -1, 3):
+                name, spec = corpus[i]
+                assert (name, spec) == (BFFS[i].stem, parse_bff(str(BFFS[i])))
+        # the data section is a plain stream
+        data = pack.read_bytes()
+        index_offset = HEADER.unpack_from(data)[-1]
+        assert list(iter_bff(data[HEADER.size:index_offset])) == list(iter_corpus(pack))
+
+        official = [item for item in iter_corpus(pack) if item[0] in {f.stem for f in BFFS if f.parent.name == "official"}]
+        records = list(solve_many(iter(official), largest_first=False))
+        assert [r["board"] for r in records] == [name for name, _ in official]  # input order
+        status = {r["board"]: r["status"] for r in records}
+        assert status.pop("mad_1") == "unsolved" and set(status.values()) == {"solved"}
+
+
+if __name__ == "__main__":
+    test_stream_parser_buffer_and_chunked_file()
+    test_pack_random_access_and_lazy_batch()
+    print("✓ 语料包与流式解析正常")
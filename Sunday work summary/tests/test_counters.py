@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""追踪计数器 (lazor_core.counters) 测试：参考实现与 kernel 计数一致"""
+import random
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from lazor_solver import Board, parse_bff, place_and_solve, trace_all_rays
+from lazor_core import parse_bff as core_parse_bff, Board as CoreBoard, simulate_board
+from lazor_core.counters import TraceCounters
+from lazor_core.kernel import compile_board, trace_mask
+
+
+def test_reference_and_kernel_counts_agree():
+    rng = random.Random(4)
+    for bff in sorted((ROOT / "examples").rglob("*.bff")):
+        board, _, slots = parse_bff(bff)
+        cb = compile_board(board)
+        for _ in range(100):
+            g = [row[:] for row in board.grid]
+            for r, c in slots:
+                g[r][c] = rng.choice("oooABC")
+            ref, ker = TraceCounters(), TraceCounters()
+            trace_all_rays(Board(g, board.lasers, board.targets), counters=ref)
+            trace_mask(cb, cb.cells_for(g), counters=ker)
+            assert ref == ker, (bff.name, g)
+            # every beam ends exactly one way
+            assert ker.rays == ker.cycles + ker.out_of_bounds + ker.absorbed
+
+
+def test_search_and_simulator_counters():
+    board, inv, slots = parse_bff(ROOT / "examples" / "official" / "tiny_5.bff")
+    counters = TraceCounters()
+    assert place_and_solve(board, inv, slots, counters=counters) == place_and_solve(board, inv, slots)
+    assert counters.traces > 0 and counters.splits > 0
+
+    core = CoreBoard.from_bffspec(core_parse_bff(str(ROOT / "examples" / "official" / "tiny_5.bff")))
+    counters = TraceCounters()
+    assert simulate_board(core, counters=counters) == simulate_board(core)
+    assert counters.traces == 1 and counters.steps > 0
+
+
+if __name__ == "__main__":
+    test_reference_and_kernel_counts_agree()
+    test_search_and_simulator_counters()
+    print("✓ 计数器一致")
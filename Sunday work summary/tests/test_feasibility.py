@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""求解前不可解判定 (lazor_core.feasibility) 测试"""
+import random
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import lazor_solver
+from lazor_core import parse_bff, Board, solve
+from lazor_core.feasibility import analyze
+from lazor_core.kernel import CompiledBoard, compile_board
+from lazor_core.models import Laser
+from lazor_core.parallel import make_search
+
+OFFICIAL = ROOT / "examples" / "official"
+
+
+def _checks(cert):
+    return [check for check, _ in cert.reasons]
+
+
+def test_each_check_gives_a_certificate():
+    grid = [list("ooo"), list("ooo")]
+    slots = list(range(6))
+    lasers = [Laser(1, 0, 1, 1)]            # x + y odd
+
+    cert = analyze(CompiledBoard(grid, lasers, [(2, 1)]), {"A": 7}, slots)
+    assert _checks(cert) == ["inventory"] and "7 blocks" in cert.report()
+
+    cert = analyze(CompiledBoard(grid, lasers, [(3, 2), (2, 2)]), {"A": 1}, slots)
+    assert _checks(cert) == ["parity"] and "(2, 2)" in cert.report() and "(3, 2)" not in cert.report()
+    assert cert.report().startswith("[Infeasible] ")
+
+    cert = analyze(CompiledBoard(grid, [Laser(1, 9, 1, 1)], [(2, 1)]), {"A": 1}, slots)
+    assert _checks(cert) == ["parity"] and "no laser" in cert.report()
+
+    # the laser leaves the grid on its first step, whatever the slots hold
+    cert = analyze(CompiledBoard(grid, [Laser(1, 0, 1, -1)], [(3, 2)]), {"A": 1}, slots)
+    assert _checks(cert) == ["reach"]
+    cert = analyze(CompiledBoard(grid, lasers, [(2, 1), (9, 2)]), {"A": 1}, slots)
+    assert _checks(cert) == ["reach"] and "off the grid" in cert.report()
+
+    cert = analyze(CompiledBoard(grid, lasers, [(2, 1), (2, 3)]), {}, slots)
+    assert _checks(cert) == ["fixed"] and "(2, 3)" in cert.report()
+    assert analyze(CompiledBoard(grid, lasers, [(2, 1), (3, 2)]), {}, slots).feasible
+
+
+def test_infeasible_verdicts_are_sound():
+    rng = random.Random(25)
+    rejected = 0
+    for _ in range(300):
+        W, H = rng.randint(2, 4), rng.randint(2, 3)
+        grid = [[rng.choice("ooooxxBA") for _ in range(W)] for _ in range(H)]
+        lasers = [Laser(rng.randrange(0, 2 * W + 1), rng.randrange(0, 2 * H + 1),
+                        rng.choice((-1, 1)), rng.choice((-1, 1))) for _ in range(rng.randint(1, 2))]
+        points = [(x, y) for x in range(2 * W + 1) for y in range(2 * H + 1)]
+        cb = CompiledBoard(grid, lasers, rng.sample(points, rng.randint(1, 3)))
+        slots = [r * W + c for r in range(H) for c in range(W) if grid[r][c] == "o"]
+        inv = {k: rng.randint(0, 2) for k in "ABC"}
+        cert = analyze(cb, inv, slots)
+        if not cert.feasible and sum(inv.values()) <= len(slots):
+            rejected += 1
+            assert make_search(cb, inv, slots, "combinations", order="ABC", nogood_cap=0).run() is None
+    assert rejected > 50
+
+
+def test_official_boards_pass():
+    for path in sorted(OFFICIAL.glob("*.bff")):
+        board, inv, open_slots = lazor_solver.parse_bff(path)
+        cb = compile_board(board)
+        assert analyze(cb, inv, [r * cb.W + c for r, c in open_slots]).feasible, path.name
+
+
+def test_solvers_return_the_certificate():
+    board, inv, open_slots = lazor_solver.parse_bff(OFFICIAL / "tiny_5.bff")
+    board.targets.append((0, 0))            # the only laser starts at (4, 5): x + y odd
+    result = lazor_solver.solve_layout(board, inv, open_slots)
+    assert result.status == "exhausted" and result.coverage == 1.0 and result.layouts == 0
+    assert result.reason.startswith("[Infeasible] ") and "parity" in result.reason
+
+    core = Board.from_bffspec(parse_bff(str(OFFICIAL / "mad_7.bff")))
+    core.free_blocks = {kind: n + 50 for kind, n in core.free_blocks.items()}
+    result = solve(core)
+    assert result.status == "exhausted" and "inventory" in result.reason
+    assert solve(Board.from_bffspec(parse_bff(str(OFFICIAL / "mad_7.bff")))).reason is None
+
+
+if __name__ == "__main__":
+    test_each_check_gives_a_certificate()
+    test_infeasible_verdicts_are_sound()
+    test_official_boards_pass()
+    test_solvers_return_the_certificate()
+    print("✓ 不可解判定正常")
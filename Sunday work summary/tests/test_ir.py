@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""编译中间表示 (.bffc, lazor_core.ir) 测试：表一致、源文件变更后重编译"""
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from lazor_solver import parse_bff
+from lazor_core.ir import bffc_path, load_bffc
+from lazor_core.kernel import compile_board, trace_mask
+
+TABLES = ("cell_of", "straight", "bounce", "spawn", "hit_bit", "starts")
+
+
+def test_bffc_matches_compile_board():
+    with tempfile.TemporaryDirectory() as tmp:
+        for bff in sorted((ROOT / "examples").rglob("*.bff")):
+            src = Path(tmp) / bff.name
+            shutil.copy(bff, src)
+            board, inv, slots = parse_bff(bff)
+            cb = compile_board(board)
+            for zero_copy in (True, False):
+                puzzle = load_bffc(src, zero_copy=zero_copy)
+                assert (puzzle.grid, puzzle.inventory, puzzle.open_slots) == (board.grid, inv, slots), bff.name
+                for name in TABLES:
+                    assert list(getattr(puzzle.cb, name)) == list(getattr(cb, name)), (bff.name, name)
+                assert puzzle.cb.targets == cb.targets and puzzle.cb.base_cells == cb.base_cells
+                assert trace_mask(puzzle.cb, puzzle.cb.base_cells) == trace_mask(cb, cb.base_cells)
+                puzzle.close()
+
+
+def test_recompiles_only_when_source_changes():
+    with tempfile.TemporaryDirectory() as tmp:
+        src = Path(tmp) / "tiny_5.bff"
+        shutil.copy(ROOT / "examples" / "official" / "tiny_5.bff", src)
+        load_bffc(src).close()
+        compiled = bffc_path(src)
+        stamp = compiled.stat().st_mtime_ns
+        load_bffc(src).close()
+        assert compiled.stat().st_mtime_ns == stamp  # fresh: reused as is
+
+        src.write_text(src.read_text().replace("A 3", "A 2"))
+        puzzle = load_bffc(src)
+        assert puzzle.inventory["A"] == 2
+        puzzle.close()
+
+
+if __name__ == "__main__":
+    test_bffc_matches_compile_board()
+    test_recompiles_only_when_source_changes()
+    print("✓ .bffc 编译与加载正常")
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""编译内核 (lazor_core.kernel) 与参考 trace_all_rays 的一致性测试"""
+import random
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from lazor_solver import Board, parse_bff, trace_all_rays
+from lazor_core import solver as core_solver
+from lazor_core.bitboard import BitBoard, trace_bits
+from lazor_core.kernel import VisitedMap, compile_board, trace_mask
+from lazor_core.models import Laser
+
+
+def test_kernel_matches_reference():
+    rng = random.Random(1)
+    for bff in sorted((ROOT / "examples").rglob("*.bff")):
+        board, _, slots = parse_bff(bff)
+        # every lattice point (plus one ring outside) is a target, so the mask is the full hit set
+        pts = [(x, y) for x in range(-1, 2 * board.W + 2) for y in range(-1, 2 * board.H + 2)]
+        cb = compile_board(Board(board.grid, board.lasers, pts))
+        for _ in range(200):
+            g = [row[:] for row in board.grid]
+            for r, c in slots:
+                g[r][c] = rng.choice("oooABC")
+            ref = trace_all_rays(Board(g, board.lasers, pts))
+            got = set(cb.mask_to_points(trace_mask(cb, cb.cells_for(g))))
+            assert got == ref, (bff.name, g)
+
+
+def test_bitboard_matches_kernel():
+    rng = random.Random(3)
+    for bff in sorted((ROOT / "examples").rglob("*.bff")):
+        board, _, slots = parse_bff(bff)
+        pts = [(x, y) for x in range(-1, 2 * board.W + 2) for y in range(-1, 2 * board.H + 2)]
+        cb = compile_board(Board(board.grid, board.lasers, pts))
+        bb = BitBoard(cb)
+        for _ in range(200):
+            g = [row[:] for row in board.grid]
+            for r, c in slots:
+                g[r][c] = rng.choice("oooABC")
+            cells = cb.cells_for(g)
+            assert trace_bits(bb, *bb.occupancy(cells)) == trace_mask(cb, cells), bff.name
+
+
+def test_visited_map_reuse_and_no_step_cap():
+    """One visited map across more traces than the epoch range; big refract-heavy
+    boards trace to completion (no step cap)."""
+    rng = random.Random(7)
+    W = H = 14
+    pts = [(x, y) for x in range(2 * W + 1) for y in range(2 * H + 1) if (x + y) % 2]
+    lasers = [Laser(1, 0, 1, 1), Laser(2 * W, 3, -1, 1), Laser(2 * W - 1, 2 * H, -1, -1)]
+    visited = VisitedMap(4 * (2 * W + 1) * (2 * H + 1))
+    cb = None
+    for _ in range(300):
+        g = [[rng.choice("oCCCA") for _ in range(W)] for _ in range(H)]
+        board = Board(g, lasers, pts)
+        cb = cb or compile_board(board)
+        ref = trace_all_rays(board, visited=visited)
+        assert trace_all_rays(board) == ref
+        assert set(cb.mask_to_points(trace_mask(cb, cb.cells_for(g)))) == ref
+    assert visited.epoch == 300 - 255
+
+
+def test_core_solutions_pass_the_core_check():
+    """lazor_core.solver traces with the kernel's rules, so its own check accepts its solutions."""
+    rng = random.Random(5)
+    for bff in sorted((ROOT / "examples" / "official").glob("*.bff")):
+        board, inv, slots = core_solver.parse_bff(bff)
+        solved = core_solver.place_and_solve(board, inv, slots)
+        if solved is not None:
+            assert set(board.targets) <= core_solver.trace_all_rays(core_solver.Board(solved, board.lasers,
+                                                                                     board.targets)), bff.name
+        for _ in range(50):
+            g = [row[:] for row in board.grid]
+            for r, c in slots:
+                g[r][c] = rng.choice("oooABC")
+            assert core_solver.trace_all_rays(core_solver.Board(g, board.lasers, board.targets)) == \
+                trace_all_rays(Board(g, board.lasers, board.targets)), bff.name
+
+
+if __name__ == "__main__":
+    test_kernel_matches_reference()
+    test_bitboard_matches_kernel()
+    test_visited_map_reuse_and_no_step_cap()
+    test_core_solutions_pass_the_core_check()
+    print("✓ kernel / bitboard 与 trace_all_rays 一致")
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""NogoodTrie 匹配与 LRU 淘汰测试"""
+import sys
+from itertools import combinations, islice
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from lazor_solver import parse_bff
+from lazor_core.kernel import KIND_A, compile_board, trace_mask, trace_touched
+from lazor_core.nogood import NogoodTrie
+
+
+def _layouts(name, limit):
+    board, inv, slots = parse_bff(ROOT / "examples" / "official" / f"{name}.bff")
+    cb = compile_board(board)
+    idx = [r * cb.W + c for r, c in slots]
+    for pos in islice(combinations(idx, inv["A"]), limit):
+        cells = bytearray(cb.base_cells)
+        for ci in pos:
+            cells[ci] = KIND_A
+        yield cb, idx, cells
+
+
+def test_matched_layouts_fail():
+    trie = NogoodTrie()
+    for cb, idx, cells in _layouts("mad_7", 20000):
+        watch = bytearray(cb.n_cells + 1)
+        for ci in idx:
+            watch[ci] = 1
+        if trie.match(cells):
+            # 命中 nogood 的布局必然失败
+            assert trace_mask(cb, cells) != cb.full_mask
+            continue
+        got, touched = trace_touched(cb, cells, watch)
+        assert got == trace_mask(cb, cells)
+        if got != cb.full_mask:
+            trie.add([(ci, cells[ci]) for ci in touched])
+    assert trie.matches > 0
+
+
+def test_lru_cap_bounds_nodes():
+    trie = NogoodTrie(max_nodes=50)
+    for cb, idx, cells in _layouts("mad_7", 5000):
+        watch = bytearray(cb.n_cells + 1)
+        for ci in idx:
+            watch[ci] = 1
+        if not trie.match(cells):
+            _, touched = trace_touched(cb, cells, watch)
+            trie.add([(ci, cells[ci]) for ci in touched])
+        assert trie.n_nodes <= 50
+    assert trie.evictions > 0
+
+
+if __name__ == "__main__":
+    test_matched_layouts_fail()
+    test_lru_cap_bounds_nodes()
+    print("✓ NogoodTrie 测试通过")
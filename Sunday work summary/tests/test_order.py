@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""自适应嵌套顺序 (lazor_core.order) 测试"""
+import random
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from lazor_solver import parse_bff
+from lazor_core.backward import backward_prune
+from lazor_core.kernel import CompiledBoard, compile_board, trace_mask
+from lazor_core.models import Laser
+from lazor_core.order import ORDERS, plan_order
+from lazor_core.search import CombinationSearch
+
+
+def test_plan_puts_the_largest_level_innermost():
+    slots = list(range(24))
+    plan = plan_order({"A": 6, "B": 0, "C": 0}, slots)
+    assert plan.order[-1] == "A" and set(plan.costs) == set(ORDERS)
+    assert plan.cost == min(plan.costs.values())
+    # equal cost: the opaque block goes outside the reflectors
+    plan = plan_order({"A": 3, "B": 3, "C": 0}, slots[:12])
+    assert plan.order.index("B") < plan.order.index("A")
+    assert plan.report().startswith(f"[Order] {plan.order} (est. cost ")
+
+
+def test_auto_and_adaptive_orders_agree_with_fixed_order():
+    rng = random.Random(13)
+    reorders = 0
+    for _ in range(200):
+        W, H = rng.randint(2, 4), rng.randint(2, 4)
+        grid = [[rng.choice("oooooxABC") for _ in range(W)] for _ in range(H)]
+        lasers = [Laser(rng.randrange(0, 2 * W, 2) + 1, rng.randrange(0, 2 * H + 1, 2),
+                        rng.choice((-1, 1)), rng.choice((-1, 1))) for _ in range(rng.randint(1, 2))]
+        slots = [r * W + c for r in range(H) for c in range(W) if grid[r][c] == "o"]
+        kinds = [rng.choice((1, 2, 3)) for _ in range(rng.randint(0, min(5, len(slots))))]
+        inv = {k: kinds.count(code) for k, code in (("A", 1), ("B", 2), ("C", 3))}
+        points = [(x, y) for x in range(2 * W + 1) for y in range(2 * H + 1) if (x + y) % 2]
+        cb0 = CompiledBoard(grid, lasers, points)
+        plant = bytearray(cb0.base_cells)
+        for ci, k in zip(rng.sample(slots, len(kinds)), kinds):
+            plant[ci] = k
+        lit = cb0.mask_to_points(trace_mask(cb0, plant))
+        targets = rng.sample(lit, min(len(lit), 3)) if lit else rng.sample(points, 2)
+        cb = CompiledBoard(grid, lasers, targets)
+        prune = backward_prune(cb, slots)
+
+        expected = CombinationSearch(cb, inv, slots, order="ABC", nogood_cap=0).run()
+        for backend in ("kernel", "bitboard"):
+            search = CombinationSearch(cb, inv, slots, order="auto", prune=prune, backend=backend)
+            cells = search.run()
+            reorders += search.reorders
+            assert (cells is None) == (expected is None), (backend, grid, lasers, targets, inv)
+            if cells is not None:
+                assert trace_mask(cb, cells) == cb.full_mask
+                assert sorted(cells[ci] for ci in slots if cells[ci]) == sorted(kinds)
+    assert reorders > 0
+
+
+def test_auto_order_solves_official_boards():
+    for bff in sorted((ROOT / "examples" / "official").glob("*.bff")):
+        board, inv, open_slots = parse_bff(bff)
+        cb = compile_board(board)
+        slots = [r * cb.W + c for r, c in open_slots]
+        search = CombinationSearch(cb, inv, slots, order="auto", prune=backward_prune(cb, slots))
+        assert search.plan is not None and search.order == search.plan.order
+        assert (search.run() is None) == (bff.stem == "mad_1"), bff.stem
+
+
+if __name__ == "__main__":
+    test_plan_puts_the_largest_level_innermost()
+    test_auto_and_adaptive_orders_agree_with_fixed_order()
+    test_auto_order_solves_official_boards()
+    print("✓ 自适应嵌套顺序正常")
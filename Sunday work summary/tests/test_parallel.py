@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""多进程并行求解测试：--deterministic 时结果与单进程一致"""
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from lazor_solver import parse_bff, place_and_solve
+
+
+def test_deterministic_matches_sequential():
+    for name in ("tiny_5", "mad_4", "yarn_5", "numbered_6"):
+        board, inv, slots = parse_bff(ROOT / "examples" / "official" / f"{name}.bff")
+        for strategy in ("backtrack", "combinations"):
+            seq = place_and_solve(board, inv, slots, strategy=strategy)
+            par = place_and_solve(board, inv, slots, strategy=strategy, workers=2, deterministic=True)
+            assert par == seq, (name, strategy)
+
+
+def test_unsolvable_exhausts_all_tasks():
+    board, inv, slots = parse_bff(ROOT / "examples" / "official" / "mad_1.bff")
+    assert place_and_solve(board, inv, slots, strategy="combinations", workers=2) is None
+
+
+if __name__ == "__main__":
+    test_deterministic_matches_sequential()
+    test_unsolvable_exhausts_all_tasks()
+    print("✓ 并行求解测试通过")
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""回溯搜索与组合枚举结果一致性测试（随机小棋盘 + 官方棋盘）"""
+import random
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from lazor_solver import Board, Ray, parse_bff, place_and_solve, trace_all_rays
+
+
+def _random_puzzle(rng):
+    """随机生成小棋盘：先放一组方块，再从激光经过的点中挑目标。"""
+    H, W = rng.randint(2, 4), rng.randint(2, 4)
+    grid = [[rng.choice("oooox") for _ in range(W)] for _ in range(H)]
+    slots = [(r, c) for r in range(H) for c in range(W) if grid[r][c] == "o"]
+    inv = {"A": 0, "B": 0, "C": 0}
+    planted = [row[:] for row in grid]
+    for r, c in rng.sample(slots, min(len(slots), rng.randint(1, 4))):
+        kind = rng.choice("AABC")
+        planted[r][c] = kind
+        inv[kind] += 1
+    lasers = []
+    for _ in range(rng.randint(1, 2)):
+        if rng.random() < 0.5:
+            x, y = rng.randrange(0, 2 * W + 1, 2), rng.randrange(1, 2 * H, 2)
+        else:
+            x, y = rng.randrange(1, 2 * W, 2), rng.randrange(0, 2 * H + 1, 2)
+        lasers.append(Ray(x, y, rng.choice((-1, 1)), rng.choice((-1, 1))))
+    lattice = [(x, y) for x in range(2 * W + 1) for y in range(2 * H + 1)]
+    lit = sorted(trace_all_rays(Board(planted, lasers, lattice)))
+    targets = rng.sample(lit, min(len(lit), rng.randint(1, 3))) if lit else []
+    if rng.random() < 0.3:
+        targets.append(rng.choice(lattice))
+    return Board(grid, lasers, targets), inv, slots
+
+
+def _check(board, inv, slots, grid):
+    assert set(board.targets) <= trace_all_rays(Board(grid, board.lasers, board.targets))
+    used = {"A": 0, "B": 0, "C": 0}
+    for r, c in slots:
+        if grid[r][c] in used:
+            used[grid[r][c]] += 1
+    assert used == inv
+
+
+def test_backtrack_agrees_with_combinations():
+    rng = random.Random(5)
+    for _ in range(200):
+        board, inv, slots = _random_puzzle(rng)
+        bt = place_and_solve(board, inv, slots, strategy="backtrack")
+        comb = place_and_solve(board, inv, slots, strategy="combinations")
+        assert (bt is None) == (comb is None), (board, inv)
+        if bt is not None:
+            _check(board, inv, slots, bt)
+
+
+def test_backends_agree():
+    for name in ("tiny_5", "mad_4", "numbered_6", "dark_1"):
+        board, inv, slots = parse_bff(ROOT / "examples" / "official" / f"{name}.bff")
+        for strategy in ("backtrack", "combinations"):
+            kernel = place_and_solve(board, inv, slots, strategy=strategy, backend="kernel")
+            bits = place_and_solve(board, inv, slots, strategy=strategy, backend="bitboard")
+            assert kernel == bits, (name, strategy)
+
+
+def test_backtrack_agrees_on_official():
+    for bff in sorted((ROOT / "examples" / "official").glob("*.bff")):
+        board, inv, slots = parse_bff(bff)
+        grid = place_and_solve(board, inv, slots, strategy="backtrack")
+        comb = place_and_solve(board, inv, slots, strategy="combinations")
+        assert (grid is None) == (comb is None), bff.name
+        if grid is not None:
+            _check(board, inv, slots, grid)
+
+
+if __name__ == "__main__":
+    test_backtrack_agrees_with_combinations()
+    test_backends_agree()
+    test_backtrack_agrees_on_official()
+    print("✓ 回溯搜索测试通过")
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""全部解枚举 / 计数 (iter_solutions / count_solutions) 测试"""
+import random
+import sys
+from itertools import combinations
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from lazor_core import Board, count_solutions, iter_solutions, parse_bff
+from lazor_core.backward import backward_prune
+from lazor_core.kernel import FAST, FULL, CompiledBoard, trace_mask
+from lazor_core.models import Laser
+from lazor_core.parallel import make_search
+
+OFFICIAL = ROOT / "examples" / "official"
+
+
+def _all_solutions(cb, inv, slots):
+    """Brute force: every layout of the inventory over ``slots``, traced in full."""
+    found = set()
+    cells = bytearray(cb.base_cells)
+    for pa in combinations(slots, inv["A"]):
+        rest = [p for p in slots if p not in pa]
+        for pb in combinations(rest, inv["B"]):
+            rest2 = [p for p in rest if p not in pb]
+            for pc in combinations(rest2, inv["C"]):
+                for p in slots:
+                    cells[p] = 0
+                for code, pos in ((1, pa), (2, pb), (3, pc)):
+                    for p in pos:
+                        cells[p] = code
+                if trace_mask(cb, cells) == cb.full_mask:
+                    found.add(bytes(cells))
+    return found
+
+
+def _random_puzzle(rng):
+    W, H = rng.randint(2, 4), rng.randint(2, 3)
+    grid = [[rng.choice("oooooxAB") for _ in range(W)] for _ in range(H)]
+    lasers = [Laser(rng.randrange(0, 2 * W, 2) + 1, rng.randrange(0, 2 * H + 1, 2),
+                    rng.choice((-1, 1)), rng.choice((-1, 1))) for _ in range(rng.randint(1, 2))]
+    slots = [r * W + c for r in range(H) for c in range(W) if grid[r][c] == "o"]
+    kinds = [rng.choice((1, 2, 3)) for _ in range(rng.randint(0, min(3, len(slots))))]
+    inv = {k: kinds.count(code) for k, code in (("A", 1), ("B", 2), ("C", 3))}
+    points = [(x, y) for x in range(2 * W + 1) for y in range(2 * H + 1) if (x + y) % 2]
+    cb0 = CompiledBoard(grid, lasers, points)
+    plant = bytearray(cb0.base_cells)
+    for ci, k in zip(rng.sample(slots, len(kinds)), kinds):
+        plant[ci] = k
+    lit = cb0.mask_to_points(trace_mask(cb0, plant))
+    targets = rng.sample(lit, min(len(lit), rng.randint(1, 2))) if lit else rng.sample(points, 1)
+    return CompiledBoard(grid, lasers, targets), inv, slots
+
+
+def test_solutions_match_brute_force():
+    rng = random.Random(23)
+    many = 0
+    for _ in range(150):
+        cb, inv, slots = _random_puzzle(rng)
+        expected = _all_solutions(cb, inv, slots)
+        many += len(expected) > 1
+        prune = backward_prune(cb, slots)
+        for kw in ({}, {"prune": prune}, {"trace_mode": FULL}, {"prune": prune, "trace_mode": FAST},
+                   {"backend": "bitboard"}):
+            got = [bytes(cells) for cells in make_search(cb, inv, slots, "backtrack", **kw).solutions()]
+            assert len(got) == len(set(got)) and set(got) == expected, kw
+            assert make_search(cb, inv, slots, "backtrack", **kw).count() == len(expected), kw
+            for limit in (1, 2):
+                assert make_search(cb, inv, slots, "backtrack", **kw).count(limit) == min(limit, len(expected))
+    assert many > 10
+
+
+def test_official_boards():
+    for bff in sorted(OFFICIAL.glob("*.bff")):
+        board = Board.from_bffspec(parse_bff(str(bff)))
+        n = count_solutions(board, limit=2)
+        assert (n == 0) == (bff.stem == "mad_1"), bff.stem
+        first = next(iter_solutions(board), None)
+        assert (first is None) == (n == 0)
+    board = Board.from_bffspec(parse_bff(str(OFFICIAL / "tiny_5.bff")))
+    total = count_solutions(board)
+    grids = list(iter_solutions(board))
+    assert len(grids) == total == count_solutions(board, backward=False)
+    assert len({"".join(map("".join, g)) for g in grids}) == total
+
+
+if __name__ == "__main__":
+    test_solutions_match_brute_force()
+    test_official_boards()
+    print("✓ 全部解枚举 / 计数正常")
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""solve_many 批量求解测试（官方棋盘、调度顺序、超时与解析错误）"""
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from lazor_solver import Board, parse_bff, search_space_size, solve_many, trace_all_rays
+
+OFFICIAL = sorted((ROOT / "examples" / "official").glob("*.bff"))
+
+
+def test_solve_many_official():
+    records = list(solve_many(OFFICIAL))
+    assert len(records) == len(OFFICIAL)
+    # largest search spaces first
+    sizes = []
+    for rec in records:
+        board, inv, slots = parse_bff(Path(rec["path"]))
+        sizes.append(search_space_size(inv, len(slots)))
+        if rec["status"] == "solved":
+            grid = [list(row) for row in rec["solution"]]
+            assert set(board.targets) <= trace_all_rays(Board(grid, board.lasers, board.targets))
+    assert sizes == sorted(sizes, reverse=True)
+    status = {rec["board"]: rec["status"] for rec in records}
+    assert status.pop("mad_1") == "unsolved"
+    assert set(status.values()) == {"solved"}
+
+
+def test_solve_many_diagnose():
+    rec, = solve_many([ROOT / "examples" / "official" / "mad_1.bff"], diagnose=True)
+    assert rec["status"] == "unsolved" and 0 < rec["best_hit"] < rec["targets"]
+    board, _, _ = parse_bff(Path(rec["path"]))
+    lit = trace_all_rays(Board([list(row) for row in rec["best_layout"]], board.lasers, board.targets))
+    assert len(lit) == rec["best_hit"]
+    rec, = solve_many([ROOT / "examples" / "official" / "tiny_5.bff"], diagnose=True)
+    assert rec["status"] == "solved" and "best_hit" not in rec
+
+
+def test_solve_many_workers_timeout_and_errors():
+    paths = [ROOT / "examples" / "official" / "yarn_5.bff", ROOT / "examples" / "missing.bff"]
+    records = {rec["board"]: rec for rec in solve_many(paths, workers=2, timeout=0.02,
+                                                        strategy="combinations", nogood_cap=0)}
+    assert records["missing"]["status"] == "error"
+    assert records["yarn_5"]["status"] == "timeout"
+    assert records["yarn_5"]["layouts"] > 0
+
+
+if __name__ == "__main__":
+    test_solve_many_official()
+    test_solve_many_diagnose()
+    test_solve_many_workers_timeout_and_errors()
+    print("✓ solve_many 批量求解正常")
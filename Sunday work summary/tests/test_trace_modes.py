@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""追踪提前终止模式 (full / short / fast) 测试"""
+import random
+import sys
+from itertools import product
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from lazor_solver import parse_bff
+from lazor_core.backward import backward_prune, target_reach
+from lazor_core.counters import TraceCounters
+from lazor_core.kernel import (
+    DEAD, FAST, FULL, SHORT, CompiledBoard, _trace_early, compile_board, trace_frontier, trace_mask,
+    trace_touched,
+)
+from lazor_core.models import Laser
+from lazor_core.parallel import make_search
+
+
+def _random_puzzle(rng):
+    W, H = rng.randint(2, 4), rng.randint(2, 4)
+    grid = [[rng.choice("oooooxABC") for _ in range(W)] for _ in range(H)]
+    lasers = [Laser(rng.randrange(0, 2 * W, 2) + 1, rng.randrange(0, 2 * H + 1, 2),
+                    rng.choice((-1, 1)), rng.choice((-1, 1))) for _ in range(rng.randint(1, 2))]
+    slots = [r * W + c for r in range(H) for c in range(W) if grid[r][c] == "o"]
+    kinds = [rng.choice((1, 2, 3)) for _ in range(rng.randint(0, min(4, len(slots))))]
+    inv = {k: kinds.count(code) for k, code in (("A", 1), ("B", 2), ("C", 3))}
+    points = [(x, y) for x in range(2 * W + 1) for y in range(2 * H + 1) if (x + y) % 2]
+    cb0 = CompiledBoard(grid, lasers, points)
+    plant = bytearray(cb0.base_cells)
+    for ci, k in zip(rng.sample(slots, len(kinds)), kinds):
+        plant[ci] = k
+    lit = cb0.mask_to_points(trace_mask(cb0, plant))
+    targets = rng.sample(lit, min(len(lit), 3)) if lit and rng.random() < 0.7 else rng.sample(points, 2)
+    return CompiledBoard(grid, lasers, targets), inv, slots, plant
+
+
+def test_early_modes_never_misreport():
+    """SHORT / FAST light every target exactly when FULL does; otherwise SHORT is exact."""
+    rng = random.Random(21)
+    early = 0
+    for _ in range(300):
+        cb, _, slots, plant = _random_puzzle(rng)
+        reach = target_reach(cb, slots)
+        watch = bytearray(cb.n_cells + 1)
+        for ci in slots:
+            watch[ci] = 1
+        for cells in [plant] + [bytearray(rng.choice((0, 0, 1, 2, 3)) if ci in slots else k
+                                          for ci, k in enumerate(plant)) for _ in range(5)]:
+            full = trace_mask(cb, cells)
+            solved = full == cb.full_mask
+            for mode in (SHORT, FAST):
+                got = trace_mask(cb, cells, mode=mode, reach=reach)
+                counted = TraceCounters()
+                assert got == trace_mask(cb, cells, counted, mode, reach)
+                assert (got == cb.full_mask) == solved
+                assert got & ~full == 0
+                if mode == SHORT and not solved:
+                    assert got == full
+                early += counted.short_circuits + counted.fast_fails
+                mask, touched = trace_touched(cb, cells, watch, mode=mode, reach=reach)
+                assert mask == got and set(touched) <= set(slots)
+    assert early > 0
+
+
+def test_tracer_loops_agree():
+    """The FULL trace_mask loop, _trace_early and the counted tracer give the same results."""
+    rng = random.Random(19)
+    for _ in range(300):
+        cb, _, slots, plant = _random_puzzle(rng)
+        reach = target_reach(cb, slots)
+        for _ in range(5):
+            cells = bytearray(rng.choice((0, 0, 1, 2, 3)) if ci in slots else k for ci, k in enumerate(plant))
+            flags = bytearray(cb.n_cells + 1)
+            for ci in rng.sample(slots, rng.randint(0, len(slots))):
+                flags[ci] = 1
+            assert trace_mask(cb, cells) == _trace_early(cb, cells, FULL, None)[0]
+            for mode in (FULL, SHORT, FAST):
+                assert trace_mask(cb, cells, mode=mode, reach=reach) == _trace_early(cb, cells, mode, reach)[0]
+                for trace in (trace_frontier, trace_touched):
+                    assert trace(cb, cells, flags, None, mode, reach) == trace(cb, cells, flags, TraceCounters(),
+                                                                               mode, reach), (trace, mode)
+
+
+def test_dead_frontier_has_no_solving_completion():
+    rng = random.Random(4)
+    dead = 0
+    for _ in range(300):
+        cb, _, slots, plant = _random_puzzle(rng)
+        reach = target_reach(cb, slots)
+        open_now = rng.sample(slots, min(len(slots), 3))
+        undecided = bytearray(cb.n_cells + 1)
+        cells = bytearray(plant)
+        for ci in open_now:
+            undecided[ci] = 1
+            cells[ci] = 0
+        mask, ci = trace_frontier(cb, cells, undecided, mode=FAST, reach=reach)
+        if ci == -1:
+            assert (mask == cb.full_mask) == (trace_frontier(cb, cells, undecided)[0] == cb.full_mask)
+        if ci != DEAD:
+            continue
+        dead += 1
+        for fill in product(range(4), repeat=len(open_now)):
+            for c, k in zip(open_now, fill):
+                cells[c] = k
+            assert trace_mask(cb, cells) != cb.full_mask
+    assert dead > 0
+
+
+def test_searches_agree_across_modes():
+    rng = random.Random(8)
+    for _ in range(150):
+        cb, inv, slots, _ = _random_puzzle(rng)
+        expected = make_search(cb, inv, slots, "combinations", nogood_cap=0, trace_mode=FULL).run()
+        for strategy in ("backtrack", "combinations"):
+            for mode in (FULL, SHORT, FAST):
+                cells = make_search(cb, inv, slots, strategy, trace_mode=mode).run()
+                assert (cells is None) == (expected is None), (strategy, mode, bytes(cb.base_cells), cb.targets)
+                if cells is not None:
+                    assert trace_mask(cb, cells) == cb.full_mask
+
+
+def test_official_boards_solve_in_fast_mode():
+    for bff in sorted((ROOT / "examples" / "official").glob("*.bff")):
+        board, inv, open_slots = parse_bff(bff)
+        cb = compile_board(board)
+        slots = [r * cb.W + c for r, c in open_slots]
+        assert make_search(cb, inv, slots, "backtrack").trace_mode == SHORT
+        assert make_search(cb, inv, slots, "backtrack", backend="bitboard").trace_mode == FULL
+        prune = backward_prune(cb, slots)
+        for strategy in ("backtrack", "combinations"):
+            search = make_search(cb, inv, slots, strategy, prune=prune, trace_mode=FAST)
+            cells = search.run()
+            assert (cells is None) == (bff.stem == "mad_1"), bff.stem
+
+
+if __name__ == "__main__":
+    test_early_modes_never_misreport()
+    test_tracer_loops_agree()
+    test_dead_frontier_has_no_solving_completion()
+    test_searches_agree_across_modes()
+    test_official_boards_solve_in_fast_mode()
+    print("✓ 追踪提前终止模式正常")